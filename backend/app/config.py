@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -5,11 +6,106 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Authenticated-user cache in get_current_user (per process)
+    USER_CACHE_TTL_SECONDS: float = 30.0
+    USER_CACHE_SIZE: int = 10000
+    # bcrypt work factor; existing hashes are upgraded/downgraded on next login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
     GROQ_API_KEY: str  # <--- Added this line
 
+    # LLM gateway (shared by every Groq call site)
+    LLM_MODEL: str = "llama-3.3-70b-versatile"
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_BASE_URL: Optional[str] = None  # None = Groq cloud; point at a local server for benchmarks
+    LLM_STREAM_IDLE_SECONDS: float = 15.0
+
+    # AIService HTTP client (one pool for the app's lifetime)
+    AI_HTTP2: bool = True  # negotiated via ALPN; needs the h2 package (httpx[http2])
+    AI_MAX_CONNECTIONS: int = 32
+    AI_MAX_KEEPALIVE_CONNECTIONS: int = 32  # = max, so bursts do not churn connections
+    AI_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    AI_TIMEOUT_SECONDS: float = 30.0
+    AI_MAX_RETRIES: int = 3  # on 429
+    AI_RETRY_BASE_SECONDS: float = 0.5
+    AI_RETRY_MAX_SECONDS: float = 20.0  # longer Retry-After values are not waited out
+
+    # Observability: Prometheus /metrics, Server-Timing headers, JSON logs
+    METRICS_ENABLED: bool = True
+    SLOW_REQUEST_SECONDS: float = 1.0  # requests at least this slow are logged with their breakdown
+    LOG_FORMAT: str = "json"  # "json" | "text"
+    LOG_LEVEL: str = "INFO"
+
+    # Merchant keyword rules (defaults to app/data/merchant_rules.csv)
+    MERCHANT_RULES_PATH: Optional[str] = None
+
+    # Categorization memo (in-process tier; the Mongo tier has no expiry)
+    CATEGORY_CACHE_SIZE: int = 10000
+    CATEGORY_CACHE_TTL_SECONDS: float = 86400.0
+
+    # Local category model, asked before the LLM (train with train_categorizer.py)
+    LOCAL_CLASSIFIER_ENABLED: bool = True
+    LOCAL_CLASSIFIER_PATH: Optional[str] = None  # defaults to app/data/local_classifier.npz
+    LOCAL_CLASSIFIER_THRESHOLD: float = 0.8  # below this the LLM decides
+
+    # Spending rollups: on startup, build them for users with none yet (data from before rollups)
+    ROLLUP_BACKFILL_ON_STARTUP: bool = True
+
+    # Statement import
+    IMPORT_CHUNK_SIZE: int = 500
+    CATEGORIZE_BATCH_SIZE: int = 50
+
+    # Forecasting (fits run in a process pool, results cached per user)
+    PROCESS_POOL_WORKERS: int = 2
+    FORECAST_CACHE_SIZE: int = 10000
+    FORECAST_CACHE_TTL_SECONDS: float = 86400.0
+    FORECAST_MIN_PROPHET_DAYS: int = 30
+    FORECAST_HISTORY_DAYS: int = 180
+
+    # Uploaded document extraction (chat attachments)
+    # PDF/statement parsing gets its own pool, killed and replaced when a parse overruns
+    PARSE_POOL_WORKERS: int = 2
+    EXTRACT_PDF_MAX_PAGES: int = 5
+    EXTRACT_PDF_TIME_BUDGET_SECONDS: float = 10.0
+    EXTRACT_CSV_MAX_CHARS: int = 3000
+    EXTRACT_CACHE_SIZE: int = 256
+    EXTRACT_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Coach prompt context built from uploaded statements
+    COACH_CONTEXT_TOKEN_BUDGET: int = 1500
+    STATEMENT_CONTEXT_MAX_PAGES: int = 50
+    STATEMENT_CONTEXT_MAX_CSV_BYTES: int = 5 * 1024 * 1024
+    STATEMENT_CONTEXT_TIME_BUDGET_SECONDS: float = 10.0
+
+    # Coach/audit reply cache (per user, dropped on transaction/goal writes)
+    RESPONSE_CACHE_PER_USER: int = 32
+    RESPONSE_CACHE_MAX_USERS: int = 2000
+    RESPONSE_CACHE_TTL_SECONDS: float = 6 * 3600.0
+
+    # Magic-parse: rule-based drafts below this confidence go to the LLM
+    MAGIC_PARSE_MIN_CONFIDENCE: float = 0.8
+
+    # Outgoing mail (budget alerts)
+    MAIL_USERNAME: Optional[str] = None
+    MAIL_PASSWORD: Optional[str] = None
+    MAIL_FROM: Optional[str] = None
+    MAIL_SERVER: str = "smtp.gmail.com"
+    MAIL_PORT: int = 587
+    MAIL_STARTTLS: bool = True
+    MAIL_TIMEOUT_SECONDS: float = 30.0
+
+    # Background budget-alert engine
+    ALERTS_ENABLED: bool = True
+    ALERT_QUEUE_SIZE: int = 10000
+    ALERT_BATCH_SIZE: int = 50
+    ALERT_BATCH_WAIT_SECONDS: float = 2.0
+    ALERT_MAX_RETRIES: int = 4
+    ALERT_RETRY_BASE_SECONDS: float = 1.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore"  # <--- This prevents crashing on extra fields
     )
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
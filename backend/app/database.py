@@ -1,13 +1,18 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.config import settings
+from app.utils.metrics import mongo_event_listeners
 from app.models.user import User
 from app.models.transaction import Transaction
-from app.models.goal import Goal
+from app.models.goal import Goal, GoalContribution
+from app.models.merchant_category import MerchantCategory
+from app.models.spending_rollup import SpendingRollup
+from app.models.forecast import Forecast, ForecastJob
+from app.models.budget_alert import BudgetAlert
 
 async def init_db():
-    client = AsyncIOMotorClient(settings.MONGODB_URI)
+    client = AsyncIOMotorClient(settings.MONGODB_URI, event_listeners=mongo_event_listeners())
     await init_beanie(
         database=client.finwise, 
-        document_models=[User, Transaction, Goal]
+        document_models=[User, Transaction, Goal, MerchantCategory, SpendingRollup, Forecast, ForecastJob, GoalContribution, BudgetAlert]
     )
\ No newline at end of file
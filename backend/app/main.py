@@ -1,7 +1,7 @@
 import os
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
@@ -10,43 +10,83 @@ import certifi
 # Import models
 from app.models.user import User
 from app.models.transaction import Transaction
-from app.models.goal import Goal
+from app.models.goal import Goal, GoalContribution
+from app.models.merchant_category import MerchantCategory
+from app.models.spending_rollup import SpendingRollup
+from app.models.forecast import Forecast, ForecastJob
+from app.models.budget_alert import BudgetAlert
 
 # Import routes
-from app.routes import ai_coach, auth, transactions, goals, users
+from app.routes import ai_coach, auth, transactions, goals, users, insights
+from app.services.llm_gateway import llm_gateway
+from app.services.ai_service import ai_service
+from app.services.alert_engine import alert_engine
+from app.services.response_cache import response_cache
+from app.services.rollup_service import rollup_service
+from app.utils.executors import shutdown_executors
+from app.utils.metrics import (
+    CONTENT_TYPE_LATEST, MetricsMiddleware, configure_logging, mongo_event_listeners, render_metrics, stats_collector,
+)
+from app.config import settings
 
 load_dotenv()
+configure_logging()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Services and clients are built once here rather than at import (see benchmarks/check_cold_start.py)
+    transactions.setup()
+    await llm_gateway.startup()
+    if settings.METRICS_ENABLED:
+        stats_collector.register("category_cache", transactions.categorizer.cache.stats)
+        stats_collector.register("magic_parser", transactions.magic_parser.stats)
+        if transactions.categorizer.classifier is not None:
+            stats_collector.register("local_classifier", transactions.categorizer.classifier.stats)
+
     uri = os.getenv("MONGODB_URI")
     try:
         # DB Connection Logic
         if "localhost" in uri or "127.0.0.1" in uri:
             # Local connection (No TLS needed)
-            client = AsyncIOMotorClient(uri)
+            client = AsyncIOMotorClient(uri, event_listeners=mongo_event_listeners())
             print("💻 Connecting to Local Database...")
         else:
             # Cloud connection (MongoDB Atlas needs TLS)
             client = AsyncIOMotorClient(
                 uri,
-                tlsCAFile=certifi.where() # Uses the correct certificate bundle
+                tlsCAFile=certifi.where(), # Uses the correct certificate bundle
+                event_listeners=mongo_event_listeners(),
             )
             print("☁️ Connecting to Cloud Database...")
         
         # Ping to verify connection
         await client.admin.command('ping')
         
-        # Initialize Beanie with ALL models
-        await init_beanie(database=client.finwise, document_models=[User, Transaction, Goal])
+        # Initialize Beanie with ALL models (also syncs the indexes declared in each model's Settings)
+        await init_beanie(database=client.finwise, document_models=[User, Transaction, Goal, MerchantCategory, SpendingRollup, Forecast, ForecastJob, GoalContribution, BudgetAlert])
         
+        # Existing users get their spending rollups without a manual rebuild_rollups.py run
+        if settings.ROLLUP_BACKFILL_ON_STARTUP:
+            rollup_service.start_backfill()
+        # Budget alerts are evaluated and mailed in the background
+        alert_engine.start()
+        # One pooled (HTTP/2 where available) client for the app's lifetime
+        await ai_service.startup()
+
         print("✅ MoneyPal Backend Connected & Initialized")
-        yield
     except Exception as e:
         print(f"❌ DB Connection Failed: {e}")
         # We do not raise e here to allow the server to start even if DB fails, 
         # but API calls will fail until DB is fixed.
-        yield
+
+    yield
+
+    # Flush queued alerts, then release the pooled LLM/SMTP connections and worker processes
+    await rollup_service.stop_backfill()
+    await alert_engine.stop()
+    await llm_gateway.aclose()
+    await ai_service.aclose()
+    shutdown_executors()
 
 app = FastAPI(title="MoneyPal AI API", lifespan=lifespan)
 
@@ -58,14 +98,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # GET /transactions/ paging
 )
 
+# METRICS (Prometheus scrape target; per-request timings in the Server-Timing header)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    stats_collector.register("response_cache", response_cache.stats)
+    stats_collector.register("budget_alerts", lambda: dict(alert_engine.stats))
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 # REGISTER ROUTERS
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(ai_coach.router, prefix="/api", tags=["AI Coach"])
 app.include_router(transactions.router, prefix="/api", tags=["Transactions"])
 app.include_router(goals.router, prefix="/api", tags=["Goals"])
+app.include_router(insights.router, prefix="/api", tags=["Insights"])
 
 @app.get("/")
 def read_root():
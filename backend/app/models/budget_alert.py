@@ -0,0 +1,25 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from typing import Optional
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class BudgetAlert(Document):
+    """Highest budget alert sent to a user in a month; the unique index is what dedupes them."""
+    user_id: PydanticObjectId
+    period: str  # "YYYY-MM"
+    level: str  # warning | critical
+    rank: int  # 1 = warning, 2 = critical; a claim only succeeds for a higher rank
+    email: str
+    spent: float
+    limit: float
+    status: str = "queued"  # queued | sent | failed
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    sent_at: Optional[datetime] = None
+
+    class Settings:
+        name = "budget_alerts"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("period", ASCENDING)], name="user_period", unique=True),
+        ]
@@ -0,0 +1,32 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class Forecast(Document):
+    """Latest precomputed spending forecast per user (written by the nightly job or on demand)."""
+    user_id: PydanticObjectId
+    # Latest transaction write the forecast was computed from (see rollup_service.last_updated)
+    version: Optional[datetime] = None
+    result: Dict[str, Any]
+    computed_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "forecasts"
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], name="user_unique", unique=True),
+        ]
+
+class ForecastJob(Document):
+    """Checkpoint of the batch forecasting job, so an interrupted run can resume."""
+    name: str = "nightly"
+    status: str = "running"  # running | completed
+    last_user_id: Optional[PydanticObjectId] = None
+    processed: int = 0
+    failed: int = 0
+    started_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "forecast_jobs"
@@ -1,7 +1,8 @@
 from beanie import Document, PydanticObjectId
 from datetime import datetime
 from typing import Optional, List, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class Goal(Document):
     user_id: PydanticObjectId
@@ -17,6 +18,23 @@ class Goal(Document):
 
     class Settings:
         name = "goals"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("status", ASCENDING)], name="user_status"),
+        ]
+
+class GoalContribution(Document):
+    """Append-only ledger: one row per add-funds call, with the balance it produced."""
+    goal_id: PydanticObjectId
+    user_id: PydanticObjectId
+    amount: float
+    balance_after: float
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "goal_contributions"
+        indexes = [
+            IndexModel([("goal_id", ASCENDING), ("created_at", DESCENDING)], name="goal_created"),
+        ]
 
 class GoalCreate(BaseModel):
     title: str
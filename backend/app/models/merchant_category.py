@@ -0,0 +1,15 @@
+from beanie import Document, Indexed
+from datetime import datetime
+from pydantic import Field
+
+class MerchantCategory(Document):
+    # Normalized "description merchant" text (see category_cache.normalize_text)
+    key: Indexed(str, unique=True)
+    category: str
+    source: str = "ai"
+    hits: int = 0
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "merchant_categories"
@@ -0,0 +1,22 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from typing import Dict
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+class SpendingRollup(Document):
+    """Materialized per-user, per-month totals, maintained with $inc on every write."""
+    user_id: PydanticObjectId
+    month: str  # "YYYY-MM"
+    credit_total: float = 0.0
+    debit_total: float = 0.0
+    transaction_count: int = 0
+    categories: Dict[str, float] = {}  # debit total per category
+    daily: Dict[str, float] = {}  # debit total per day of month ("01".."31")
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "spending_rollups"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("month", ASCENDING)], name="user_month", unique=True),
+        ]
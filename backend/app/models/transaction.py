@@ -1,7 +1,8 @@
 from beanie import Document, PydanticObjectId
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class Transaction(Document):
     user_id: PydanticObjectId
@@ -14,9 +15,28 @@ class Transaction(Document):
     # FIX: Use default_factory to capture the EXACT time of transaction
     date: datetime = Field(default_factory=datetime.now)
     notes: Optional[str] = None
+    # Fingerprint of the statement line this came from (bulk imports only)
+    import_hash: Optional[str] = None
     
     class Settings:
         name = "transactions"
+        indexes = [
+            # History listing, keyset-paginated on (date, _id) newest first
+            IndexModel([("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="user_date_id"),
+            # Chart / forecast / totals (user_id + debit|credit + date range), and the type-filtered listing
+            IndexModel([("user_id", ASCENDING), ("transaction_type", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="user_type_date_id"),
+            # Category-filtered listing
+            IndexModel([("user_id", ASCENDING), ("category", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)], name="user_category_date_id"),
+            # Statement re-import dedupe; unique so two concurrent uploads of one statement can't both insert a line.
+            # Partial, so manually added transactions (no import_hash) aren't constrained.
+            # Replaces the non-unique "user_import_hash" index, which can be dropped once this one is built.
+            IndexModel(
+                [("user_id", ASCENDING), ("import_hash", ASCENDING)],
+                name="user_import_hash_unique",
+                unique=True,
+                partialFilterExpression={"import_hash": {"$type": "string"}},
+            ),
+        ]
 
 class TransactionCreate(BaseModel):
     amount: float
@@ -26,6 +46,19 @@ class TransactionCreate(BaseModel):
     payment_method: str = "upi"
     date: Optional[datetime] = None
 
+class TransactionListItem(BaseModel):
+    """Slim row for the history list; read straight from a projected query."""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    amount: float
+    category: str
+    description: str
+    merchant: Optional[str] = None
+    transaction_type: str
+    payment_method: Optional[str] = None
+    date: datetime
+
 class TransactionResponse(BaseModel):
     id: PydanticObjectId
     amount: float
@@ -2,6 +2,7 @@ from beanie import Document
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
+from pymongo import ASCENDING, IndexModel
 
 class User(Document):
     email: EmailStr
@@ -13,6 +14,10 @@ class User(Document):
 
     class Settings:
         name = "users"
+        indexes = [
+            # get_current_user runs find_one(email) on every authenticated request
+            IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        ]
 
 class UserRegister(BaseModel):
     email: EmailStr
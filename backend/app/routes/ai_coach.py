@@ -1,57 +1,43 @@
-import os
 import json
-import io
-import pypdf
+from typing import Optional
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.utils.security import get_current_user
 from app.models.user import User
-from app.models.transaction import Transaction
 from app.models.goal import Goal
-from groq import Groq
-from dotenv import load_dotenv
+import time
+from app.services.llm_gateway import llm_gateway
+from app.services.response_cache import response_cache
+from app.services.statement_context import statement_context_builder
+from app.services.rollup_service import rollup_service
 from datetime import datetime, timedelta
 
-load_dotenv()
 router = APIRouter(tags=["AI Coach"])
 
-# Ensure GROQ_API_KEY is in your .env file
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
 class AuditRequest(BaseModel):
     transactions: list
 
-# --- CHAT ENDPOINT (With Language Support) ---
-@router.post("/chat")
-async def chat_with_coach(
-    message: str = Form(...),
-    language: str = Form("English"), # <--- IMPORTANT: Accepts language from frontend
-    file: UploadFile = File(None),
-    current_user: User = Depends(get_current_user)
-):
+CHAT_FALLBACK_REPLY = "I'm having trouble analyzing that right now. Please check your internet connection."
+
+
+async def _coach_system_prompt(current_user: User, language: str, file: Optional[UploadFile]) -> str:
     # 1. READ FILE (IF UPLOADED)
     file_context = ""
     has_file = False
     if file:
         try:
-            content = await file.read()
-            if file.filename.endswith(".pdf"):
-                pdf = pypdf.PdfReader(io.BytesIO(content))
-                # Read first 5 pages for better context
-                text = "".join([page.extract_text() for page in pdf.pages[:5]])
-                file_context = f"--- START OF USER UPLOADED PDF ({file.filename}) ---\n{text}\n--- END OF PDF ---\n"
-                has_file = True
-            elif file.filename.endswith(".csv"):
-                file_context = f"--- START OF USER UPLOADED CSV ({file.filename}) ---\n{content.decode('utf-8')[:3000]}\n--- END OF CSV ---\n"
+            # Whole statement summarized into aggregates that fit the token budget
+            summary = await statement_context_builder.build(file)
+            if summary:
+                file_context = f"--- SUMMARY OF USER UPLOADED STATEMENT ({file.filename}) ---\n{summary}\n--- END OF STATEMENT ---\n"
                 has_file = True
         except Exception as e:
             file_context = f"\n[System Error: Could not read file: {str(e)}]\n"
 
     # 2. FETCH REAL FINANCIAL CONTEXT (Database)
-    txs = await Transaction.find(Transaction.user_id == current_user.id).to_list()
-    income = sum(t.amount for t in txs if t.transaction_type == 'credit')
-    expenses = sum(t.amount for t in txs if t.transaction_type == 'debit')
-    balance = income - expenses
+    totals = await rollup_service.totals(current_user.id)
+    income, expenses, balance = totals["income"], totals["expenses"], totals["balance"]
     
     goals = await Goal.find(Goal.user_id == current_user.id).to_list()
     goal_summary = ", ".join([f"{g.title} (₹{g.current_amount}/₹{g.target_amount})" for g in goals])
@@ -85,51 +71,132 @@ async def chat_with_coach(
     ```
     """
 
+    return system_instruction
+
+
+async def _apply_goal_trigger(ai_response: str, current_user: User) -> str:
+    """Runs the ```json create_goal trigger if the reply contains one; returns the reply to show."""
+    if "```json" in ai_response:
+        try:
+            json_str = ai_response.split("```json")[1].split("```")[0].strip()
+            data = json.loads(json_str)
+
+            if data.get("action") == "create_goal":
+                months = data.get("deadline_months", 3)
+                deadline_date = datetime.now() + timedelta(days=30*months)
+                monthly = data["target_amount"] / months
+
+                new_goal = Goal(
+                    user_id=current_user.id,
+                    title=data["title"],
+                    target_amount=data["target_amount"],
+                    current_amount=0,
+                    deadline=deadline_date,
+                    category="General",
+                    monthly_allocation=monthly,
+                    status="active"
+                )
+                await new_goal.insert()
+                response_cache.invalidate(current_user.id)
+
+                return f"Done! 🎯 (Goal Created: {data['title']})"
+        except Exception as e:
+            print(f"JSON Parse Error: {e}")
+            return ai_response
+
+    return ai_response
+
+
+def _cacheable(reply: str) -> bool:
+    # Replies that create a goal have a side effect; never replay them
+    return "```json" not in reply
+
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# --- CHAT ENDPOINT (With Language Support) ---
+@router.post("/chat")
+async def chat_with_coach(
+    message: str = Form(...),
+    language: str = Form("English"), # <--- IMPORTANT: Accepts language from frontend
+    file: UploadFile = File(None),
+    current_user: User = Depends(get_current_user)
+):
+    system_instruction = await _coach_system_prompt(current_user, language, file)
+
     try:
-        completion = client.chat.completions.create(
+        ai_response = await response_cache.complete(
+            current_user.id,
             messages=[
                 {"role": "system", "content": system_instruction},
                 {"role": "user", "content": message}
             ],
-            model="llama-3.3-70b-versatile", 
-            temperature=0.5, 
+            temperature=0.5,
+            cacheable=_cacheable,
         )
-        
-        ai_response = completion.choices[0].message.content
-
-        # 4. PARSE FOR JSON TRIGGER (Magic Goal Logic)
-        if "```json" in ai_response:
-            try:
-                json_str = ai_response.split("```json")[1].split("```")[0].strip()
-                data = json.loads(json_str)
-                
-                if data.get("action") == "create_goal":
-                    months = data.get("deadline_months", 3)
-                    deadline_date = datetime.now() + timedelta(days=30*months)
-                    monthly = data["target_amount"] / months
-
-                    new_goal = Goal(
-                        user_id=current_user.id,
-                        title=data["title"],
-                        target_amount=data["target_amount"],
-                        current_amount=0,
-                        deadline=deadline_date,
-                        category="General",
-                        monthly_allocation=monthly,
-                        status="active"
-                    )
-                    await new_goal.insert()
-                    
-                    return {"reply": f"Done! 🎯 (Goal Created: {data['title']})"}
-            except Exception as e:
-                print(f"JSON Parse Error: {e}")
-                return {"reply": ai_response}
-
-        return {"reply": ai_response}
+        return {"reply": await _apply_goal_trigger(ai_response, current_user)}
 
     except Exception as e:
         print(f"AI Error: {e}")
-        return {"reply": "I'm having trouble analyzing that right now. Please check your internet connection."}
+        return {"reply": CHAT_FALLBACK_REPLY}
+
+
+# --- STREAMING CHAT ENDPOINT (Server-Sent Events) ---
+@router.post("/chat/stream")
+async def stream_chat_with_coach(
+    message: str = Form(...),
+    language: str = Form("English"),
+    file: UploadFile = File(None),
+    current_user: User = Depends(get_current_user)
+):
+    """Same as /chat, but the reply is streamed as it is generated.
+
+    Emits `data: {"delta": "..."}` per chunk, then one `event: done` with the
+    final `{"reply": ...}` (the goal confirmation replaces the reply when the
+    create_goal trigger fired), or `event: error` with the fallback reply.
+    """
+    # Read the upload and build the prompt before the response starts
+    system_instruction = await _coach_system_prompt(current_user, language, file)
+    messages = [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": message}
+    ]
+
+    cache_key = response_cache.make_key(messages, None, 0.5)
+
+    async def events():
+        cached = response_cache.get(current_user.id, cache_key)
+        if cached is not None:
+            yield _sse({"delta": cached})
+            yield _sse({"reply": cached}, event="done")
+            return
+
+        parts = []
+        started = time.perf_counter()
+        try:
+            async for delta in llm_gateway.stream(messages=messages, temperature=0.5):
+                parts.append(delta)
+                yield _sse({"delta": delta})
+        except Exception as e:
+            print(f"AI Stream Error: {e}")
+            yield _sse({"reply": CHAT_FALLBACK_REPLY}, event="error")
+            return
+
+        ai_response = "".join(parts)
+        if _cacheable(ai_response):
+            response_cache.set(current_user.id, cache_key, ai_response, time.perf_counter() - started)
+        reply = await _apply_goal_trigger(ai_response, current_user)
+        yield _sse({"reply": reply}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # --- AUDIT ENDPOINT (Unchanged) ---
 @router.post("/audit")
@@ -153,11 +220,12 @@ async def audit_finances(data: AuditRequest, current_user: User = Depends(get_cu
     """
 
     try:
-        completion = client.chat.completions.create(
+        # The dashboard re-sends the same last-15 transactions on every visit
+        audit = await response_cache.complete(
+            current_user.id,
             messages=[{"role": "user", "content": prompt}],
-            model="llama-3.3-70b-versatile", 
             temperature=0.7,
         )
-        return {"audit": completion.choices[0].message.content}
+        return {"audit": audit}
     except Exception as e:
-        return {"audit": "I need more data to analyze properly!"}
\ No newline at end of file
+        return {"audit": "I need more data to analyze properly!"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, status
 from app.models.user import User, UserRegister
-from app.utils.security import hash_password, verify_password, create_access_token
+from app.utils.security import hash_password_async, verify_and_update_password, create_access_token, invalidate_user_cache
 from app.config import settings
 from datetime import timedelta
 from pydantic import BaseModel
@@ -25,7 +25,7 @@ async def signup(user_data: UserRegister):
             detail="Email already registered."
         )
     
-    hashed_pw = hash_password(user_data.password)
+    hashed_pw = await hash_password_async(user_data.password)
     
     # Create user with DEFAULTS for financial info
     new_user = User(
@@ -42,12 +42,20 @@ async def signup(user_data: UserRegister):
 @router.post("/login", response_model=Token)
 async def login(login_data: LoginRequest):
     user = await User.find_one(User.email == login_data.username)
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Work factor changed since this hash was made - transparently re-hash
+    if new_hash:
+        await user.set({User.hashed_password: new_hash})
+        invalidate_user_cache(user.email)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(data={"sub": user.email}, expires_delta=access_token_expires)
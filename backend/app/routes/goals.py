@@ -4,6 +4,7 @@ from app.models.user import User
 from app.models.goal import Goal, GoalCreate, GoalUpdate
 from app.services.goal_service import GoalService
 from app.utils.security import get_current_user
+from app.services.response_cache import response_cache
 from beanie import PydanticObjectId
 
 router = APIRouter(prefix="/goals", tags=["Goals"])
@@ -11,7 +12,9 @@ goal_service = GoalService()
 
 @router.post("/create", response_model=Goal)
 async def create_goal(goal_data: GoalCreate, current_user: User = Depends(get_current_user)):
-    return await goal_service.create_goal(current_user.id, goal_data.model_dump())
+    goal = await goal_service.create_goal(current_user.id, goal_data.model_dump())
+    response_cache.invalidate(current_user.id)
+    return goal
 
 @router.get("/list", response_model=List[Goal])
 async def list_goals(current_user: User = Depends(get_current_user)):
@@ -19,9 +22,10 @@ async def list_goals(current_user: User = Depends(get_current_user)):
 
 @router.put("/{goal_id}/add", response_model=Goal)
 async def add_funds(goal_id: str, update_data: GoalUpdate, current_user: User = Depends(get_current_user)):
-    goal = await goal_service.update_progress(goal_id, update_data.amount_added)
+    goal = await goal_service.update_progress(goal_id, update_data.amount_added, current_user.id)
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
+    response_cache.invalidate(current_user.id)
     return goal
 
 # --- THE FIX ---
@@ -31,4 +35,5 @@ async def delete_goal(goal_id: str, current_user: User = Depends(get_current_use
     if not goal or goal.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Goal not found")
     await goal.delete()
+    response_cache.invalidate(current_user.id)
     return {"message": "Deleted"}
\ No newline at end of file
@@ -1,22 +1,28 @@
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends
+from app.config import settings
 from app.models.user import User
-from app.models.transaction import Transaction
 from app.services.prediction_service import SpendingPredictor
-from app.utils.auth import get_current_user
+from app.services.rollup_service import rollup_service
+from app.utils.security import get_current_user
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 predictor = SpendingPredictor()
 
 @router.get("/forecast")
 async def get_forecast(current_user: User = Depends(get_current_user)):
-    transactions = await Transaction.find(
-        Transaction.user_id == current_user.id,
-        Transaction.transaction_type == "debit"
-    ).to_list()
+    # Only refit when the user's data has changed since the cached forecast
+    version = await rollup_service.last_updated(current_user.id)
+    prediction = await predictor.forecast(
+        current_user.id,
+        version,
+        # Daily series straight from the monthly rollups (~6 small documents)
+        lambda: rollup_service.daily_debits(
+            current_user.id, datetime.now() - timedelta(days=settings.FORECAST_HISTORY_DAYS)
+        ),
+    )
     
-    prediction = predictor.predict_monthly_spending(transactions)
-    
-    budget = current_user.profile.monthly_income if current_user.profile else 0
+    budget = current_user.monthly_allowance or 0
     
     status = "safe"
     if prediction["predicted_total"] > budget:
@@ -28,4 +34,4 @@ async def get_forecast(current_user: User = Depends(get_current_user)):
         "forecast": prediction,
         "budget_status": status,
         "budget": budget
-    }
\ No newline at end of file
+    }
@@ -1,19 +1,33 @@
-from fastapi import APIRouter, Depends
-from typing import List
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
+from typing import List, Optional
 from datetime import datetime, timedelta
 from app.models.user import User
-from app.models.transaction import Transaction, TransactionCreate, TransactionResponse
+from app.models.transaction import Transaction, TransactionCreate, TransactionListItem, TransactionResponse
 from app.utils.security import get_current_user
 from app.services.categorization_service import TransactionCategorizer
+from app.services.import_service import StatementImporter
+from app.services.magic_parser import MagicParser
+from app.services.rollup_service import rollup_service
+from app.services.transaction_listing import transaction_listing
+from beanie import PydanticObjectId
+from app.services.response_cache import response_cache
+from app.services.alert_engine import alert_engine
 from pydantic import BaseModel
-import os
-import json
-from groq import Groq
-from dotenv import load_dotenv
 
-load_dotenv()
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
-categorizer = TransactionCategorizer()
+# Built once by setup() in the app lifespan, not at import
+categorizer: Optional[TransactionCategorizer] = None
+importer: Optional[StatementImporter] = None
+magic_parser: Optional[MagicParser] = None
+
+
+def setup():
+    """Compiles the merchant rules and wires the services that share them."""
+    global categorizer, importer, magic_parser
+    if categorizer is None:
+        categorizer = TransactionCategorizer()
+        importer = StatementImporter(categorizer)
+        magic_parser = MagicParser(categorizer.matcher)
 
 # --- MAGIC ADD LOGIC ---
 class MagicRequest(BaseModel):
@@ -21,28 +35,14 @@ class MagicRequest(BaseModel):
 
 @router.post("/magic-parse")
 async def magic_parse_transaction(request: MagicRequest):
-    """AI converts 'Spent 500 on dinner' -> JSON"""
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    prompt = f"""
-    Extract transaction from: "{request.text}"
-    Return JSON with: amount (number), description (string), category (Food & Dining, Transport, Shopping, etc)
-    """
-    completion = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model="llama-3.3-70b-versatile",
-        temperature=0.1,
-    )
-    content = completion.choices[0].message.content
-    # Simple cleaner to get JSON part
-    if "```json" in content: content = content.split("```json")[1].split("```")[0]
-    elif "```" in content: content = content.split("```")[1].split("```")[0]
-    return json.loads(content)
+    """Converts 'Spent 500 on dinner' -> JSON. Rules first, AI only when unsure (see `parsed_by`)"""
+    return await magic_parser.parse_text(request.text)
 
 # --- STANDARD ADD (With Smart Category) ---
 @router.post("/add", response_model=TransactionResponse)
 async def add_transaction(txn_data: TransactionCreate, current_user: User = Depends(get_current_user)):
     # Here is where the new categorization happens
-    cat_result = categorizer.categorize(txn_data.description, txn_data.merchant)
+    cat_result = await categorizer.categorize(txn_data.description, txn_data.merchant)
     
     transaction = Transaction(
         user_id=current_user.id,
@@ -55,29 +55,65 @@ async def add_transaction(txn_data: TransactionCreate, current_user: User = Depe
         date=txn_data.date or datetime.now()
     )
     await transaction.insert()
+    await rollup_service.apply([transaction])
+    response_cache.invalidate(current_user.id)
+    alert_engine.notify(current_user.id)
     return TransactionResponse(
         id=transaction.id, amount=transaction.amount, category=transaction.category,
         description=transaction.description, date=transaction.date, category_confidence=cat_result["confidence"]
     )
 
-@router.get("/", response_model=List[Transaction])
-async def get_transactions(limit: int = 50, current_user: User = Depends(get_current_user)):
-    return await Transaction.find(Transaction.user_id == current_user.id).sort("-date").limit(limit).to_list()
+# --- BULK IMPORT (CSV / PDF bank statement) ---
+@router.post("/import")
+async def import_statement(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+    try:
+        summary = await importer.import_file(current_user.id, file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if summary["inserted"]:
+        response_cache.invalidate(current_user.id)
+        alert_engine.notify(current_user.id)
+    return summary
+
+@router.get("/", response_model=List[TransactionListItem])
+async def get_transactions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    transaction_type: Optional[str] = Query(None, pattern="^(debit|credit)$"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """Newest first. Pass the `X-Next-Cursor` response header back as `cursor` for the next page"""
+    try:
+        items, next_cursor = await transaction_listing.page(
+            current_user.id, limit, cursor, category, transaction_type, date_from, date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
+
+@router.delete("/{txn_id}")
+async def delete_transaction(txn_id: PydanticObjectId, current_user: User = Depends(get_current_user)):
+    # Typed path parameter: a malformed id is a 422, not an unhandled InvalidId
+    transaction = await Transaction.get(txn_id)
+    if not transaction or transaction.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    await transaction.delete()
+    await rollup_service.apply([transaction], sign=-1)
+    response_cache.invalidate(current_user.id)
+    return {"message": "Deleted"}
 
 @router.get("/chart-data")
 async def get_dashboard_chart(current_user: User = Depends(get_current_user)):
     seven_days_ago = datetime.now() - timedelta(days=7)
-    txs = await Transaction.find(
-        Transaction.user_id == current_user.id,
-        Transaction.transaction_type == "debit",
-        Transaction.date >= seven_days_ago
-    ).to_list()
-    
-    daily_totals = {}
-    for t in txs:
-        d_str = t.date[:10] if isinstance(t.date, str) else t.date.strftime("%Y-%m-%d")
-        daily_totals[d_str] = daily_totals.get(d_str, 0) + t.amount
-        
+    # Read from the monthly rollups - one or two documents regardless of history
+    daily_totals = await rollup_service.daily_debits(current_user.id, seven_days_ago)
+
     formatted_data = []
     for i in range(8):
         d = seven_days_ago + timedelta(days=i)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from app.models.user import User
-from app.utils.security import get_current_user
+from app.utils.security import get_current_user, invalidate_user_cache
+from app.services.alert_engine import alert_engine
 from pydantic import BaseModel
 
 router = APIRouter(tags=["Users"])
@@ -23,4 +24,7 @@ async def update_budget(data: UpdateProfile, current_user: User = Depends(get_cu
     current_user.monthly_allowance = data.monthly_allowance
     current_user.safe_daily_spend = round(data.monthly_allowance / 30, 2)
     await current_user.save()
+    invalidate_user_cache(current_user.email)
+    # A lower allowance can cross a threshold without any new spending
+    alert_engine.notify(current_user.id)
     return {"message": "Budget updated!", "new_allowance": current_user.monthly_allowance}
\ No newline at end of file
@@ -1,33 +1,116 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
 import httpx
 from app.config import settings
-import pandas as pd
-import pypdf
-import io
-import json
+from app.services.document_extraction import document_extractor
+from app.utils.metrics import LLM_LATENCY, LLM_RETRIES, count, timed
+
+GROQ_BASE_URL = "https://api.groq.com"
+
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parses Retry-After (delta-seconds or an HTTP date); None if absent or invalid."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
 
 class AIService:
+    """Groq chat completions over one pooled HTTP client.
+
+    The client is opened in the app lifespan (`startup`) and closed on shutdown
+    (`aclose`), so TCP/TLS handshakes happen once per pooled connection instead
+    of once per call. With h2 installed the pool speaks HTTP/2 and multiplexes
+    concurrent requests over a single connection.
+    """
+
     def __init__(self):
         self.api_key = settings.GROQ_API_KEY
         # Groq OpenAI-compatible endpoint
-        self.api_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.base_url = (settings.LLM_BASE_URL or GROQ_BASE_URL).rstrip("/")
+        self.api_url = "/openai/v1/chat/completions"
         self.model = "llama3-70b-8192"  # Using Llama 3 for good financial reasoning
+        self._client: Optional[httpx.AsyncClient] = None
 
-    def _extract_text_from_file(self, file_bytes: bytes, filename: str) -> str:
-        """Helper to extract raw text from PDF or CSV bytes"""
+    async def startup(self):
+        if self._client is not None:
+            return
+        http2 = settings.AI_HTTP2 and http2_available()
+        if settings.AI_HTTP2 and not http2:
+            print("⚠️ h2 not installed, AIService falls back to HTTP/1.1 keep-alive")
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.AI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.AI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(settings.AI_TIMEOUT_SECONDS, connect=5.0),
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+    async def _post(self, payload: dict) -> httpx.Response:
+        """POSTs a completion, retrying 429s with jittered exponential backoff.
+
+        A Retry-After header from the server takes precedence over the backoff;
+        one longer than AI_RETRY_MAX_SECONDS is returned to the caller as is.
+        """
+        if self._client is None:
+            # Used outside the app lifespan (scripts); stays open until aclose()
+            await self.startup()
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            with timed(LLM_LATENCY, "llm", client="ai_service", mode="complete", outcome="ok") as labels:
+                response = await self._client.post(self.api_url, json=payload)
+                if response.status_code != 200:
+                    labels["outcome"] = str(response.status_code)
+            if response.status_code != 429 or attempt == settings.AI_MAX_RETRIES:
+                return response
+            delay = retry_after_seconds(response)
+            if delay is None:
+                # Full jitter: spreads out clients that were throttled together
+                delay = random.uniform(0, settings.AI_RETRY_BASE_SECONDS * (2 ** attempt))
+            if delay > settings.AI_RETRY_MAX_SECONDS:
+                return response
+            count(LLM_RETRIES, client="ai_service")
+            await asyncio.sleep(delay)
+        return response
+
+    async def _extract_text_from_file(self, file_bytes: bytes, filename: str) -> str:
+        """Helper to extract raw text from PDF or CSV bytes (shared, cached extractor)"""
         try:
-            filename = filename.lower()
-            if filename.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(file_bytes))
-                return f"CSV Data:\n{df.to_string()}\n"
-            elif filename.endswith('.pdf'):
-                pdf_reader = pypdf.PdfReader(io.BytesIO(file_bytes))
-                text = ""
-                # Safety: Only read first 5 pages to stay within token quotas
-                num_pages = min(len(pdf_reader.pages), 5)
-                for i in range(num_pages):
-                    text += pdf_reader.pages[i].extract_text() + "\n"
-                return f"PDF Document Content (Top {num_pages} pages):\n{text}\n"
-            return ""
+            document = await document_extractor.extract_bytes(file_bytes, filename)
+            if document is None:
+                return ""
+            if document.kind == "csv":
+                return f"CSV Data:\n{document.text}\n"
+            return f"PDF Document Content (Top {document.units} pages):\n{document.text}\n"
         except Exception as e:
             return f"Error reading file: {str(e)}"
 
@@ -35,11 +118,11 @@ class AIService:
         try:
             file_context = ""
             if file_bytes and filename:
-                extracted_text = self._extract_text_from_file(file_bytes, filename)
+                extracted_text = await self._extract_text_from_file(file_bytes, filename)
                 file_context = f"\n\n--- USER UPLOADED FILE ({filename}) ---\n{extracted_text}\n----------------\n"
 
             system_instruction = "You are FinWise AI, a helpful financial coach. Analyze the user's data and provide brief, professional advice."
-            
+
             # Construct messages for Groq (OpenAI format)
             messages = [
                 {"role": "system", "content": system_instruction},
@@ -52,33 +135,22 @@ class AIService:
                 "temperature": 0.7
             }
 
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            response = await self._post(payload)
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    self.api_url, 
-                    json=payload,
-                    headers=headers,
-                    timeout=30.0 
-                )
-                
-                if response.status_code == 429:
-                    print("Quota hit on Groq API")
-                    return "ERROR_QUOTA_EXCEEDED"
+            if response.status_code == 429:
+                print("Quota hit on Groq API")
+                return "ERROR_QUOTA_EXCEEDED"
 
-                if response.status_code != 200:
-                    print(f"API Error: {response.text}")
-                    return "I'm having trouble connecting to my brain. Please try again in a moment."
+            if response.status_code != 200:
+                print(f"API Error: {response.text}")
+                return "I'm having trouble connecting to my brain. Please try again in a moment."
+
+            data = response.json()
+            # Parse Groq/OpenAI format response
+            return data['choices'][0]['message']['content']
 
-                data = response.json()
-                # Parse Groq/OpenAI format response
-                return data['choices'][0]['message']['content']
-            
         except Exception as e:
             print(f"Generation Error: {str(e)}")
             return "I encountered an error while analyzing your request."
 
-ai_service = AIService()
\ No newline at end of file
+ai_service = AIService()
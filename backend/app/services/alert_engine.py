@@ -0,0 +1,192 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+from email.message import EmailMessage
+from typing import List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.config import settings
+from app.models.budget_alert import BudgetAlert
+from app.models.spending_rollup import SpendingRollup
+from app.models.user import User
+from app.services.email_service import alert_level, mailer, render_budget_alert
+from app.services.rollup_service import month_key
+
+LEVEL_RANKS = {"warning": 1, "critical": 2}
+
+
+class AlertEngine:
+    """Background budget alerts: evaluate off the request path, dedupe, deliver in batches.
+
+    Routes call `notify(user_id)` after spending changes; it only enqueues. A
+    single worker drains the queue in batches (up to ALERT_BATCH_SIZE users or
+    ALERT_BATCH_WAIT_SECONDS), reads each user's allowance and current-month
+    rollup with one query apiece, claims the alert in `budget_alerts` and hands
+    the batch to the pooled SMTP mailer.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[PydanticObjectId] = set()
+        self._worker: Optional[asyncio.Task] = None
+        self.stats = Counter()
+
+    def start(self):
+        if not settings.ALERTS_ENABLED or self._worker is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.ALERT_QUEUE_SIZE)
+        self._worker = asyncio.create_task(self._run())
+
+    def notify(self, user_id: PydanticObjectId):
+        """Schedules a budget check for the user. Never blocks and never raises."""
+        if self._queue is None or user_id in self._pending:
+            # Not running, or already queued: a statement import notifies once per chunk
+            return
+        try:
+            self._queue.put_nowait(user_id)
+            self._pending.add(user_id)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Waits until everything queued so far has been evaluated and delivered."""
+        if self._queue is not None:
+            await asyncio.wait_for(self._queue.join(), timeout)
+
+    async def stop(self, timeout: float = 10.0):
+        if self._worker is None:
+            return
+        try:
+            await self.drain(timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ Alert queue not drained on shutdown ({self._queue.qsize()} left)")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+        self._pending.clear()
+        await mailer.aclose()
+
+    async def _next_batch(self) -> List[PydanticObjectId]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + settings.ALERT_BATCH_WAIT_SECONDS
+        while len(batch) < settings.ALERT_BATCH_SIZE:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Changes from here on need a fresh evaluation
+        self._pending.difference_update(batch)
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._process(batch)
+            except Exception as e:
+                print(f"❌ Budget alert batch failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _claim(self, user: User, period: str, level: str, spent: float) -> Optional[ObjectId]:
+        """Atomically records the alert; None if this level (or higher) was already sent this period."""
+        rank = LEVEL_RANKS[level]
+        try:
+            doc = await BudgetAlert.get_motor_collection().find_one_and_update(
+                {"user_id": user.id, "period": period, "rank": {"$lt": rank}},
+                {
+                    "$set": {
+                        "level": level, "rank": rank, "email": user.email, "spent": spent,
+                        "limit": user.monthly_allowance, "status": "queued", "error": None,
+                        "created_at": datetime.now(), "sent_at": None,
+                    },
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+                projection={"_id": 1},
+            )
+        except DuplicateKeyError:
+            # A row with an equal or higher rank exists, so the upsert collided
+            return None
+        return doc["_id"]
+
+    async def _process(self, user_ids: List[PydanticObjectId]):
+        now = datetime.now()
+        period = month_key(now)
+        users = await User.find({"_id": {"$in": user_ids}, "monthly_allowance": {"$gt": 0}}).to_list()
+        if not users:
+            return
+        rollups = await SpendingRollup.get_motor_collection().find(
+            {"user_id": {"$in": [u.id for u in users]}, "month": period},
+            {"user_id": 1, "debit_total": 1},
+        ).to_list(length=None)
+        spent_by_user = {r["user_id"]: r.get("debit_total", 0.0) for r in rollups}
+
+        claims: List[Tuple[ObjectId, EmailMessage]] = []
+        claimed: List[ObjectId] = []
+        try:
+            for user in users:
+                spent = spent_by_user.get(user.id, 0.0)
+                level = alert_level(spent, user.monthly_allowance, now)
+                if level is None:
+                    continue
+                alert_id = await self._claim(user, period, level, spent)
+                if alert_id is None:
+                    self.stats["deduped"] += 1
+                    continue
+                claimed.append(alert_id)
+                message = render_budget_alert(user.email, user.full_name or "there", spent, user.monthly_allowance, level, now)
+                claims.append((alert_id, message))
+            if not claims:
+                return
+
+            results = await mailer.send_batch([message for _, message in claims])
+        except BaseException as e:
+            # Failed or cancelled (stop() after a drain timeout) before anything was sent:
+            # claims left "queued" would suppress these alerts for the rest of the month
+            await self._release(claimed, repr(e))
+            raise
+        operations = []
+        for (alert_id, _), (_, error) in zip(claims, results):
+            if error is None:
+                self.stats["sent"] += 1
+                operations.append(UpdateOne({"_id": alert_id}, {"$set": {"status": "sent", "sent_at": datetime.now()}}))
+            else:
+                self.stats["failed"] += 1
+                print(f"❌ Budget alert failed for alert {alert_id}: {error}")
+                # Give the claim back so the next spending change retries it
+                operations.append(UpdateOne(
+                    {"_id": alert_id},
+                    {"$set": {"status": "failed", "error": str(error)}, "$inc": {"rank": -1}},
+                ))
+        await BudgetAlert.get_motor_collection().bulk_write(operations, ordered=False)
+        print(f"📧 Budget alert batch: {len(claims)} emails over one connection ({dict(self.stats)})")
+
+    async def _release(self, alert_ids: List[ObjectId], error: str):
+        """Gives unsent claims back so the next spending change retries them."""
+        if not alert_ids:
+            return
+        try:
+            await BudgetAlert.get_motor_collection().update_many(
+                {"_id": {"$in": alert_ids}, "status": "queued"},
+                {"$set": {"status": "failed", "error": error}, "$inc": {"rank": -1}},
+            )
+            self.stats["released"] += len(alert_ids)
+        except Exception as e:
+            print(f"❌ Could not release {len(alert_ids)} budget alert claims: {e}")
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,38 @@
+from typing import List, Optional
+
+from beanie import PydanticObjectId
+
+from app.models.transaction import Transaction
+
+
+class AnalyticsService:
+    """Aggregations over raw transactions, computed inside MongoDB.
+
+    Dashboard readers use spending_rollups; this is the ground truth those are
+    rebuilt and checked against.
+    """
+
+    async def monthly_breakdown(self, user_id: Optional[PydanticObjectId] = None) -> List[dict]:
+        """Raw per (user, month, day, type, category) sums - the ground truth for rollups."""
+        match = {"date": {"$type": "date"}}
+        if user_id:
+            match["user_id"] = user_id
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "month": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
+                    "day": {"$dateToString": {"format": "%d", "date": "$date"}},
+                    "transaction_type": "$transaction_type",
+                    "category": "$category",
+                },
+                "amount": {"$sum": "$amount"},
+                "count": {"$sum": 1},
+            }},
+        ]
+        rows = await Transaction.aggregate(pipeline).to_list()
+        return [{**row["_id"], "amount": row["amount"], "count": row["count"]} for row in rows]
+
+
+analytics_service = AnalyticsService()
@@ -1,52 +1,194 @@
-import os
-from groq import Groq
-from dotenv import load_dotenv
+import asyncio
+import json
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.merchant_matcher import MerchantMatcher, DEFAULT_RULES_PATH
+from app.services.category_cache import CategoryCache, normalize_text
+from app.services.local_classifier import DEFAULT_MODEL_PATH, LocalClassifier
+from app.utils.metrics import CATEGORIZATION_LATENCY, CATEGORIZED, count, timed
 
-load_dotenv()
+CATEGORIES = [
+    "Food & Dining", "Transport", "Shopping", "Groceries", "Utilities", "Health",
+    "Entertainment", "Education", "Travel", "Investments", "Income", "Housing",
+]
+CATEGORY_OPTIONS = f"[{', '.join(CATEGORIES)}]"
+
+_REPLY_NOISE_RE = re.compile(r"[^a-z&]+")
+_CANONICAL = {_REPLY_NOISE_RE.sub(" ", c.lower()).strip(): c for c in CATEGORIES}
+
+
+def canonical_category(reply) -> Optional[str]:
+    """Maps an LLM reply onto CATEGORIES, or None if it names none (or several) of them.
+
+    Case and punctuation are ignored, so "food & dining." and "Category: Food & Dining"
+    both resolve; anything else must not reach the shared memo.
+    """
+    text = _REPLY_NOISE_RE.sub(" ", str(reply).lower()).strip()
+    if text in _CANONICAL:
+        return _CANONICAL[text]
+    found = {c for key, c in _CANONICAL.items() if f" {key} " in f" {text} "}
+    return found.pop() if len(found) == 1 else None
 
 class TransactionCategorizer:
-    def __init__(self):
-        # 1. FAST MATCH (Keep your specific keywords)
-        self.keyword_map = {
-            "swiggy": "Food & Dining", "zomato": "Food & Dining", "dominos": "Food & Dining", "kfc": "Food & Dining",
-            "uber": "Transport", "ola": "Transport", "rapido": "Transport", "fuel": "Transport", "petrol": "Transport",
-            "netflix": "Entertainment", "spotify": "Entertainment", "pvr": "Entertainment",
-            "amazon": "Shopping", "flipkart": "Shopping", "myntra": "Shopping", "zudio": "Shopping",
-            "jio": "Utilities", "bescom": "Utilities", "wifi": "Utilities", "airtel": "Utilities",
-            "pharmacy": "Health", "apollo": "Health",
-            "salary": "Income", "rent": "Housing", "sip": "Investments"
-        }
-        
-        # 2. SMART MATCH (AI Fallback)
-        self.ai_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
-    def categorize(self, description: str, merchant: str = None) -> dict:
+    def __init__(self, rules_path: Optional[str] = None):
+        # 1. FAST MATCH - compiled once from the merchant rules file (app/data/merchant_rules.csv)
+        self.matcher = MerchantMatcher.from_file(rules_path or settings.MERCHANT_RULES_PATH or DEFAULT_RULES_PATH)
+        # 2. MEMO of past AI answers (in-process LRU + shared Mongo collection)
+        self.cache = CategoryCache()
+        # 3. LOCAL MODEL trained from past labels (train_categorizer.py); None until one exists
+        self.classifier = (
+            LocalClassifier.load(settings.LOCAL_CLASSIFIER_PATH or DEFAULT_MODEL_PATH)
+            if settings.LOCAL_CLASSIFIER_ENABLED else None
+        )
+
+    def _local_guess(self, key: str) -> Optional[dict]:
+        if self.classifier is None or not key:
+            return None
+        guess = self.classifier.confident_or_none(key, settings.LOCAL_CLASSIFIER_THRESHOLD)
+        if guess is None:
+            return None
+        return {"category": guess[0], "confidence": round(guess[1], 2), "method": "local"}
+
+    async def categorize(self, description: str, merchant: str = None) -> dict:
+        with timed(CATEGORIZATION_LATENCY, method="fallback") as labels:
+            result = await self._categorize(description, merchant)
+            labels["method"] = result["method"]
+        count(CATEGORIZED, method=result["method"], mode="single")
+        return result
+
+    async def _categorize(self, description: str, merchant: str = None) -> dict:
         text = f"{description} {merchant or ''}".lower()
-        
-        # A. Try Fast Rules First (Latency < 1ms)
-        for keyword, category in self.keyword_map.items():
-            if keyword in text:
-                return {"category": category, "confidence": 0.95, "method": "keyword"}
-        
-        # B. Ask AI (Latency ~500ms) - Handles "Starbucks", "Auto", "Chai"
+
+        # A. Try Fast Rules First (Latency < 1ms) - single pass, longest/highest-priority hit
+        rule = self.matcher.match(text)
+        if rule:
+            return {"category": rule.category, "confidence": 0.95, "method": "keyword"}
+
+        # B. Seen this merchant before? (Latency < 1ms from memory, one query otherwise)
+        cache_key = normalize_text(description, merchant)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached:
+                return {"category": cached, "confidence": 0.85, "method": "cache"}
+
+        # C. Local model (Latency ~50us) - only confident answers, the rest go to the LLM
+        local = self._local_guess(cache_key)
+        if local:
+            return local
+
+        # D. Ask AI (Latency ~500ms) - Handles "Starbucks", "Auto", "Chai"
         try:
             prompt = f"""
             Categorize this transaction: "{text}"
-            
-            Options: [Food & Dining, Transport, Shopping, Groceries, Utilities, Health, Entertainment, Education, Travel, Investments, Income, Housing]
-            
+
+            Options: {CATEGORY_OPTIONS}
+
             OUTPUT ONLY THE CATEGORY NAME. NO EXTRA TEXT.
             """
-            
-            completion = self.ai_client.chat.completions.create(
+
+            # SMART MATCH (AI Fallback) - async, so the event loop keeps serving
+            reply = await llm_gateway.complete(
                 messages=[{"role": "user", "content": prompt}],
-                model="llama-3.3-70b-versatile",
                 temperature=0.1
             )
-            
-            category = completion.choices[0].message.content.strip()
+
+            category = canonical_category(reply)
+            if category is None:
+                print(f"AI Categorization gave no known category: {reply[:80]!r}")
+                return {"category": "General", "confidence": 0.5, "method": "fallback"}
+            if cache_key:
+                await self.cache.set(cache_key, category)
             return {"category": category, "confidence": 0.85, "method": "ai"}
-            
+
         except Exception as e:
             print(f"AI Categorization Failed: {e}")
-            return {"category": "General", "confidence": 0.5, "method": "fallback"}
\ No newline at end of file
+            return {"category": "General", "confidence": 0.5, "method": "fallback"}
+
+    async def categorize_many(self, items: List[Tuple[str, Optional[str]]]) -> List[dict]:
+        """Bulk version of categorize() for statement imports.
+
+        Same A -> B -> C -> D order, but the cache is read with one query and every
+        distinct unknown merchant is sent to the LLM in batched prompts.
+        """
+        results: List[Optional[dict]] = [None] * len(items)
+        pending: Dict[str, List[int]] = {}
+
+        # A. Keyword rules
+        for i, (description, merchant) in enumerate(items):
+            rule = self.matcher.match(f"{description} {merchant or ''}".lower())
+            if rule:
+                results[i] = {"category": rule.category, "confidence": 0.95, "method": "keyword"}
+                continue
+            key = normalize_text(description, merchant)
+            if key:
+                pending.setdefault(key, []).append(i)
+            else:
+                results[i] = {"category": "General", "confidence": 0.5, "method": "fallback"}
+
+        # B. Cache (memory, then one $in query)
+        for key, category in (await self.cache.get_many(pending)).items():
+            for i in pending.pop(key):
+                results[i] = {"category": category, "confidence": 0.85, "method": "cache"}
+
+        # C. Local model
+        for key in list(pending):
+            local = self._local_guess(key)
+            if local:
+                for i in pending.pop(key):
+                    results[i] = dict(local)
+
+        # D. Batched AI prompts, run concurrently (the gateway caps in-flight calls)
+        keys = list(pending)
+        size = settings.CATEGORIZE_BATCH_SIZE
+        batches = [keys[i:i + size] for i in range(0, len(keys), size)]
+        answers = await asyncio.gather(*(self._ai_categorize_batch(batch) for batch in batches))
+
+        learned: Dict[str, str] = {}
+        for answer in answers:
+            learned.update(answer)
+        await self.cache.set_many(learned)
+
+        for key, indexes in pending.items():
+            category = learned.get(key)
+            result = (
+                {"category": category, "confidence": 0.85, "method": "ai"} if category
+                else {"category": "General", "confidence": 0.5, "method": "fallback"}
+            )
+            for i in indexes:
+                results[i] = dict(result)
+
+        for method, rows in Counter(r["method"] for r in results).items():
+            count(CATEGORIZED, rows, method=method, mode="bulk")
+        return results
+
+    async def _ai_categorize_batch(self, keys: List[str]) -> Dict[str, str]:
+        numbered = "\n".join(f"{n}. {key}" for n, key in enumerate(keys, start=1))
+        prompt = f"""
+        Categorize each of these transactions:
+        {numbered}
+
+        Options: {CATEGORY_OPTIONS}
+
+        OUTPUT ONLY A JSON OBJECT mapping each line number to its category name, e.g. {{"1": "Transport"}}. NO EXTRA TEXT.
+        """
+        try:
+            reply = await llm_gateway.complete(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1
+            )
+            data = json.loads(reply[reply.index("{"):reply.rindex("}") + 1])
+            answers = {}
+            for n, category in data.items():
+                if not (str(n).isdigit() and 0 < int(n) <= len(keys)):
+                    continue
+                # Unknown names are left out: those rows fall back to General and aren't memoized
+                category = canonical_category(category)
+                if category:
+                    answers[keys[int(n) - 1]] = category
+            return answers
+        except Exception as e:
+            print(f"AI Batch Categorization Failed ({len(keys)} rows): {e}")
+            return {}
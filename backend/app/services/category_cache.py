@@ -0,0 +1,145 @@
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from app.config import settings
+from app.models.merchant_category import MerchantCategory
+from app.utils.cache import TTLCache
+
+# "UPI/412345678901/...", "UTR: AXIS123456", "Ref No 99812" - bank references, never merchant identity
+_REFERENCE_RE = re.compile(r"\b(?:upi|imps|neft|rtgs|utr|ref(?:\s*no)?|txn(?:\s*id)?)\W*[a-z]*\d[a-z0-9]*")
+_DIGITS_RE = re.compile(r"\d+")
+_NOISE_RE = re.compile(r"[^a-z@&\s]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_text(description: str, merchant: Optional[str] = None) -> str:
+    """Cache key for a transaction: lowercased, references/digits/punctuation stripped."""
+    text = f"{description} {merchant or ''}".lower()
+    text = _REFERENCE_RE.sub(" ", text)
+    text = _DIGITS_RE.sub(" ", text)
+    text = _NOISE_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+class CategoryCache:
+    """Two-tier memo for AI categorizations.
+
+    Tier 1 is a per-process LRU with TTL; tier 2 is the shared
+    `merchant_categories` collection, so every worker benefits from a result
+    any worker paid for.
+    """
+
+    def __init__(self, maxsize: int = None, ttl: float = None):
+        self.memory = TTLCache(
+            maxsize=maxsize or settings.CATEGORY_CACHE_SIZE,
+            ttl=ttl or settings.CATEGORY_CACHE_TTL_SECONDS,
+        )
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        category = self.memory.get(key)
+        if category is not None:
+            return category
+
+        try:
+            # One round-trip: fetch and bump the hit counter together
+            doc = await MerchantCategory.get_motor_collection().find_one_and_update(
+                {"key": key},
+                {"$inc": {"hits": 1}},
+                projection={"category": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            print(f"Category cache lookup failed: {e}")
+            doc = None
+
+        if doc is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self.memory.set(key, doc["category"])
+        return doc["category"]
+
+    async def set(self, key: str, category: str, source: str = "ai"):
+        self.memory.set(key, category)
+        now = datetime.now()
+        try:
+            await MerchantCategory.get_motor_collection().update_one(
+                {"key": key},
+                {
+                    "$set": {"category": category, "source": source, "updated_at": now},
+                    "$setOnInsert": {"hits": 0, "created_at": now},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print(f"Category cache write failed: {e}")
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Bulk lookup for imports: one query for everything the LRU doesn't hold."""
+        found: Dict[str, str] = {}
+        remaining = []
+        for key in keys:
+            category = self.memory.get(key)
+            if category is not None:
+                found[key] = category
+            else:
+                remaining.append(key)
+        if not remaining:
+            return found
+
+        try:
+            collection = MerchantCategory.get_motor_collection()
+            docs = await collection.find(
+                {"key": {"$in": remaining}}, {"key": 1, "category": 1}
+            ).to_list(length=None)
+            if docs:
+                await collection.update_many(
+                    {"key": {"$in": [d["key"] for d in docs]}}, {"$inc": {"hits": 1}}
+                )
+        except Exception as e:
+            print(f"Category cache lookup failed: {e}")
+            docs = []
+
+        for doc in docs:
+            found[doc["key"]] = doc["category"]
+            self.memory.set(doc["key"], doc["category"])
+        self.db_hits += len(docs)
+        self.misses += len(remaining) - len(docs)
+        return found
+
+    async def set_many(self, categories: Dict[str, str], source: str = "ai"):
+        if not categories:
+            return
+        now = datetime.now()
+        operations = []
+        for key, category in categories.items():
+            self.memory.set(key, category)
+            operations.append(UpdateOne(
+                {"key": key},
+                {
+                    "$set": {"category": category, "source": source, "updated_at": now},
+                    "$setOnInsert": {"hits": 0, "created_at": now},
+                },
+                upsert=True,
+            ))
+        try:
+            await MerchantCategory.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"Category cache write failed: {e}")
+
+    def stats(self) -> dict:
+        memory_hits = self.memory.hits
+        lookups = memory_hits + self.db_hits + self.misses
+        return {
+            "memory_hits": memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self.memory),
+        }
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple, Optional, Tuple
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.executors import run_parse
+from app.utils.metrics import EXTRACTION_LATENCY, timed
+
+SPOOL_CHUNK_BYTES = 1024 * 1024
+
+
+class ExtractedDocument(NamedTuple):
+    kind: str  # "pdf" | "csv"
+    text: str
+    units: int  # pages (pdf) or lines (csv) read
+    truncated: bool  # stopped early by the page/time/size budget
+    content_hash: str
+
+
+def file_kind(filename: Optional[str]) -> Optional[str]:
+    name = (filename or "").lower()
+    if name.endswith(".pdf"):
+        return "pdf"
+    if name.endswith(".csv"):
+        return "csv"
+    return None
+
+
+def extract_pdf_text(path: str, max_pages: int, time_budget: float) -> Tuple[str, int, bool]:
+    """Page-by-page PDF text extraction; runs in a worker process."""
+    import pypdf  # imported on first use (worker process), not at API boot
+
+    started = time.monotonic()
+    reader = pypdf.PdfReader(path)
+    total = len(reader.pages)
+    parts = []
+    for index in range(min(total, max_pages)):
+        if time.monotonic() - started > time_budget:
+            return "\n".join(parts), index, True
+        parts.append(reader.pages[index].extract_text() or "")
+    read = min(total, max_pages)
+    return "\n".join(parts), read, read < total
+
+
+def extract_csv_text(path: str, max_chars: int) -> Tuple[str, int, bool]:
+    """Streams a CSV line by line until the character budget is spent."""
+    parts, size, lines = [], 0, 0
+    with open(path, encoding="utf-8-sig", errors="replace", newline="") as f:
+        for line in f:
+            if size + len(line) > max_chars:
+                return "".join(parts), lines, True
+            parts.append(line)
+            size += len(line)
+            lines += 1
+    return "".join(parts), lines, False
+
+
+class DocumentExtractor:
+    """Shared text extraction for uploaded statements.
+
+    Uploads are spooled to disk while being hashed, so memory stays flat for
+    large files, and the extracted text is cached by content hash: asking a
+    second question about the same statement skips parsing entirely.
+    """
+
+    def __init__(self):
+        self.cache = TTLCache(maxsize=settings.EXTRACT_CACHE_SIZE, ttl=settings.EXTRACT_CACHE_TTL_SECONDS)
+
+    @asynccontextmanager
+    async def spooled(self, upload: UploadFile) -> AsyncIterator[Tuple[str, str]]:
+        """Copies an upload to a temp file while hashing it; yields (path, sha256)."""
+        digest = hashlib.sha256()
+        spool = tempfile.NamedTemporaryFile(suffix=os.path.splitext(upload.filename or "")[1], delete=False)
+        try:
+            with spool:
+                while True:
+                    chunk = await upload.read(SPOOL_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    await run_in_threadpool(spool.write, chunk)
+            yield spool.name, digest.hexdigest()
+        finally:
+            os.unlink(spool.name)
+
+    async def extract_upload(self, upload: UploadFile) -> Optional[ExtractedDocument]:
+        kind = file_kind(upload.filename)
+        if kind is None:
+            return None
+        async with self.spooled(upload) as (path, content_hash):
+            return await self.extract_path(path, kind, content_hash)
+
+    async def extract_bytes(self, data: bytes, filename: str) -> Optional[ExtractedDocument]:
+        kind = file_kind(filename)
+        if kind is None:
+            return None
+
+        content_hash = hashlib.sha256(data).hexdigest()
+        cached = self.cache.get((kind, content_hash))
+        if cached is not None:
+            return cached
+
+        spool = tempfile.NamedTemporaryFile(suffix=f".{kind}", delete=False)
+        try:
+            with spool:
+                await run_in_threadpool(spool.write, data)
+            return await self.extract_path(spool.name, kind, content_hash)
+        finally:
+            os.unlink(spool.name)
+
+    async def extract_path(self, path: str, kind: str, content_hash: str) -> ExtractedDocument:
+        cached = self.cache.get((kind, content_hash))
+        if cached is not None:
+            return cached
+
+        with timed(EXTRACTION_LATENCY, "extraction", kind=kind):
+            if kind == "pdf":
+                # The budget is checked between pages; a page that hangs past twice the
+                # budget gets its worker process killed and raises asyncio.TimeoutError
+                text, units, truncated = await run_parse(
+                    extract_pdf_text, path, settings.EXTRACT_PDF_MAX_PAGES, settings.EXTRACT_PDF_TIME_BUDGET_SECONDS,
+                    timeout=settings.EXTRACT_PDF_TIME_BUDGET_SECONDS * 2,
+                )
+            else:
+                text, units, truncated = await run_in_threadpool(
+                    extract_csv_text, path, settings.EXTRACT_CSV_MAX_CHARS
+                )
+
+        document = ExtractedDocument(kind, text, units, truncated, content_hash)
+        self.cache.set((kind, content_hash), document)
+        return document
+
+
+document_extractor = DocumentExtractor()
@@ -1,72 +1,171 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from pydantic import EmailStr
-import os
-from dotenv import load_dotenv
-from datetime import datetime
+import asyncio
 import calendar
+import html
+import random
+from datetime import datetime
+from email.message import EmailMessage
+from string import Template
+from typing import List, Optional, Tuple
 
-load_dotenv()
+import aiosmtplib
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
-    MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
-    MAIL_FROM=os.getenv("MAIL_USERNAME"),
-    MAIL_PORT=587,
-    MAIL_SERVER="smtp.gmail.com",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
+from app.config import settings
+
+# Compiled once at import; rendering is a substitute() per email
+_ALERT_HTML = Template("""
+    <div style="font-family: 'Helvetica Neue', Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e2e8f0; border-radius: 12px; background-color: #ffffff;">
+        <h2 style="color: $color; margin-top: 0;">$status: Budget Risk</h2>
+        <p style="font-size: 16px; color: #334155;">Hi <b>$user_name</b>,</p>
 
-async def send_budget_alert(email: EmailStr, user_name: str, spent: float, limit: float):
-    if limit == 0: return
+        <div style="background-color: #f8fafc; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 5px solid $color;">
+            <p style="margin: 5px 0; font-size: 18px;">🔥 <b>Used:</b> $percent%</p>
+            <p style="margin: 5px 0; color: #64748b;">(₹$spent of ₹$limit)</p>
+            <hr style="border: 0; border-top: 1px solid #e2e8f0; margin: 15px 0;">
+            <p style="margin: 0; font-weight: bold; color: $color;">$advice</p>
+        </div>
 
+        <p style="font-size: 14px; color: #94a3b8;">MoneyPal AI Coach • Automated Alert system</p>
+    </div>
+""")
+_ALERT_TEXT = Template("$status: you have used $percent% of your monthly budget (₹$spent of ₹$limit).\n$advice\n")
+_ALERT_SUBJECT = Template("⚠️ MoneyPal Alert: $status")
+
+# level -> (status line, colour)
+ALERT_STYLES = {
+    "warning": ("Warning", "#f59e0b"),  # Orange
+    "critical": ("CRITICAL PREDICTION", "#dc2626"),  # Red
+}
+
+
+def alert_level(spent: float, limit: float, today: Optional[datetime] = None) -> Optional[str]:
+    """None (safe), "warning" (>= 75% used) or "critical" (> 90% with more than 5 days left)."""
+    if not limit:
+        return None
     percent = (spent / limit) * 100
-    
+
     # --- PREDICTIVE LOGIC ---
-    today = datetime.now()
+    today = today or datetime.now()
     _, last_day = calendar.monthrange(today.year, today.month)
     days_left = last_day - today.day
-    
-    # Logic: If > 80% used AND more than 7 days left -> High Danger
-    status = "Warning"
-    color = "#f59e0b" # Orange
-    advice = "Try to cut down on dining out for a few days."
 
     if percent > 90 and days_left > 5:
-        status = "CRITICAL PREDICTION"
-        color = "#dc2626" # Red
+        return "critical"
+    if percent < 75:
+        return None  # Don't spam if they are safe
+    return "warning"
+
+
+def render_budget_alert(
+    email: str, user_name: str, spent: float, limit: float, level: str, today: Optional[datetime] = None
+) -> EmailMessage:
+    today = today or datetime.now()
+    status, color = ALERT_STYLES[level]
+    if level == "critical":
         advice = f"⚠️ At this rate, you will run out of money by {today.strftime('%b')} {today.day + 2}th!"
-    elif percent < 75:
-        return # Don't spam if they are safe
+    else:
+        advice = "Try to cut down on dining out for a few days."
 
-    html = f"""
-    <div style="font-family: 'Helvetica Neue', Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #e2e8f0; border-radius: 12px; background-color: #ffffff;">
-        <h2 style="color: {color}; margin-top: 0;">{status}: Budget Risk</h2>
-        <p style="font-size: 16px; color: #334155;">Hi <b>{user_name}</b>,</p>
-        
-        <div style="background-color: #f8fafc; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 5px solid {color};">
-            <p style="margin: 5px 0; font-size: 18px;">🔥 <b>Used:</b> {percent:.1f}%</p>
-            <p style="margin: 5px 0; color: #64748b;">(₹{spent:,.0f} of ₹{limit:,.0f})</p>
-            <hr style="border: 0; border-top: 1px solid #e2e8f0; margin: 15px 0;">
-            <p style="margin: 0; font-weight: bold; color: {color};">{advice}</p>
-        </div>
+    values = {
+        "status": status,
+        "color": color,
+        "user_name": user_name,
+        "percent": f"{(spent / limit) * 100:.1f}",
+        "spent": f"{spent:,.0f}",
+        "limit": f"{limit:,.0f}",
+        "advice": advice,
+    }
+    message = EmailMessage()
+    message["Subject"] = _ALERT_SUBJECT.substitute(values)
+    message["From"] = settings.MAIL_FROM or settings.MAIL_USERNAME or "alerts@moneypal.local"
+    message["To"] = email
+    message.set_content(_ALERT_TEXT.substitute(values))
+    message.add_alternative(_ALERT_HTML.substitute(values, user_name=html.escape(user_name)), subtype="html")
+    return message
 
-        <p style="font-size: 14px; color: #94a3b8;">MoneyPal AI Coach • Automated Alert system</p>
-    </div>
+
+class SMTPMailer:
+    """One long-lived SMTP connection, reused for every batch.
+
+    The TLS handshake and login happen once instead of per email. A dropped
+    connection (servers close idle ones) is reopened on the next send, and
+    transient failures are retried with exponential backoff and jitter.
     """
 
-    message = MessageSchema(
-        subject=f"⚠️ MoneyPal Alert: {status}",
-        recipients=[email],
-        body=html,
-        subtype=MessageType.html
-    )
+    def __init__(self):
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._lock = asyncio.Lock()
+        self.connections_opened = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        if self._smtp is not None and self._smtp.is_connected:
+            return self._smtp
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            start_tls=settings.MAIL_STARTTLS,
+            timeout=settings.MAIL_TIMEOUT_SECONDS,
+        )
+        await smtp.connect()
+        if settings.MAIL_USERNAME and settings.MAIL_PASSWORD:
+            await smtp.login(settings.MAIL_USERNAME, settings.MAIL_PASSWORD)
+        self._smtp = smtp
+        self.connections_opened += 1
+        return smtp
+
+    async def _send_one(self, message: EmailMessage):
+        for attempt in range(settings.ALERT_MAX_RETRIES + 1):
+            try:
+                smtp = await self._connect()
+                await smtp.send_message(message)
+                return
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                if all(r.code >= 500 for r in e.recipients) or attempt == settings.ALERT_MAX_RETRIES:
+                    raise
+            except aiosmtplib.SMTPResponseException as e:
+                # 5xx is permanent (bad address, rejected); only 4xx is worth retrying
+                if e.code >= 500 or attempt == settings.ALERT_MAX_RETRIES:
+                    raise
+            except (aiosmtplib.SMTPException, OSError):
+                await self._drop()
+                if attempt == settings.ALERT_MAX_RETRIES:
+                    raise
+            await asyncio.sleep(settings.ALERT_RETRY_BASE_SECONDS * (2 ** attempt) * (0.5 + random.random()))
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[Tuple[EmailMessage, Optional[Exception]]]:
+        """Sends every message over the shared connection; returns (message, error or None) pairs."""
+        results = []
+        async with self._lock:
+            for message in messages:
+                try:
+                    await self._send_one(message)
+                    results.append((message, None))
+                except Exception as e:
+                    results.append((message, e))
+        return results
+
+    async def _drop(self):
+        if self._smtp is not None:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+        self._smtp = None
+
+    async def aclose(self):
+        async with self._lock:
+            await self._drop()
+
+
+mailer = SMTPMailer()
+
 
-    fm = FastMail(conf)
-    try:
-        await fm.send_message(message)
+async def send_budget_alert(email: str, user_name: str, spent: float, limit: float):
+    """Immediate one-off alert. Prefer alert_engine.notify(), which dedupes and batches."""
+    level = alert_level(spent, limit)
+    if level is None:
+        return
+    [(_, error)] = await mailer.send_batch([render_budget_alert(email, user_name, spent, limit, level)])
+    if error:
+        print(f"❌ Email Failed: {error}")
+    else:
         print(f"📧 Alert sent to {email}")
-    except Exception as e:
-        print(f"❌ Email Failed: {e}")
\ No newline at end of file
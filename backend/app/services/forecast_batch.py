@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from app.config import settings
+from app.models.forecast import Forecast, ForecastJob
+from app.models.user import User
+from app.services.prediction_service import forecast_series
+from app.services.rollup_service import rollup_service
+
+
+class ForecastBatchJob:
+    """Precomputes every user's forecast into `forecasts`, chunk by chunk.
+
+    Users are walked in _id order and the checkpoint is saved after each chunk,
+    so a crashed or killed run picks up where it stopped. Only one chunk of
+    series is held in memory at a time.
+    """
+
+    def __init__(self, chunk_size: int = 200, workers: Optional[int] = None, name: str = "nightly"):
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.name = name
+
+    async def _checkpoint(self, restart: bool) -> ForecastJob:
+        job = await ForecastJob.find_one(ForecastJob.name == self.name)
+        if job and job.status == "running" and not restart:
+            print(f"↩️  Resuming after user {job.last_user_id} ({job.processed} done)")
+            return job
+        if job:
+            await job.delete()
+        job = ForecastJob(name=self.name)
+        await job.insert()
+        return job
+
+    async def run(self, restart: bool = False) -> ForecastJob:
+        job = await self._checkpoint(restart)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        done_this_run = 0
+        today = date.today()
+        since = datetime.now() - timedelta(days=settings.FORECAST_HISTORY_DAYS)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                query = {"_id": {"$gt": job.last_user_id}} if job.last_user_id else {}
+                users = await User.get_motor_collection().find(query, {"_id": 1}).sort("_id", 1).limit(self.chunk_size).to_list(length=None)
+                if not users:
+                    break
+                user_ids = [u["_id"] for u in users]
+
+                series = await rollup_service.daily_debits_many(user_ids, since)
+                versions = await rollup_service.last_updated_many(user_ids)
+
+                # Fit the whole chunk in parallel across cores
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(pool, forecast_series, series.get(uid, {}), today) for uid in user_ids),
+                    return_exceptions=True,
+                )
+
+                operations = []
+                for uid, result in zip(user_ids, results):
+                    if isinstance(result, Exception):
+                        job.failed += 1
+                        print(f"❌ Forecast failed for {uid}: {result}")
+                        continue
+                    operations.append(UpdateOne(
+                        {"user_id": uid},
+                        {"$set": {"version": versions.get(uid), "result": result, "computed_at": datetime.now()}},
+                        upsert=True,
+                    ))
+                if operations:
+                    await Forecast.get_motor_collection().bulk_write(operations, ordered=False)
+
+                job.last_user_id = user_ids[-1]
+                job.processed += len(user_ids)
+                await job.save()
+
+                done_this_run += len(user_ids)
+                elapsed = time.perf_counter() - started
+                print(f"📈 {job.processed} users forecast ({done_this_run / elapsed:.1f} users/sec)")
+
+        job.status = "completed"
+        job.finished_at = datetime.now()
+        await job.save()
+
+        elapsed = time.perf_counter() - started
+        rate = done_this_run / elapsed if elapsed else 0.0
+        print(f"✅ Forecast job done: {done_this_run} users in {elapsed:.1f}s ({rate:.1f} users/sec, {job.failed} failed)")
+        return job
@@ -1,6 +1,40 @@
 from datetime import datetime
-from typing import Dict, List
-from app.models.goal import Goal
+from typing import Dict, List, Optional
+from beanie import PydanticObjectId
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from app.models.goal import Goal, GoalContribution
+
+def contribution_pipeline(amount: float) -> List[Dict]:
+    """Update pipeline: add `amount`, then mark newly reached milestones and completion.
+
+    The second stage sees the incremented balance, so the whole thing is one
+    atomic read-modify-write on the server. Percentages are compared as
+    current * 100 >= pct * target, which avoids dividing by a zero target.
+    """
+    return [
+        {"$set": {"current_amount": {"$add": ["$current_amount", amount]}}},
+        {"$set": {
+            "milestones": {"$map": {
+                "input": {"$ifNull": ["$milestones", []]},
+                "as": "m",
+                "in": {"$cond": [
+                    {"$and": [
+                        {"$ne": ["$$m.reached", True]},
+                        {"$gte": [
+                            {"$multiply": ["$current_amount", 100]},
+                            {"$multiply": ["$$m.percentage", "$target_amount"]},
+                        ]},
+                    ]},
+                    {"$mergeObjects": ["$$m", {"reached": True, "date": "$$NOW"}]},
+                    "$$m",
+                ]},
+            }},
+            "status": {"$cond": [{"$gte": ["$current_amount", "$target_amount"]}, "completed", "$status"]},
+        }},
+    ]
+
 
 class GoalService:
     async def create_goal(
@@ -37,22 +71,31 @@ class GoalService:
         await goal.insert()
         return goal
 
-    async def update_progress(self, goal_id: str, amount_added: float) -> Goal:
-        goal = await Goal.get(goal_id)
-        if not goal:
+    async def update_progress(self, goal_id: str, amount_added: float, user_id: PydanticObjectId) -> Optional[Goal]:
+        """Adds funds in one atomic update; milestones and status are resolved by the server.
+
+        Concurrent contributions can't overwrite each other, and each one is
+        recorded in the goal_contributions ledger with the balance it produced.
+        """
+        try:
+            goal_oid = ObjectId(goal_id)
+        except InvalidId:
             return None
-            
-        goal.current_amount += amount_added
-        
-        progress_pct = (goal.current_amount / goal.target_amount) * 100
-        
-        for m in goal.milestones:
-            if not m["reached"] and progress_pct >= m["percentage"]:
-                m["reached"] = True
-                m["date"] = datetime.now()
-        
-        if goal.current_amount >= goal.target_amount:
-            goal.status = "completed"
-            
-        await goal.save()
-        return goal
\ No newline at end of file
+
+        doc = await Goal.get_motor_collection().find_one_and_update(
+            {"_id": goal_oid, "user_id": user_id},
+            contribution_pipeline(amount_added),
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+        goal = Goal.model_validate(doc)
+
+        try:
+            await GoalContribution(
+                goal_id=goal.id, user_id=user_id, amount=amount_added, balance_after=goal.current_amount
+            ).insert()
+        except Exception as e:
+            # The funds are already applied; a missing ledger row must not fail the request
+            print(f"⚠️ Goal ledger write failed for {goal.id}: {e}")
+        return goal
@@ -0,0 +1,132 @@
+import hashlib
+import time
+from collections import Counter
+from itertools import islice
+from typing import BinaryIO, Iterator, List, Optional
+
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.transaction import Transaction
+from app.services.categorization_service import TransactionCategorizer
+from app.services.category_cache import normalize_text
+from app.services.rollup_service import rollup_service
+from app.services.statement_parser import StatementRow, iter_statement_rows
+
+
+def row_fingerprint(user_id: PydanticObjectId, row: StatementRow, occurrence: int = 0) -> str:
+    """Stable id for a statement line, so re-importing the same statement is a no-op.
+
+    `occurrence` separates genuinely repeated lines in one file (two ₹20 chais on
+    the same day) from the same line seen again in a later upload.
+    """
+    raw = "|".join([
+        str(user_id),
+        row.date.strftime("%Y-%m-%d"),
+        f"{row.amount:.2f}",
+        row.transaction_type,
+        normalize_text(row.description, row.merchant),
+        str(occurrence),
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _take(rows: Iterator[Optional[StatementRow]], size: int) -> List[Optional[StatementRow]]:
+    return list(islice(rows, size))
+
+
+class StatementImporter:
+    def __init__(self, categorizer: TransactionCategorizer):
+        self.categorizer = categorizer
+
+    @staticmethod
+    async def _insert_new(docs: List[Transaction]) -> List[Transaction]:
+        """Inserts docs, returning the ones actually written.
+
+        The distinct() check above misses lines a concurrent upload of the same
+        statement (double-click, client retry) inserted in the meantime; the
+        unique user_import_hash_unique index rejects those, and they count as duplicates.
+        """
+        try:
+            await Transaction.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(err.get("code") != 11000 for err in errors):
+                raise
+            rejected = {err["index"] for err in errors}
+            return [doc for i, doc in enumerate(docs) if i not in rejected]
+        return docs
+
+    async def import_file(self, user_id: PydanticObjectId, stream: BinaryIO, filename: str) -> dict:
+        """Parses, dedupes, categorizes and bulk-inserts a statement chunk by chunk.
+
+        Raises ValueError for unsupported file types.
+        """
+        started = time.perf_counter()
+        rows = iter_statement_rows(stream, filename)
+        chunk_size = settings.IMPORT_CHUNK_SIZE
+
+        summary = {
+            "filename": filename,
+            "rows_parsed": 0,
+            "rows_skipped": 0,
+            "duplicates": 0,
+            "inserted": 0,
+            "categorized_by": Counter(),
+        }
+        seen = Counter()
+
+        while True:
+            # Parsing (CSV decode / PDF text extraction) stays off the event loop
+            chunk = await run_in_threadpool(_take, rows, chunk_size)
+            if not chunk:
+                break
+
+            fresh = []
+            for row in chunk:
+                if row is None:
+                    summary["rows_skipped"] += 1
+                    continue
+                summary["rows_parsed"] += 1
+                base = row_fingerprint(user_id, row)
+                fingerprint = row_fingerprint(user_id, row, seen[base])
+                seen[base] += 1
+                fresh.append((fingerprint, row))
+
+            # Drop lines already imported by an earlier upload
+            existing = set(await Transaction.get_motor_collection().distinct(
+                "import_hash",
+                {"user_id": user_id, "import_hash": {"$in": [f for f, _ in fresh]}},
+            )) if fresh else set()
+            fresh = [(f, row) for f, row in fresh if f not in existing]
+            summary["duplicates"] += len(existing)
+            if not fresh:
+                continue
+
+            categories = await self.categorizer.categorize_many(
+                [(row.description, row.merchant) for _, row in fresh]
+            )
+            docs = []
+            for (fingerprint, row), cat_result in zip(fresh, categories):
+                summary["categorized_by"][cat_result["method"]] += 1
+                docs.append(Transaction(
+                    user_id=user_id,
+                    amount=row.amount,
+                    description=row.description,
+                    merchant=row.merchant or "Unknown",
+                    category=cat_result["category"],
+                    transaction_type=row.transaction_type,
+                    payment_method="statement",
+                    date=row.date,
+                    import_hash=fingerprint,
+                ))
+            inserted = await self._insert_new(docs)
+            summary["duplicates"] += len(docs) - len(inserted)
+            await rollup_service.apply(inserted)
+            summary["inserted"] += len(inserted)
+
+        summary["categorized_by"] = dict(summary["categorized_by"])
+        summary["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return summary
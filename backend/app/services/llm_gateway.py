@@ -0,0 +1,134 @@
+import asyncio
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+from app.utils.metrics import LLM_LATENCY, timed
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+
+class LLMGateway:
+    """One pooled, non-blocking Groq client shared by every route and service."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.api_key = api_key or settings.GROQ_API_KEY
+        self.model = model or settings.LLM_MODEL
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._client: Optional["AsyncGroq"] = None
+        # Caps in-flight completions so a burst can't exhaust the pool or the quota
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def startup(self):
+        """Builds the client inside the app lifespan, so the first request doesn't pay for it."""
+        self._get_client()
+
+    def _get_client(self) -> "AsyncGroq":
+        # Created lazily so the keep-alive pool binds to the running event loop
+        if self._client is None:
+            # The SDK is imported here, not at module load, to keep worker boot fast
+            from groq import AsyncGroq
+
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+            )
+            self._client = AsyncGroq(api_key=self.api_key, base_url=settings.LLM_BASE_URL, http_client=self._http)
+        return self._client
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Runs one chat completion and returns the reply text.
+
+        The timeout covers the wait for a concurrency slot as well as the request,
+        so callers get a hard upper bound. Raises asyncio.TimeoutError or the Groq
+        API error; callers decide on the user-facing fallback.
+        """
+        client = self._get_client()
+        timeout = timeout or self.timeout
+
+        async def _call() -> str:
+            async with self._semaphore:
+                completion = await client.chat.completions.create(
+                    messages=messages,
+                    model=model or self.model,
+                    temperature=temperature,
+                    timeout=timeout,
+                )
+            return completion.choices[0].message.content
+
+        with timed(LLM_LATENCY, "llm", client="gateway", mode="complete", outcome="ok"):
+            return await asyncio.wait_for(_call(), timeout=timeout)
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Runs one chat completion and yields the reply text as it is generated.
+
+        `timeout` bounds the wait for the first token (slot + request); after that
+        each chunk must arrive within LLM_STREAM_IDLE_SECONDS. The concurrency slot
+        is held until the stream is exhausted or the caller stops iterating.
+        """
+        client = self._get_client()
+        timeout = timeout or self.timeout
+
+        with timed(LLM_LATENCY, "llm", client="gateway", mode="stream", outcome="ok"):
+            async for token in self._stream(client, messages, model, temperature, timeout):
+                yield token
+
+    async def _stream(self, client, messages, model, temperature, timeout) -> AsyncIterator[str]:
+        async with self._semaphore:
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    messages=messages,
+                    model=model or self.model,
+                    temperature=temperature,
+                    timeout=timeout,
+                    stream=True,
+                ),
+                timeout=timeout,
+            )
+            chunks = response.__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=settings.LLM_STREAM_IDLE_SECONDS)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Closes the upstream connection if the client went away mid-reply
+                await response.close()
+
+    async def aclose(self):
+        if self._http is not None:
+            await self._http.aclose()
+        self._http = None
+        self._client = None
+
+
+llm_gateway = LLMGateway()
@@ -0,0 +1,202 @@
+import time
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.services.category_cache import normalize_text
+
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parent.parent / "data" / "local_classifier.npz"
+DEFAULT_FEATURES = 2 ** 18
+
+
+@lru_cache(maxsize=65536)
+def _word_buckets(word: str, mask: int) -> Tuple[int, ...]:
+    # Merchant words repeat across texts, so their char grams are hashed once
+    padded = f" {word} "
+    grams = [word] + [padded[i:i + n] for n in (3, 4, 5) for i in range(len(padded) - n + 1)]
+    return tuple(zlib.crc32(gram.encode()) & mask for gram in grams)
+
+
+def features(key: str, n_features: int = DEFAULT_FEATURES) -> Dict[int, float]:
+    """Hashed, L2-normalized bag of words, word pairs and char 3-5 grams of a normalized key.
+
+    crc32 rather than hash(): the buckets have to match between the process
+    that trained the model and every worker that serves it.
+    """
+    mask = n_features - 1
+    words = key.split()
+    counts: Dict[int, float] = {}
+    for word in words:
+        for bucket in _word_buckets(word, mask):
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    for a, b in zip(words, words[1:]):
+        bucket = zlib.crc32(f"{a}_{b}".encode()) & mask
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    norm = sum(v * v for v in counts.values()) ** 0.5
+    return {k: v / norm for k, v in counts.items()} if norm else {}
+
+
+class LocalClassifier:
+    """Multinomial logistic regression over hashed n-grams, in NumPy.
+
+    Trained offline by train_categorizer.py from stored transactions and past
+    AI labels; serving is a sparse dot product, tens of microseconds per text,
+    so only low-confidence texts need to go to the LLM.
+    """
+
+    def __init__(self, classes: Sequence[str], weights, bias, meta: Optional[dict] = None):
+        self.classes = list(classes)
+        self.weights = weights  # (n_features, n_classes) float32
+        self.bias = bias
+        self.n_features = weights.shape[0]
+        self.meta = meta or {}
+        self.predictions = 0
+        self.confident = 0
+
+    # --- persistence ---
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH) -> Optional["LocalClassifier"]:
+        """None (and the LLM keeps handling every miss) until a model has been trained."""
+        if not Path(path).exists():
+            print(f"ℹ️ No local category model at {path}; run train_categorizer.py to create one")
+            return None
+        import json
+
+        import numpy as np
+
+        with np.load(path) as data:
+            model = cls(
+                [str(c) for c in data["classes"]], data["weights"], data["bias"], json.loads(str(data["meta"])),
+            )
+        print(f"🧠 Local category model loaded ({len(model.classes)} classes, "
+              f"{model.meta.get('samples', 0):,} training texts)")
+        return model
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        import json
+
+        import numpy as np
+
+        # Sparse-ish weights compress well (most hashed buckets are never touched)
+        np.savez_compressed(
+            path, classes=np.array(self.classes), weights=self.weights, bias=self.bias, meta=json.dumps(self.meta),
+        )
+
+    # --- inference ---
+
+    def _scores(self, row: Dict[int, float]):
+        import numpy as np
+
+        if not row:
+            return self.bias
+        indices = np.fromiter(row.keys(), dtype=np.int64, count=len(row))
+        values = np.fromiter(row.values(), dtype=np.float32, count=len(row))
+        return values @ self.weights[indices] + self.bias
+
+    def predict_key(self, key: str) -> Tuple[str, float]:
+        """(category, probability) for a normalized key (see category_cache.normalize_text)."""
+        import numpy as np
+
+        scores = self._scores(features(key, self.n_features))
+        best = int(np.argmax(scores))
+        probability = 1.0 / float(np.exp(scores - scores[best]).sum())
+        self.predictions += 1
+        return self.classes[best], probability
+
+    def predict(self, description: str, merchant: Optional[str] = None) -> Tuple[str, float]:
+        return self.predict_key(normalize_text(description, merchant))
+
+    def confident_or_none(self, key: str, threshold: float) -> Optional[Tuple[str, float]]:
+        category, probability = self.predict_key(key)
+        if probability < threshold:
+            return None
+        self.confident += 1
+        return category, probability
+
+    def stats(self) -> dict:
+        return {
+            "predictions": self.predictions,
+            "confident": self.confident,
+            "confident_rate": round(self.confident / self.predictions, 4) if self.predictions else 0.0,
+            "classes": len(self.classes),
+            "training_samples": self.meta.get("samples", 0),
+            "holdout_accuracy": self.meta.get("holdout_accuracy", 0.0),
+        }
+
+
+def train(
+    keys: List[str],
+    labels: List[str],
+    n_features: int = DEFAULT_FEATURES,
+    epochs: int = 5,
+    batch_size: int = 256,
+    learning_rate: float = 0.5,
+    l2: float = 1e-6,
+    seed: int = 0,
+) -> LocalClassifier:
+    """Fits the model with mini-batch AdaGrad on the softmax loss.
+
+    Only the weight rows a batch touches are updated, so an epoch costs
+    O(non-zero features), not O(n_features).
+    """
+    import numpy as np
+
+    classes = sorted(set(labels))
+    class_index = {c: i for i, c in enumerate(classes)}
+    rows = [features(key, n_features) for key in keys]
+    keep = [i for i, row in enumerate(rows) if row]
+    lengths = np.array([len(rows[i]) for i in keep], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    indices = np.fromiter((k for i in keep for k in rows[i]), dtype=np.int64, count=int(offsets[-1]))
+    values = np.fromiter((v for i in keep for v in rows[i].values()), dtype=np.float32, count=int(offsets[-1]))
+    y = np.array([class_index[labels[i]] for i in keep], dtype=np.int64)
+
+    n_classes = len(classes)
+    weights = np.zeros((n_features, n_classes), dtype=np.float32)
+    bias = np.zeros(n_classes, dtype=np.float32)
+    weight_history = np.zeros_like(weights)
+    bias_history = np.zeros_like(bias)
+    rng = np.random.default_rng(seed)
+
+    started = time.perf_counter()
+    for _ in range(epochs):
+        order = rng.permutation(len(keep))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            # Gather the batch's sparse rows into flat arrays
+            batch_lengths = lengths[batch]
+            segment_starts = np.concatenate(([0], np.cumsum(batch_lengths)[:-1]))
+            positions = np.arange(batch_lengths.sum()) + np.repeat(offsets[batch] - segment_starts, batch_lengths)
+            batch_indices, batch_values = indices[positions], values[positions]
+            owner = np.repeat(np.arange(len(batch)), batch_lengths)
+
+            scores = np.add.reduceat(weights[batch_indices] * batch_values[:, None], segment_starts, axis=0) + bias
+            scores -= scores.max(axis=1, keepdims=True)
+            probabilities = np.exp(scores)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            probabilities[np.arange(len(batch)), y[batch]] -= 1.0
+            delta = probabilities / len(batch)
+
+            # Sum the gradient per distinct bucket, then update only those rows
+            gradient = batch_values[:, None] * delta[owner]
+            order_by_bucket = np.argsort(batch_indices, kind="stable")
+            sorted_buckets = batch_indices[order_by_bucket]
+            firsts = np.flatnonzero(np.concatenate(([True], sorted_buckets[1:] != sorted_buckets[:-1])))
+            touched = sorted_buckets[firsts]
+            gradient = np.add.reduceat(gradient[order_by_bucket], firsts, axis=0) + l2 * weights[touched]
+
+            weight_history[touched] += gradient ** 2
+            weights[touched] -= learning_rate * gradient / (np.sqrt(weight_history[touched]) + 1e-8)
+            bias_gradient = delta.sum(axis=0)
+            bias_history += bias_gradient ** 2
+            bias -= learning_rate * bias_gradient / (np.sqrt(bias_history) + 1e-8)
+
+    meta = {
+        "samples": len(keep),
+        "epochs": epochs,
+        "n_features": n_features,
+        "train_seconds": round(time.perf_counter() - started, 2),
+    }
+    return LocalClassifier(classes, weights, bias, meta)
@@ -0,0 +1,259 @@
+import json
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.categorization_service import CATEGORY_OPTIONS
+from app.services.llm_gateway import llm_gateway
+from app.services.merchant_matcher import MerchantMatcher
+from app.services.statement_parser import parse_date
+
+# "₹500", "rs. 1,200", "450 rupees", "2.5k", "1.2 lakh", "500/-"
+_AMOUNT_RE = re.compile(
+    r"(?P<pre>₹|\brs\.?|\binr)?\s*"
+    r"(?P<num>\d[\d,]*(?:\.\d+)?)"
+    r"(?:\s*(?P<unit>k|lakhs?|lacs?|l)\b)?"
+    r"(?P<post>\s*(?:rupees|rs\.?|inr|bucks|/-))?",
+    re.I,
+)
+_UNIT_MULTIPLIERS = {"k": 1_000, "l": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000}
+
+# "on 5 jan", "on 05/01/2024" - explicit dates are checked before amounts so their digits aren't read as money
+_EXPLICIT_DATE_RE = re.compile(
+    r"\b(?:on\s+)?(?P<date>\d{1,2}/\d{1,2}(?:/\d{2,4})?|\d{1,2}-\d{1,2}-\d{2,4}|\d{1,2}\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*(?:\s+\d{4})?)\b",
+    re.I,
+)
+_DAYS_AGO_RE = re.compile(r"\b(?P<n>\d+|a|one|two|three)\s+days?\s+ago\b", re.I)
+_WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_LAST_WEEKDAY_RE = re.compile(r"\b(?:last|on)\s+(?P<day>" + "|".join(_WEEKDAYS) + r")\b", re.I)
+_SMALL_NUMBERS = {"a": 1, "one": 1, "two": 2, "three": 3}
+
+_CREDIT_WORDS = ("received", "receive", "got", "credited", "earned", "salary", "refund", "cashback", "income", "bonus", "returned")
+_DEBIT_WORDS = ("spent", "spend", "paid", "pay", "bought", "buy", "ordered", "gave", "purchased", "bill", "recharged")
+# Verbs carry the type, not the description
+_ACTION_WORDS = set(_DEBIT_WORDS) - {"bill"} | {"received", "receive", "got", "credited", "earned", "returned"}
+
+# "at Starbucks", "to Ramesh", "from Amazon" -> who; "on dinner", "for groceries" -> what
+_MERCHANT_PREPS = ("at", "to", "from")
+_WHAT_PREPS = ("on", "for")
+_PHRASE_STOPWORDS = {
+    "today", "yesterday", "tonight", "last", "this", "ago", "days", "day", "using", "via", "with", "by", "and",
+    "the", "my", "a", "an", "rs", "rs.", "inr", "rupees", "bucks", "upi", "cash", "card", "gpay", "paytm",
+} | set(_WEEKDAYS) | set(_MERCHANT_PREPS) | set(_WHAT_PREPS)
+_WORD_RE = re.compile(r"[a-z][\w&'.-]*|\S+", re.I)
+
+# Everyday words the merchant rules don't cover ("dinner", "auto", "medicine")
+CATEGORY_WORDS: Dict[str, Tuple[str, ...]] = {
+    "Food & Dining": ("dinner", "lunch", "breakfast", "coffee", "chai", "tea", "snacks", "pizza", "burger", "biryani", "restaurant", "cafe", "food", "dosa", "meal"),
+    "Transport": ("auto", "cab", "taxi", "bus", "metro", "train ticket", "parking", "toll", "diesel"),
+    "Groceries": ("groceries", "grocery", "vegetables", "veggies", "milk", "fruits", "kirana", "supermarket"),
+    "Shopping": ("shoes", "clothes", "shirt", "jeans", "dress", "gadget", "headphones", "watch", "gift"),
+    "Utilities": ("electricity", "water bill", "gas bill", "internet", "broadband", "recharge", "phone bill", "mobile bill"),
+    "Health": ("medicine", "medicines", "doctor", "hospital", "clinic", "gym", "dentist", "tablets"),
+    "Entertainment": ("movie", "movies", "concert", "game", "games", "subscription", "party"),
+    "Education": ("books", "book", "course", "tuition", "fees", "exam"),
+    "Travel": ("flight", "hotel", "trip", "vacation", "holiday"),
+    "Housing": ("rent", "maintenance", "society"),
+    "Investments": ("mutual fund", "stocks", "shares", "fd", "gold"),
+    "Income": ("salary", "freelance", "bonus", "stipend"),
+}
+
+
+def _word_in(word: str, text: str) -> bool:
+    return re.search(rf"(?<![a-z]){re.escape(word)}(?![a-z])", text) is not None
+
+
+def _is_filler(word: str) -> bool:
+    return word in _PHRASE_STOPWORDS or not word[0].isalpha()
+
+
+class MagicParser:
+    """Turns "Spent 500 on dinner at Truffles yesterday" into a transaction draft.
+
+    Rules run first (amount, type, relative date, merchant/what phrase, keyword
+    category) and score their own confidence; only drafts under
+    MAGIC_PARSE_MIN_CONFIDENCE go to the LLM. Every result says which path
+    produced it in `parsed_by`.
+    """
+
+    def __init__(self, matcher: MerchantMatcher):
+        self.matcher = matcher
+        self.served = Counter()
+
+    # --- pieces ---
+
+    def _extract_date(self, text: str, now: datetime) -> Tuple[Optional[datetime], str]:
+        today = now.replace(hour=12, minute=0, second=0, microsecond=0)
+        lowered = text.lower()
+        if "day before yesterday" in lowered:
+            return today - timedelta(days=2), lowered.replace("day before yesterday", " ")
+        if _word_in("yesterday", lowered):
+            return today - timedelta(days=1), lowered.replace("yesterday", " ")
+        if _word_in("today", lowered) or _word_in("tonight", lowered):
+            return now, lowered
+
+        match = _DAYS_AGO_RE.search(lowered)
+        if match:
+            n = match.group("n")
+            days = _SMALL_NUMBERS.get(n) or int(n)
+            return today - timedelta(days=days), lowered[:match.start()] + " " + lowered[match.end():]
+
+        match = _LAST_WEEKDAY_RE.search(lowered)
+        if match:
+            back = (today.weekday() - _WEEKDAYS.index(match.group("day"))) % 7 or 7
+            return today - timedelta(days=back), lowered[:match.start()] + " " + lowered[match.end():]
+
+        match = _EXPLICIT_DATE_RE.search(lowered)
+        if match:
+            raw = re.sub(r"([a-z]{3})[a-z]*", r"\1", match.group("date"))  # "january" -> "jan"
+            parsed = parse_date(raw) or parse_date(f"{raw} {now.year}") or parse_date(f"{raw}/{now.year}")
+            if parsed:
+                return parsed.replace(hour=12), lowered[:match.start()] + " " + lowered[match.end():]
+
+        return None, lowered
+
+    def _extract_amount(self, text: str) -> Tuple[Optional[float], bool]:
+        """(amount, unambiguous)."""
+        marked, bare = [], []
+        for match in _AMOUNT_RE.finditer(text):
+            try:
+                value = float(match.group("num").replace(",", ""))
+            except ValueError:
+                continue
+            unit = (match.group("unit") or "").lower()
+            value *= _UNIT_MULTIPLIERS.get(unit, 1)
+            if match.group("pre") or match.group("post") or unit:
+                marked.append(value)
+            else:
+                bare.append(value)
+        if len(marked) == 1:
+            return marked[0], True
+        if not marked and len(bare) == 1:
+            return bare[0], True
+        candidates = marked or bare
+        return (max(candidates), False) if candidates else (None, False)
+
+    def _extract_type(self, text: str) -> str:
+        first_credit = min((m.start() for w in _CREDIT_WORDS for m in [re.search(rf"\b{w}\b", text)] if m), default=None)
+        first_debit = min((m.start() for w in _DEBIT_WORDS for m in [re.search(rf"\b{w}\b", text)] if m), default=None)
+        if first_credit is not None and (first_debit is None or first_credit < first_debit):
+            return "credit"
+        return "debit"
+
+    def _extract_phrases(self, text: str) -> Tuple[Optional[str], Optional[str], str]:
+        """(merchant, what, leftover words) from "at/to/from X" and "on/for Y"."""
+        words = _WORD_RE.findall(text)
+        merchant, what, leftover = None, None, []
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if word in _MERCHANT_PREPS or word in _WHAT_PREPS:
+                phrase = []
+                j = i + 1
+                while j < len(words) and len(phrase) < 4 and not _is_filler(words[j]):
+                    phrase.append(words[j])
+                    j += 1
+                if phrase:
+                    if word in _MERCHANT_PREPS:
+                        merchant = merchant or " ".join(phrase)
+                    else:
+                        what = what or " ".join(phrase)
+                i = j
+                continue
+            if not _is_filler(word) and word not in _ACTION_WORDS:
+                leftover.append(word)
+            i += 1
+        return merchant, what, " ".join(leftover[:5])
+
+    def _category(self, text: str) -> Optional[str]:
+        rule = self.matcher.match(text)
+        # The automaton matches substrings; "ola" must not fire inside "chocolate"
+        if rule and _word_in(rule.keyword, text):
+            return rule.category
+        for category, words in CATEGORY_WORDS.items():
+            if any(_word_in(word, text) for word in words):
+                return category
+        return None
+
+    # --- paths ---
+
+    def parse(self, text: str, now: Optional[datetime] = None) -> dict:
+        """Rule-based draft with a 0-1 confidence; never calls the network."""
+        now = now or datetime.now()
+        date, rest = self._extract_date(text, now)
+        amount, unambiguous = self._extract_amount(rest)
+        lowered = text.lower()
+        merchant, what, leftover = self._extract_phrases(_AMOUNT_RE.sub(" ", rest))
+        transaction_type = self._extract_type(lowered)
+        category = self._category(lowered)
+        if category is None and transaction_type == "credit":
+            category = "Income"
+
+        description = what or leftover or merchant
+        confidence = 0.0
+        if amount:
+            confidence += 0.5 if unambiguous else 0.2
+        if category:
+            confidence += 0.3
+        if description:
+            confidence += 0.2
+
+        return {
+            "amount": amount,
+            "description": (description or text.strip()[:60]).strip().capitalize(),
+            "merchant": merchant.title() if merchant else None,
+            "category": category or "General",
+            "transaction_type": transaction_type,
+            "date": date or now,
+            "confidence": round(confidence, 2),
+            "parsed_by": "rules",
+        }
+
+    async def llm_parse(self, text: str) -> dict:
+        prompt = f"""
+        Extract transaction from: "{text}"
+        Return JSON with: amount (number), description (string), merchant (string or null),
+        category (one of {CATEGORY_OPTIONS}), transaction_type ("debit" or "credit")
+        """
+        content = await llm_gateway.complete(
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.1,
+        )
+        # Take the first {...} block whether or not it's fenced in ``` markers
+        match = re.search(r"\{.*\}", content, re.S)
+        if not match:
+            raise ValueError(f"No JSON object in LLM reply: {content[:80]!r}")
+        data = json.loads(match.group(0))
+        return {
+            "amount": float(data["amount"]) if data.get("amount") is not None else None,
+            "description": data.get("description"),
+            "merchant": data.get("merchant"),
+            "category": data.get("category") or "General",
+            "transaction_type": "credit" if str(data.get("transaction_type", "")).lower() == "credit" else "debit",
+            "parsed_by": "llm",
+        }
+
+    async def parse_text(self, text: str, now: Optional[datetime] = None) -> dict:
+        draft = self.parse(text, now)
+        if draft["confidence"] >= settings.MAGIC_PARSE_MIN_CONFIDENCE:
+            self.served["rules"] += 1
+            return draft
+
+        try:
+            llm_draft = await self.llm_parse(text)
+        except Exception as e:
+            # The rules draft is still better than an error for the form
+            print(f"Magic parse LLM fallback failed: {e}")
+            self.served["rules_fallback"] += 1
+            return draft
+
+        self.served["llm"] += 1
+        # The LLM isn't told today's date; keep the rule-based one
+        merged = {**draft, **{k: v for k, v in llm_draft.items() if v not in (None, "")}}
+        merged["confidence"] = max(draft["confidence"], 0.85)
+        return merged
+
+    def stats(self) -> dict:
+        return dict(self.served)
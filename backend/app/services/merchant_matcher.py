@@ -0,0 +1,108 @@
+import csv
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent.parent / "data" / "merchant_rules.csv"
+
+
+class MerchantRule(NamedTuple):
+    keyword: str
+    category: str
+    priority: int = 0
+
+
+def load_rules(path: Union[str, Path] = DEFAULT_RULES_PATH) -> List[MerchantRule]:
+    """Reads `keyword,category[,priority]` rows from a CSV rules file."""
+    rules = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            keyword = (row.get("keyword") or "").strip().lower()
+            if not keyword:
+                continue
+            rules.append(MerchantRule(
+                keyword=keyword,
+                category=row["category"].strip(),
+                priority=int(row.get("priority") or 0),
+            ))
+    return rules
+
+
+class MerchantMatcher:
+    """Aho-Corasick automaton over merchant keywords.
+
+    Built once, then every lookup is a single left-to-right pass over the text,
+    independent of how many rules are loaded. When several keywords occur the
+    highest priority wins, then the longest keyword, then the earliest rule.
+    """
+
+    def __init__(self, rules: Iterable[MerchantRule]):
+        self.rules: List[MerchantRule] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Best rule (index into self.rules) ending at each state, fail chain included
+        self._out: List[Optional[int]] = [None]
+        self._rank: List[tuple] = []
+
+        for rule in rules:
+            self._add(rule)
+        self._build_links()
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path] = DEFAULT_RULES_PATH) -> "MerchantMatcher":
+        return cls(load_rules(path))
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _better(self, a: Optional[int], b: Optional[int]) -> Optional[int]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return a if self._rank[a] >= self._rank[b] else b
+
+    def _add(self, rule: MerchantRule):
+        index = len(self.rules)
+        self.rules.append(rule)
+        self._rank.append((rule.priority, len(rule.keyword), -index))
+
+        state = 0
+        for ch in rule.keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+            state = nxt
+        self._out[state] = self._better(self._out[state], index)
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Breadth-first order guarantees the fail target is already resolved
+                self._out[nxt] = self._better(self._out[nxt], self._out[self._fail[nxt]])
+
+    def match(self, text: str) -> Optional[MerchantRule]:
+        """Returns the winning rule for already-lowercased text, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        better = self._better
+        state = 0
+        best = None
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state] is not None:
+                best = better(best, out[state])
+        return self.rules[best] if best is not None else None
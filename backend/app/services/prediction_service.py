@@ -1,42 +1,165 @@
-import pandas as pd
-from prophet import Prophet
-from datetime import datetime
-from typing import List, Dict
+import asyncio
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.models.forecast import Forecast
+from app.utils.cache import TTLCache
+from app.utils.executors import get_process_pool
+
+# Recent days dominate the trend fit: weight halves every TREND_HALF_LIFE_DAYS
+TREND_HALF_LIFE_DAYS = 14
+
+
+def forecast_series(daily: Dict[str, float], today: Optional[date] = None) -> Dict:
+    """Forecast this month's spend from a {"YYYY-MM-DD": debit total} series.
+
+    Pure function so it can run in a worker process. Users with fewer than
+    FORECAST_MIN_PROPHET_DAYS days of history get the NumPy trend model and
+    never pay Prophet's import and fit cost.
+    """
+    today = today or date.today()
+    if not daily:
+        return {"predicted_total": 0, "status": "insufficient_data"}
+
+    # Need at least a few data points
+    if len(daily) < 5:
+        return {"predicted_total": float(sum(daily.values())), "status": "insufficient_data"}
+
+    if len(daily) < settings.FORECAST_MIN_PROPHET_DAYS:
+        return _trend_forecast(daily, today)
+    return _prophet_forecast(daily, today)
+
+
+def _trend_forecast(daily: Dict[str, float], today: date) -> Dict:
+    """Exponentially weighted linear trend: actual spend so far + projected remainder."""
+    # Like Prophet below, NumPy is only loaded in the worker process that fits
+    import numpy as np
+
+    days = {date.fromisoformat(k): v for k, v in daily.items()}
+    start = min(days)
+    n = (today - start).days + 1
+    y = np.zeros(n)
+    for d, amount in days.items():
+        if d <= today:
+            y[(d - start).days] += amount
+
+    x = np.arange(n)
+    weights = 0.5 ** ((n - 1 - x) / TREND_HALF_LIFE_DAYS)
+    slope, intercept = np.polyfit(x, y, 1, w=np.sqrt(weights))
+
+    _, last_day = calendar.monthrange(today.year, today.month)
+    month_start = max(0, (today.replace(day=1) - start).days)
+    future_x = np.arange(n, n + max(last_day - today.day, 14))
+    projected = np.maximum(0.0, intercept + slope * future_x)
+
+    remaining = last_day - today.day
+    predicted_total = float(y[month_start:].sum() + projected[:remaining].sum())
+    return {
+        "predicted_total": max(0, predicted_total),
+        "status": "success",
+        "model": "trend",
+        "trend": [
+            {"ds": datetime.combine(today + timedelta(days=i + 1), datetime.min.time()), "yhat": float(v)}
+            for i, v in enumerate(projected[:14])
+        ],
+    }
+
+
+def _prophet_forecast(daily: Dict[str, float], today: date) -> Dict:
+    # Heavy imports stay inside the worker process
+    import pandas as pd
+    from prophet import Prophet
+
+    # Prepare DataFrame for Prophet
+    df = pd.DataFrame({'ds': pd.to_datetime(list(daily.keys())), 'y': list(daily.values())})
+
+    # Train Model
+    model = Prophet(yearly_seasonality=False, daily_seasonality=False)
+    model.fit(df)
+
+    # Predict end of month
+    future = model.make_future_dataframe(periods=30)
+    forecast = model.predict(future)
+
+    # Filter for current month
+    mask = (forecast['ds'].dt.year == today.year) & (forecast['ds'].dt.month == today.month)
+    predicted_total = forecast.loc[mask, 'yhat'].sum()
+
+    return {
+        "predicted_total": max(0, float(predicted_total)),
+        "status": "success",
+        "model": "prophet",
+        "trend": [
+            {"ds": row.ds.to_pydatetime(), "yhat": float(row.yhat)}
+            for row in forecast[['ds', 'yhat']].tail(14).itertuples()  # Last 14 days trend
+        ],
+    }
+
+
+async def save_forecast(user_id, version: Optional[datetime], result: Dict):
+    await Forecast.get_motor_collection().update_one(
+        {"user_id": user_id},
+        {"$set": {"version": version, "result": result, "computed_at": datetime.now()}},
+        upsert=True,
+    )
+
 
 class SpendingPredictor:
-    def predict_monthly_spending(self, transactions: List[any]) -> Dict:
-        if not transactions:
-            return {"predicted_total": 0, "status": "insufficient_data"}
-
-        # Prepare DataFrame for Prophet
-        df = pd.DataFrame([{
-            'ds': t.date.date(),
-            'y': t.amount
-        } for t in transactions])
-        
-        # Aggregate by day
-        df = df.groupby('ds')['y'].sum().reset_index()
-        
-        # Need at least a few data points
-        if len(df) < 5:
-             return {"predicted_total": df['y'].sum(), "status": "insufficient_data"}
-
-        # Train Model
-        model = Prophet(yearly_seasonality=False, daily_seasonality=False)
-        model.fit(df)
-        
-        # Predict end of month
-        future = model.make_future_dataframe(periods=30)
-        forecast = model.predict(future)
-        
-        current_month = datetime.now().month
-        
-        # Filter for current month
-        mask = (forecast['ds'].dt.month == current_month)
-        predicted_total = forecast.loc[mask, 'yhat'].sum()
-        
-        return {
-            "predicted_total": max(0, float(predicted_total)),
-            "status": "success",
-            "trend": forecast[['ds', 'yhat']].tail(14).to_dict('records') # Last 14 days trend
-        }
\ No newline at end of file
+    def __init__(self):
+        # user_id -> (data version, forecast)
+        self._cache = TTLCache(maxsize=settings.FORECAST_CACHE_SIZE, ttl=settings.FORECAST_CACHE_TTL_SECONDS)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def forecast(
+        self,
+        user_id: str,
+        version: Optional[datetime],
+        load_series: Callable[[], Awaitable[Dict[str, float]]],
+    ) -> Dict:
+        """Cached forecast for a user, recomputed only when `version` changes.
+
+        `version` is the time of the user's latest transaction write; the date is
+        part of the key too, because "this month" moves even without new data.
+        Lookup order is memory, then the `forecasts` collection, then a fresh
+        fit; `load_series` is only awaited on a miss. Fits run in the process pool, and
+        concurrent misses for the same user share one fit.
+        """
+        key = str(user_id)
+        stamp = (version, date.today())
+        cached = self._cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        # Precomputed by the nightly batch job (or by another worker)
+        stored = await Forecast.find_one(Forecast.user_id == user_id)
+        if stored and (stored.version, stored.computed_at.date()) == stamp:
+            self._cache.set(key, (stamp, stored.result))
+            return stored.result
+
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            daily = await load_series()
+            result = await asyncio.get_running_loop().run_in_executor(
+                get_process_pool(), forecast_series, daily, date.today()
+            )
+            self._cache.set(key, (stamp, result))
+            await save_forecast(user_id, version, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            # Nobody else may be waiting; don't warn about a never-retrieved exception
+            if future.done() and not future.cancelled():
+                future.exception()
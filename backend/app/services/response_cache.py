@@ -0,0 +1,108 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.utils.cache import TTLCache
+
+
+class ResponseCache:
+    """Per-user cache of LLM replies, keyed on the exact prompt.
+
+    The key hashes the messages (system prompt + user message), the model and
+    the temperature rounded to one decimal. The system prompt already embeds the
+    user's balance and goals, so most data changes produce a new key anyway;
+    writes to transactions or goals still call `invalidate` so nothing stale
+    survives. Each user gets a small LRU, and the set of users is itself LRU-bounded.
+    """
+
+    def __init__(
+        self,
+        per_user: Optional[int] = None,
+        max_users: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.per_user = per_user or settings.RESPONSE_CACHE_PER_USER
+        self.max_users = max_users or settings.RESPONSE_CACHE_MAX_USERS
+        self.ttl = ttl or settings.RESPONSE_CACHE_TTL_SECONDS
+        self._users: "OrderedDict[str, TTLCache]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # LLM time the hits would have cost, measured when each entry was stored
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def make_key(messages: List[Dict[str, str]], model: Optional[str], temperature: float) -> str:
+        raw = json.dumps(
+            [messages, model or settings.LLM_MODEL, round(temperature, 1)],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, user_id, key: str) -> Optional[str]:
+        user_cache = self._users.get(str(user_id))
+        entry = user_cache.get(key) if user_cache is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._users.move_to_end(str(user_id))
+        self.hits += 1
+        reply, latency = entry
+        self.saved_seconds += latency
+        return reply
+
+    def set(self, user_id, key: str, reply: str, latency: float):
+        user_key = str(user_id)
+        user_cache = self._users.get(user_key)
+        if user_cache is None:
+            user_cache = TTLCache(maxsize=self.per_user, ttl=self.ttl)
+            self._users[user_key] = user_cache
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        self._users.move_to_end(user_key)
+        user_cache.set(key, (reply, latency))
+
+    def invalidate(self, user_id):
+        if self._users.pop(str(user_id), None) is not None:
+            self.invalidations += 1
+
+    async def complete(
+        self,
+        user_id,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.5,
+        cacheable=lambda reply: True,
+    ) -> str:
+        """llm_gateway.complete() behind the cache; `cacheable` can veto storing a reply."""
+        key = self.make_key(messages, model, temperature)
+        cached = self.get(user_id, key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        reply = await llm_gateway.complete(messages=messages, model=model, temperature=temperature)
+        if cacheable(reply):
+            self.set(user_id, key, reply, time.perf_counter() - started)
+        return reply
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "invalidations": self.invalidations,
+            "users": len(self._users),
+            "entries": sum(len(c) for c in self._users.values()),
+        }
+
+
+response_cache = ResponseCache()
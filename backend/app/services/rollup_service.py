@@ -0,0 +1,296 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.models.spending_rollup import SpendingRollup
+from app.models.transaction import Transaction
+from app.services.analytics_service import analytics_service
+
+
+# Passes over users whose rollups keep changing while rebuild() recomputes them
+REBUILD_ATTEMPTS = 3
+
+
+def month_key(when: datetime) -> str:
+    return when.strftime("%Y-%m")
+
+
+def category_key(category: str) -> str:
+    # Field names can't contain "." or start with "$"
+    return (category or "General").replace(".", "_").lstrip("$") or "General"
+
+
+def _months_between(start: date, end: date) -> List[str]:
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def rollup_operations(rows: Iterable[dict], now: datetime, sign: int = 1) -> List[UpdateOne]:
+    """Upserts that $inc the rollups for transaction dicts, folded per (user, month).
+
+    Rows need user_id, date, amount, transaction_type and category; shared by
+    RollupService.apply() and generate_data.py so both write the same shape.
+    """
+    increments: Dict[tuple, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for t in rows:
+        if not isinstance(t["date"], datetime):
+            continue
+        inc = increments[(t["user_id"], month_key(t["date"]))]
+        inc["transaction_count"] += sign
+        if t["transaction_type"] == "credit":
+            inc["credit_total"] += sign * t["amount"]
+        else:
+            inc["debit_total"] += sign * t["amount"]
+            inc[f"categories.{category_key(t['category'])}"] += sign * t["amount"]
+            inc[f"daily.{t['date'].strftime('%d')}"] += sign * t["amount"]
+    return [
+        UpdateOne({"user_id": user_id, "month": month}, {"$inc": dict(inc), "$set": {"updated_at": now}}, upsert=True)
+        for (user_id, month), inc in increments.items()
+    ]
+
+
+def unchanged(doc: dict) -> dict:
+    """Filter matching a rollup only as it was read: every apply() moves updated_at and transaction_count."""
+    return {"_id": doc["_id"], "updated_at": doc.get("updated_at"), "transaction_count": doc.get("transaction_count")}
+
+
+class RollupService:
+    """Keeps `spending_rollups` in step with `transactions` so readers touch O(1) documents."""
+
+    def __init__(self):
+        self._backfill: Optional[asyncio.Task] = None
+
+    async def apply(self, transactions: Iterable[Transaction], sign: int = 1):
+        """$inc the rollups for added (sign=1) or deleted (sign=-1) transactions.
+
+        Transactions are folded per (user, month) first, so a 5,000-row import is
+        a single bulk_write with one upsert per month touched.
+        """
+        operations = rollup_operations(
+            (
+                {"user_id": t.user_id, "date": t.date, "amount": t.amount,
+                 "transaction_type": t.transaction_type, "category": t.category}
+                for t in transactions
+            ),
+            datetime.now(),
+            sign,
+        )
+        if not operations:
+            return
+        try:
+            await SpendingRollup.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            # Raw transactions stay the source of truth; rebuild_rollups.py repairs drift
+            print(f"Rollup update failed: {e}")
+
+    async def get_month(self, user_id: PydanticObjectId, month: Optional[str] = None) -> Optional[SpendingRollup]:
+        return await SpendingRollup.find_one(
+            SpendingRollup.user_id == user_id,
+            SpendingRollup.month == (month or month_key(datetime.now())),
+        )
+
+    async def last_updated(self, user_id: PydanticObjectId) -> Optional[datetime]:
+        """Time of the user's latest transaction write (add, import or delete)."""
+        doc = await SpendingRollup.get_motor_collection().find_one(
+            {"user_id": user_id}, {"updated_at": 1}, sort=[("updated_at", -1)]
+        )
+        return doc["updated_at"] if doc else None
+
+    async def totals(self, user_id: PydanticObjectId) -> Dict[str, float]:
+        """Lifetime income, expenses and balance (one small document per month)."""
+        docs = await SpendingRollup.get_motor_collection().find(
+            {"user_id": user_id}, {"credit_total": 1, "debit_total": 1}
+        ).to_list(length=None)
+        income = sum(d.get("credit_total", 0) for d in docs)
+        expenses = sum(d.get("debit_total", 0) for d in docs)
+        return {"income": income, "expenses": expenses, "balance": income - expenses}
+
+    async def daily_debits(self, user_id: PydanticObjectId, since: datetime, until: Optional[datetime] = None) -> Dict[str, float]:
+        """Debit totals per day between `since` and `until`, keyed "YYYY-MM-DD"."""
+        series = await self.daily_debits_many([user_id], since, until)
+        return series.get(user_id, {})
+
+    async def daily_debits_many(
+        self, user_ids: List[PydanticObjectId], since: datetime, until: Optional[datetime] = None
+    ) -> Dict[PydanticObjectId, Dict[str, float]]:
+        """daily_debits for a batch of users in one query (used by the forecast job)."""
+        until = until or datetime.now()
+        docs = await SpendingRollup.get_motor_collection().find(
+            {"user_id": {"$in": user_ids}, "month": {"$in": _months_between(since.date(), until.date())}},
+            {"user_id": 1, "month": 1, "daily": 1},
+        ).to_list(length=None)
+
+        first, last = since.strftime("%Y-%m-%d"), until.strftime("%Y-%m-%d")
+        series: Dict[PydanticObjectId, Dict[str, float]] = defaultdict(dict)
+        for doc in docs:
+            for day, amount in (doc.get("daily") or {}).items():
+                key = f"{doc['month']}-{day}"
+                if first <= key <= last and amount:
+                    series[doc["user_id"]][key] = amount
+        return series
+
+    async def last_updated_many(self, user_ids: List[PydanticObjectId]) -> Dict[PydanticObjectId, datetime]:
+        pipeline = [
+            {"$match": {"user_id": {"$in": user_ids}}},
+            {"$group": {"_id": "$user_id", "updated_at": {"$max": "$updated_at"}}},
+        ]
+        rows = await SpendingRollup.aggregate(pipeline).to_list()
+        return {row["_id"]: row["updated_at"] for row in rows}
+
+    async def rebuild(self, user_id: Optional[PydanticObjectId] = None, fix: bool = True) -> List[dict]:
+        """Recomputes rollups from raw transactions and returns every drifted field.
+
+        With fix=True the stored rollups of the affected users are replaced. Each
+        (user, month) is only written if no apply() has touched it since it was
+        read; users that raced a write are recomputed, up to REBUILD_ATTEMPTS times.
+        """
+        drift, conflicted = await self._reconcile(user_id, fix)
+        for _ in range(REBUILD_ATTEMPTS - 1):
+            if not conflicted:
+                break
+            retried = set()
+            for conflicted_user in conflicted:
+                retried |= (await self._reconcile(conflicted_user, fix))[1]
+            conflicted = retried
+        if conflicted:
+            print(f"⚠️ Rollups of {len(conflicted)} users kept changing during the rebuild; run rebuild_rollups.py again")
+        return drift
+
+    async def _reconcile(self, user_id: Optional[PydanticObjectId], fix: bool) -> Tuple[List[dict], Set[PydanticObjectId]]:
+        """One rebuild pass: (drift, users whose rollups changed under it and weren't fixed)."""
+        # Stored rollups are read before the transactions, so an $inc landing after
+        # this read moves updated_at and the conditional write below skips the month
+        query = {"user_id": user_id} if user_id else {}
+        stored = {
+            (d["user_id"], d["month"]): d
+            for d in await SpendingRollup.get_motor_collection().find(query).to_list(length=None)
+        }
+
+        expected: Dict[tuple, dict] = {}
+        for row in await analytics_service.monthly_breakdown(user_id):
+            key = (row["user_id"], row["month"])
+            doc = expected.setdefault(key, {
+                "credit_total": 0.0, "debit_total": 0.0, "transaction_count": 0,
+                "categories": defaultdict(float), "daily": defaultdict(float),
+            })
+            doc["transaction_count"] += row["count"]
+            if row["transaction_type"] == "credit":
+                doc["credit_total"] += row["amount"]
+            else:
+                doc["debit_total"] += row["amount"]
+                doc["categories"][category_key(row["category"])] += row["amount"]
+                doc["daily"][row["day"]] += row["amount"]
+
+        drift = []
+        for key in set(expected) | set(stored):
+            want = expected.get(key, {})
+            have = stored.get(key, {})
+            for field in ("credit_total", "debit_total", "transaction_count"):
+                if abs(want.get(field, 0) - have.get(field, 0)) > 0.005:
+                    drift.append({"user_id": str(key[0]), "month": key[1], "field": field,
+                                  "stored": have.get(field, 0), "expected": want.get(field, 0)})
+            for field in ("categories", "daily"):
+                want_map, have_map = want.get(field, {}), have.get(field) or {}
+                for sub in set(want_map) | set(have_map):
+                    if abs(want_map.get(sub, 0) - have_map.get(sub, 0)) > 0.005:
+                        drift.append({"user_id": str(key[0]), "month": key[1], "field": f"{field}.{sub}",
+                                      "stored": have_map.get(sub, 0), "expected": want_map.get(sub, 0)})
+
+        if not fix or not drift:
+            return drift, set()
+        users = {PydanticObjectId(d["user_id"]) for d in drift}
+        return drift, await self._write_rebuilt(users, expected, stored)
+
+    async def _write_rebuilt(self, users: Set[PydanticObjectId], expected: Dict[tuple, dict], stored: Dict[tuple, dict]) -> Set[PydanticObjectId]:
+        """Swaps in the recomputed months of `users`, each conditional on the rollup that was read.
+
+        A month that an apply() $inc touched since (or that one created) is left
+        alone and its user returned for another pass. The one gap left is a write
+        between its transaction insert and its $inc, which a later
+        rebuild_rollups.py run repairs.
+        """
+        now = datetime.now()
+        operations, written = [], {}
+        for (doc_user, month), doc in expected.items():
+            if doc_user not in users:
+                continue
+            body = {"user_id": doc_user, "month": month,
+                    **{k: dict(v) if isinstance(v, defaultdict) else v for k, v in doc.items()},
+                    "updated_at": now}
+            written[(doc_user, month)] = body
+            have = stored.get((doc_user, month))
+            # A month with no rollup yet is inserted; if an $inc upserted it meanwhile, user_month rejects ours
+            operations.append(InsertOne(body) if have is None else ReplaceOne(unchanged(have), body))
+        stale = [doc for key, doc in stored.items() if key[0] in users and key not in expected]
+        operations += [DeleteOne(unchanged(doc)) for doc in stale]
+
+        try:
+            result = (await SpendingRollup.get_motor_collection().bulk_write(operations, ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+            result = e.details
+        if result["nInserted"] + result["nMatched"] + result["nRemoved"] == len(operations):
+            return set()
+
+        # Some writes were skipped; any month not holding exactly what was written gets another pass
+        fields = ("credit_total", "debit_total", "transaction_count", "categories", "daily")
+        current = await SpendingRollup.get_motor_collection().find({"user_id": {"$in": list(users)}}).to_list(length=None)
+        stale_ids = {doc["_id"] for doc in stale}
+        return {
+            doc["user_id"] for doc in current
+            if doc["_id"] in stale_ids
+            or any(doc.get(f) != written[(doc["user_id"], doc["month"])][f] for f in fields
+                   if (doc["user_id"], doc["month"]) in written)
+        }
+
+    async def backfill_missing(self) -> int:
+        """Builds rollups for users who have transactions but no rollup documents yet.
+
+        Covers data written before rollups existed; users that already have
+        rollups are left to rebuild_rollups.py. Returns the number of users built.
+        """
+        with_transactions = set(await Transaction.get_motor_collection().distinct("user_id"))
+        with_rollups = set(await SpendingRollup.get_motor_collection().distinct("user_id"))
+        missing = with_transactions - with_rollups
+        if missing:
+            print(f"🧮 Backfilling spending rollups for {len(missing)} users")
+        for user_id in missing:
+            await self.rebuild(user_id, fix=True)
+        return len(missing)
+
+    def start_backfill(self):
+        """Runs backfill_missing in the background so startup isn't held up by it."""
+        if self._backfill is not None:
+            return
+
+        async def run():
+            try:
+                built = await self.backfill_missing()
+                if built:
+                    print(f"✅ Spending rollups backfilled for {built} users")
+            except Exception as e:
+                print(f"Rollup backfill failed (run rebuild_rollups.py): {e}")
+
+        self._backfill = asyncio.create_task(run())
+
+    async def stop_backfill(self):
+        if self._backfill is not None and not self._backfill.done():
+            self._backfill.cancel()
+            try:
+                await self._backfill
+            except asyncio.CancelledError:
+                pass
+        self._backfill = None
+
+
+rollup_service = RollupService()
@@ -0,0 +1,233 @@
+import asyncio
+import heapq
+import statistics
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import UploadFile
+
+from app.config import settings
+from app.services.category_cache import normalize_text
+from app.services.document_extraction import document_extractor, file_kind
+from app.services.merchant_matcher import DEFAULT_RULES_PATH, MerchantMatcher
+from app.services.statement_parser import StatementRow, iter_csv_rows, iter_pdf_rows
+from app.utils.cache import TTLCache
+from app.utils.executors import run_parse
+from app.utils.metrics import EXTRACTION_LATENCY, timed
+
+# Rough English/number mix; good enough to keep prompts under budget without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# Words that describe the payment rail, not the merchant
+_RAIL_WORDS = {
+    "upi", "pos", "neft", "imps", "rtgs", "ach", "nach", "ecom", "debit", "credit", "card",
+    "payment", "purchase", "transfer", "txn", "ref", "to", "from", "by", "via", "at", "dr", "cr",
+}
+
+_matcher: Optional[MerchantMatcher] = None
+
+
+def _get_matcher() -> MerchantMatcher:
+    # Built once per worker process
+    global _matcher
+    if _matcher is None:
+        _matcher = MerchantMatcher.from_file(settings.MERCHANT_RULES_PATH or DEFAULT_RULES_PATH)
+    return _matcher
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def merchant_label(row: StatementRow) -> Tuple[str, Optional[str]]:
+    """(display name, keyword category) for a statement line."""
+    text = f"{row.description} {row.merchant or ''}".lower()
+    rule = _get_matcher().match(text)
+    if rule:
+        return rule.keyword.title(), rule.category
+    words = [w for w in normalize_text(row.description, row.merchant).split() if w not in _RAIL_WORDS and "@" not in w]
+    return (" ".join(words[:3]).title() or "Unknown"), None
+
+
+class _Accumulator:
+    """Single pass over the rows; memory is bounded by distinct merchants, not rows."""
+
+    def __init__(self):
+        self.rows = 0
+        self.truncated = False
+        self.first_date = None
+        self.last_date = None
+        self.debit_total = 0.0
+        self.credit_total = 0.0
+        self.categories: Counter = Counter()
+        self.merchant_spend: Counter = Counter()
+        self.merchant_count: Counter = Counter()
+        self.merchant_months: Dict[str, set] = {}
+        self.merchant_amounts: Dict[str, deque] = {}
+        self.largest: List[tuple] = []
+        self.recent: deque = deque(maxlen=10)
+
+    def add(self, row: StatementRow):
+        self.rows += 1
+        self.first_date = min(self.first_date or row.date, row.date)
+        self.last_date = max(self.last_date or row.date, row.date)
+        self.recent.append(row)
+        if row.transaction_type == "credit":
+            self.credit_total += row.amount
+            return
+
+        self.debit_total += row.amount
+        label, category = merchant_label(row)
+        self.categories[category or "Uncategorized"] += row.amount
+        self.merchant_spend[label] += row.amount
+        self.merchant_count[label] += 1
+        self.merchant_months.setdefault(label, set()).add(row.date.strftime("%Y-%m"))
+        self.merchant_amounts.setdefault(label, deque(maxlen=12)).append(row.amount)
+
+        entry = (row.amount, row.date.strftime("%d %b"), row.description[:40])
+        if len(self.largest) < 5:
+            heapq.heappush(self.largest, entry)
+        else:
+            heapq.heappushpop(self.largest, entry)
+
+    def recurring(self) -> List[tuple]:
+        found = []
+        for label, months in self.merchant_months.items():
+            amounts = self.merchant_amounts[label]
+            if len(months) < 2 or len(amounts) < 2:
+                continue
+            mean = statistics.fmean(amounts)
+            # Same merchant, every month, roughly the same amount -> subscription / EMI / rent
+            if mean and statistics.pstdev(amounts) / mean < 0.15:
+                found.append((label, mean, len(months)))
+        return sorted(found, key=lambda r: -r[1])
+
+    def result(self) -> dict:
+        return {
+            "rows": self.rows,
+            "truncated": self.truncated,
+            "period": (
+                f"{self.first_date:%d %b %Y} to {self.last_date:%d %b %Y}" if self.rows else None
+            ),
+            "debit_total": self.debit_total,
+            "credit_total": self.credit_total,
+            "categories": self.categories.most_common(),
+            "top_merchants": [
+                (label, spend, self.merchant_count[label]) for label, spend in self.merchant_spend.most_common(15)
+            ],
+            "recurring": self.recurring()[:10],
+            "largest": sorted(self.largest, reverse=True),
+            "recent": [
+                (r.date.strftime("%d %b"), r.description[:40], r.amount, r.transaction_type) for r in self.recent
+            ],
+        }
+
+
+def summarize_statement(path: str, kind: str, max_pages: int, time_budget: float, max_csv_bytes: int) -> dict:
+    """Parses the statement into aggregates; runs in a worker process.
+
+    Stops early (and marks the summary truncated) once the time budget is
+    spent or, for CSVs, once max_csv_bytes have been read.
+    """
+    started = time.monotonic()
+    accumulator = _Accumulator()
+    with open(path, "rb") as f:
+        rows = iter_csv_rows(f) if kind == "csv" else iter_pdf_rows(f, max_pages=max_pages)
+        try:
+            for row in rows:
+                if time.monotonic() - started > time_budget or (kind == "csv" and f.tell() > max_csv_bytes):
+                    accumulator.truncated = True
+                    break
+                if row is not None:
+                    accumulator.add(row)
+        finally:
+            # Releases the parser's hold on the file before it is closed
+            rows.close()
+    return accumulator.result()
+
+
+def render_summary(summary: dict, budget_tokens: int) -> str:
+    """Packs the aggregates into prompt text, most valuable sections first, under the budget."""
+    sections = [
+        ("OVERVIEW", [
+            f"Period: {summary['period']} ({summary['rows']} transactions"
+            + (", statement only partly read)" if summary["truncated"] else ")"),
+            f"Total spent: ₹{summary['debit_total']:,.0f} | Total received: ₹{summary['credit_total']:,.0f}",
+        ]),
+        ("SPEND BY CATEGORY", [f"- {c}: ₹{a:,.0f}" for c, a in summary["categories"]]),
+        ("TOP MERCHANTS", [f"- {m}: ₹{a:,.0f} over {n} payments" for m, a, n in summary["top_merchants"]]),
+        ("RECURRING CHARGES", [f"- {m}: ~₹{a:,.0f}/month ({n} months)" for m, a, n in summary["recurring"]]),
+        ("LARGEST PAYMENTS", [f"- {d}: {desc} ₹{a:,.0f}" for a, d, desc in summary["largest"]]),
+        ("MOST RECENT LINES", [f"- {d}: {desc} ₹{a:,.0f} ({t})" for d, desc, a, t in summary["recent"]]),
+    ]
+
+    lines, used = [], 0
+    for title, body in sections:
+        if not body:
+            continue
+        header = f"[{title}]"
+        if used + estimate_tokens(header) + estimate_tokens(body[0]) > budget_tokens:
+            break
+        lines.append(header)
+        used += estimate_tokens(header)
+        for line in body:
+            cost = estimate_tokens(line)
+            if used + cost > budget_tokens:
+                break
+            lines.append(line)
+            used += cost
+    return "\n".join(lines)
+
+
+def trim_to_budget(text: str, budget_tokens: int) -> str:
+    return text[: budget_tokens * CHARS_PER_TOKEN]
+
+
+class StatementContextBuilder:
+    """Turns an uploaded statement into a compact, token-budgeted prompt section.
+
+    Statements we can parse into rows are summarized (categories, merchants,
+    recurring charges) from every row instead of the first few pages; anything
+    else falls back to extracted raw text trimmed to the same budget.
+    """
+
+    def __init__(self):
+        self.cache = TTLCache(maxsize=settings.EXTRACT_CACHE_SIZE, ttl=settings.EXTRACT_CACHE_TTL_SECONDS)
+
+    async def build(self, upload: UploadFile, budget_tokens: Optional[int] = None) -> Optional[str]:
+        kind = file_kind(upload.filename)
+        if kind is None:
+            return None
+        budget = budget_tokens or settings.COACH_CONTEXT_TOKEN_BUDGET
+
+        async with document_extractor.spooled(upload) as (path, content_hash):
+            key = (content_hash, budget)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            budget_seconds = settings.STATEMENT_CONTEXT_TIME_BUDGET_SECONDS
+            try:
+                with timed(EXTRACTION_LATENCY, "extraction", kind=f"{kind}_summary"):
+                    # The budget is checked between rows; past twice the budget (a page
+                    # stuck in text extraction) the parse worker is killed
+                    summary = await run_parse(
+                        summarize_statement, path, kind,
+                        settings.STATEMENT_CONTEXT_MAX_PAGES, budget_seconds, settings.STATEMENT_CONTEXT_MAX_CSV_BYTES,
+                        timeout=budget_seconds * 2,
+                    )
+            except asyncio.TimeoutError:
+                print(f"⚠️ Statement summary killed after {budget_seconds * 2:.0f}s, using extracted text")
+                summary = {"rows": 0}
+            if summary["rows"]:
+                context = render_summary(summary, budget)
+            else:
+                document = await document_extractor.extract_path(path, kind, content_hash)
+                context = trim_to_budget(document.text, budget)
+
+        self.cache.set(key, context)
+        return context
+
+
+statement_context_builder = StatementContextBuilder()
@@ -0,0 +1,162 @@
+import csv
+import io
+import re
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+
+class StatementRow(NamedTuple):
+    date: datetime
+    description: str
+    amount: float
+    transaction_type: str  # "debit" | "credit"
+    merchant: Optional[str] = None
+
+
+DATE_FORMATS = (
+    "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%m-%y", "%Y-%m-%d",
+    "%d %b %Y", "%d-%b-%Y", "%d %b %y", "%d-%b-%y", "%d.%m.%Y",
+)
+
+# Header aliases used by the common Indian bank exports (HDFC, ICICI, SBI, Axis, Kotak)
+DATE_HEADERS = ("date", "txn date", "transaction date", "tran date", "value date", "value dt")
+DESCRIPTION_HEADERS = ("description", "narration", "particulars", "remarks", "details", "transaction details")
+DEBIT_HEADERS = ("debit", "withdrawal", "withdrawal amt", "withdrawal amount", "debit amount", "dr amount")
+CREDIT_HEADERS = ("credit", "deposit", "deposit amt", "deposit amount", "credit amount", "cr amount")
+AMOUNT_HEADERS = ("amount", "txn amount", "transaction amount")
+TYPE_HEADERS = ("type", "dr/cr", "cr/dr", "transaction type")
+MERCHANT_HEADERS = ("merchant", "payee", "beneficiary")
+
+_HEADER_UNIT_RE = re.compile(r"\(.*?\)")
+_AMOUNT_CLEAN_RE = re.compile(r"[₹,\s]|inr|rs\.?", re.I)
+# "01/04/2024 UPI/4123/SWIGGY 450.00 Dr 12,345.67" -> date, text, trailing amounts
+_PDF_LINE_RE = re.compile(
+    r"^(?P<date>\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}|\d{1,2}[ -][A-Za-z]{3}[ -]\d{2,4}|\d{4}-\d{2}-\d{2})\s+"
+    r"(?P<rest>.+)$"
+)
+_PDF_AMOUNT_RE = re.compile(r"(?P<amount>\d[\d,]*\.\d{2})\s*(?P<marker>cr|dr)?\b", re.I)
+_CREDIT_HINTS = ("salary", "refund", "cashback", "interest", "credited", "reversal")
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_amount(value: str) -> Optional[float]:
+    value = _AMOUNT_CLEAN_RE.sub("", value or "")
+    if not value or value in ("-", "--"):
+        return None
+    try:
+        return abs(float(value))
+    except ValueError:
+        return None
+
+
+def _normalize_header(header: str) -> str:
+    # "Withdrawal Amt. (INR)" -> "withdrawal amt"
+    header = _HEADER_UNIT_RE.sub(" ", (header or "").lower())
+    return " ".join(header.replace(".", " ").replace("_", " ").split())
+
+
+def _pick(row: Dict[str, str], aliases) -> str:
+    for alias in aliases:
+        value = row.get(alias)
+        if value not in (None, ""):
+            return value
+    return ""
+
+
+def iter_csv_rows(stream: BinaryIO) -> Iterator[Optional[StatementRow]]:
+    """Yields one StatementRow per CSV line (None for lines that can't be parsed).
+
+    Reads the upload incrementally; the file is never loaded into memory whole.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        reader = csv.reader(text)
+        headers: List[str] = []
+        for record in reader:
+            if not headers:
+                # Banks often prepend account info; the header is the first row with a date column
+                normalized = [_normalize_header(h) for h in record]
+                if any(h in DATE_HEADERS for h in normalized):
+                    headers = normalized
+                continue
+            yield _csv_record_to_row(dict(zip(headers, record)))
+    finally:
+        text.detach()
+
+
+def _csv_record_to_row(row: Dict[str, str]) -> Optional[StatementRow]:
+    date = parse_date(_pick(row, DATE_HEADERS))
+    description = _pick(row, DESCRIPTION_HEADERS).strip()
+    if not date or not description:
+        return None
+
+    debit = parse_amount(_pick(row, DEBIT_HEADERS))
+    credit = parse_amount(_pick(row, CREDIT_HEADERS))
+    if debit:
+        amount, txn_type = debit, "debit"
+    elif credit:
+        amount, txn_type = credit, "credit"
+    else:
+        raw_amount = _pick(row, AMOUNT_HEADERS)
+        amount = parse_amount(raw_amount)
+        if not amount:
+            return None
+        marker = _pick(row, TYPE_HEADERS).strip().lower()
+        is_credit = marker.startswith("cr") or marker == "credit" or raw_amount.strip().startswith("+")
+        txn_type = "credit" if is_credit else "debit"
+
+    merchant = _pick(row, MERCHANT_HEADERS).strip() or None
+    return StatementRow(date, description, amount, txn_type, merchant)
+
+
+def iter_pdf_rows(stream: BinaryIO, max_pages: Optional[int] = None) -> Iterator[Optional[StatementRow]]:
+    """Yields rows from a text-based PDF statement, one page at a time."""
+    import pypdf
+
+    reader = pypdf.PdfReader(stream)
+    for index, page in enumerate(reader.pages):
+        if max_pages is not None and index >= max_pages:
+            break
+        for line in (page.extract_text() or "").splitlines():
+            match = _PDF_LINE_RE.match(line.strip())
+            if match:
+                yield parse_pdf_line(match.group("date"), match.group("rest"))
+
+
+def parse_pdf_line(date_text: str, rest: str) -> Optional[StatementRow]:
+    date = parse_date(date_text.replace(".", "/"))
+    amounts = list(_PDF_AMOUNT_RE.finditer(rest))
+    if not date or not amounts:
+        return None
+
+    # First money column is the transaction amount; a trailing one is the running balance
+    first = amounts[0]
+    description = rest[:first.start()].strip()
+    amount = parse_amount(first.group("amount"))
+    if not description or not amount:
+        return None
+
+    marker = (first.group("marker") or "").lower()
+    if marker:
+        txn_type = "credit" if marker == "cr" else "debit"
+    else:
+        txn_type = "credit" if any(h in description.lower() for h in _CREDIT_HINTS) else "debit"
+    return StatementRow(date, description, amount, txn_type)
+
+
+def iter_statement_rows(stream: BinaryIO, filename: str) -> Iterator[Optional[StatementRow]]:
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv_rows(stream)
+    if name.endswith(".pdf"):
+        return iter_pdf_rows(stream)
+    raise ValueError("Only .csv and .pdf statements are supported")
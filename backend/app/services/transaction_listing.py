@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.models.transaction import Transaction, TransactionListItem
+
+# Only what the list needs; description/notes of imported rows can be long
+LIST_PROJECTION = {name: 1 for name in TransactionListItem.model_fields if name != "id"}
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored dates are naive; "...Z" or "+05:30" query params arrive timezone-aware."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def encode_cursor(date: datetime, doc_id: ObjectId) -> str:
+    raw = json.dumps({"d": date.isoformat(), "i": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Raises ValueError for anything that isn't a cursor we issued."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return naive_utc(datetime.fromisoformat(data["d"])), ObjectId(data["i"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+class TransactionListing:
+    """Newest-first transaction history, keyset-paginated on (date, _id).
+
+    Each page seeks straight to the cursor position in the matching compound
+    index (user_date_id, user_type_date_id or user_category_date_id), so page N
+    costs the same as page 1 however long the history is. Rows are projected to
+    TransactionListItem fields and never become full Documents.
+    """
+
+    async def page(
+        self,
+        user_id: PydanticObjectId,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        category: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+    ) -> Tuple[List[TransactionListItem], Optional[str]]:
+        """Returns (rows, next cursor or None). Raises ValueError for a bad cursor."""
+        query = {"user_id": user_id}
+        if category:
+            query["category"] = category
+        if transaction_type:
+            query["transaction_type"] = transaction_type
+
+        date_from, date_to = naive_utc(date_from), naive_utc(date_to)
+        date_range = {}
+        if date_from:
+            date_range["$gte"] = date_from
+        if date_to:
+            date_range["$lte"] = date_to
+
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            # The plain bound keeps the index scan tight; $or breaks ties on _id
+            date_range["$lte"] = min(date_range.get("$lte", after_date), after_date)
+            query["$or"] = [
+                {"date": {"$lt": after_date}},
+                {"date": after_date, "_id": {"$lt": after_id}},
+            ]
+        if date_range:
+            query["date"] = date_range
+
+        # One extra row tells us whether there is a next page without a count()
+        docs = await Transaction.get_motor_collection().find(query, LIST_PROJECTION) \
+            .sort([("date", -1), ("_id", -1)]) \
+            .limit(limit + 1) \
+            .to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]["date"], docs[-1]["_id"])
+        return [TransactionListItem.model_validate(doc) for doc in docs], next_cursor
+
+
+transaction_listing = TransactionListing()
@@ -0,0 +1,94 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.config import settings
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_password_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared pool for CPU-heavy work (model fitting) that must not run on the event loop."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS)
+    return _process_pool
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Pool for parsing uploaded PDFs/statements, kept apart from forecast fits.
+
+    A pathological file can hang a worker inside a single page; run_parse()
+    kills this pool when that happens, so it never ties up forecasting.
+    """
+    global _parse_pool
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(max_workers=settings.PARSE_POOL_WORKERS)
+    return _parse_pool
+
+
+def _recycle_parse_pool(pool: ProcessPoolExecutor):
+    """Terminates the pool's workers; the next get_parse_pool() starts a fresh one."""
+    global _parse_pool
+    if _parse_pool is pool:
+        _parse_pool = None
+    for process in list((pool._processes or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_parse(func: Callable[..., Any], *args, timeout: float) -> Any:
+    """Runs func(*args) in the parse pool, killing the worker if it overruns `timeout`.
+
+    Cancelling an executor future doesn't stop a worker that is already
+    running, so on timeout the whole parse pool is terminated and
+    asyncio.TimeoutError is raised. Other parses caught in the recycle are
+    retried once in the new pool with whatever time they have left.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout
+    for attempt in range(2):
+        pool = get_parse_pool()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(pool, partial(func, *args)), max(deadline - time.monotonic(), 0.01)
+            )
+        except asyncio.TimeoutError:
+            _recycle_parse_pool(pool)
+            raise
+        except BrokenProcessPool:
+            if attempt or _parse_pool is pool:
+                # Not a recycle by another parse: the worker itself died
+                _recycle_parse_pool(pool)
+                raise
+
+
+def get_password_pool() -> ThreadPoolExecutor:
+    """Dedicated, bounded pool for bcrypt (it releases the GIL while hashing).
+
+    Kept separate from the default executor so a login storm queues here instead
+    of starving every other run_in_threadpool caller.
+    """
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _password_pool
+
+
+def shutdown_executors():
+    global _process_pool, _password_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    if _parse_pool is not None:
+        _recycle_parse_pool(_parse_pool)
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
@@ -0,0 +1,253 @@
+"""Prometheus metrics, per-request dependency timings and structured logs.
+
+Everything here is a no-op when METRICS_ENABLED is off: the middleware and the
+Mongo listener are not installed and `timed()` yields without touching a clock.
+With it on, each request collects the time it spent in Mongo, the LLM and
+document extraction into a context variable; that breakdown is returned in a
+Server-Timing header and logged as JSON when the request is slow.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+
+from app.config import settings
+
+registry = CollectorRegistry()
+
+# Seconds; the tail buckets are for LLM calls and statement imports
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_LATENCY = Histogram(
+    "moneypal_http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+MONGO_LATENCY = Histogram(
+    "moneypal_mongo_command_duration_seconds", "MongoDB command latency by collection",
+    ["command", "collection", "outcome"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+LLM_LATENCY = Histogram(
+    "moneypal_llm_request_duration_seconds", "LLM call latency (streams: until the last chunk)",
+    ["client", "mode", "outcome"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+LLM_RETRIES = Counter(
+    "moneypal_llm_retries_total", "LLM calls retried after a throttling response",
+    ["client"], registry=registry,
+)
+CATEGORIZATION_LATENCY = Histogram(
+    "moneypal_categorization_duration_seconds", "Single-transaction categorization latency by path",
+    ["method"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+CATEGORIZED = Counter(
+    "moneypal_categorized_transactions_total", "Transactions categorized, by path (keyword, cache, ai, fallback)",
+    ["method", "mode"], registry=registry,
+)
+EXTRACTION_LATENCY = Histogram(
+    "moneypal_document_extraction_duration_seconds", "Statement text extraction latency (cache misses)",
+    ["kind"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+
+# dependency -> seconds spent by the current request; None outside a request
+_request_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+logger = logging.getLogger("moneypal")
+
+
+def add_request_time(dependency: str, seconds: float):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[dependency] = timings.get(dependency, 0.0) + seconds
+
+
+@contextmanager
+def timed(histogram: Histogram, dependency: Optional[str] = None, **labels) -> Iterator[Dict[str, str]]:
+    """Observes the block's duration in `histogram`.
+
+    Yields the label dict so the block can fill in labels it only learns late
+    (e.g. the categorization method). An "outcome" label, if present, is set
+    to "timeout", "cancelled" or "error" when the block raises.
+    """
+    if not settings.METRICS_ENABLED:
+        yield labels
+        return
+    start = time.perf_counter()
+    try:
+        yield labels
+    except BaseException as e:
+        if "outcome" in labels:
+            if isinstance(e, TimeoutError):
+                labels["outcome"] = "timeout"
+            elif isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+                # Client went away (or stopped iterating a stream)
+                labels["outcome"] = "cancelled"
+            else:
+                labels["outcome"] = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        histogram.labels(**labels).observe(elapsed)
+        if dependency:
+            add_request_time(dependency, elapsed)
+
+
+def count(metric: Counter, amount: float = 1, **labels):
+    if settings.METRICS_ENABLED:
+        metric.labels(**labels).inc(amount)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Times every command by collection. Motor runs pymongo in a thread pool
+    with the caller's context copied, so the per-request breakdown still works."""
+
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        name = event.command_name
+        collection = event.command.get("collection" if name == "getMore" else name)
+        self._collections[event.request_id] = collection if isinstance(collection, str) else "-"
+
+    def _finish(self, event, outcome: str):
+        seconds = event.duration_micros / 1_000_000
+        collection = self._collections.pop(event.request_id, "-")
+        MONGO_LATENCY.labels(event.command_name, collection, outcome).observe(seconds)
+        add_request_time("mongo", seconds)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+def mongo_event_listeners() -> List[monitoring.CommandListener]:
+    """Pass as AsyncIOMotorClient(event_listeners=...); empty when metrics are off."""
+    return [MongoCommandTimer()] if settings.METRICS_ENABLED else []
+
+
+class StatsCollector:
+    """Exposes the services' own stats() dicts as gauges, read only at scrape time."""
+
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], dict]] = {}
+
+    def register(self, name: str, source: Callable[[], dict]):
+        self._sources[name] = source
+
+    def collect(self):
+        for name, source in self._sources.items():
+            try:
+                stats = source()
+            except Exception as e:
+                logger.warning("stats source failed", extra={"fields": {"source": name, "error": str(e)}})
+                continue
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    yield GaugeMetricFamily(f"moneypal_{name}_{key}", f"{name} stats: {key}", value=value)
+
+
+stats_collector = StatsCollector()
+registry.register(stats_collector)
+
+
+def render_metrics() -> bytes:
+    return generate_latest(registry)
+
+
+def route_template(scope) -> str:
+    """The matched route as a template: /api/goals/abc123/add -> /api/goals/{goal_id}/add.
+
+    Rebuilt from the path and its path params, so the router prefixes are kept
+    whichever way the framework nests included routers.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{names[part]}}}" if part in names else part for part in scope["path"].split("/"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: route latency histogram, Server-Timing header, slow-request log.
+
+    Routes are labelled by their template (/api/goals/{goal_id}/add), never the
+    raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streaming responses start early; the header then covers the work done so far
+                server_timing = ", ".join(
+                    f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+                )
+                server_timing += f"{', ' if server_timing else ''}total;dur={(time.perf_counter() - start) * 1000:.1f}"
+                message["headers"] = [*message.get("headers", []), (b"server-timing", server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_timings.reset(token)
+            route = route_template(scope)
+            HTTP_LATENCY.labels(scope["method"], route, str(status)).observe(elapsed)
+            if elapsed >= settings.SLOW_REQUEST_SECONDS:
+                logger.warning("slow request", extra={"fields": {
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 1),
+                    **{f"{name}_ms": round(seconds * 1000, 1) for name, seconds in timings.items()},
+                }})
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; structured fields come from extra={"fields": {...}}."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s %(fields)s", defaults={"fields": ""}))
+    logger.addHandler(handler)
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.propagate = False
@@ -1,16 +1,21 @@
+import asyncio
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Optional, Tuple, Union
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.config import settings
 from app.models.user import User
+from app.utils.cache import TTLCache
+from app.utils.executors import get_password_pool
 
 # Configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 # This tells FastAPI where to look for the token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# Authenticated users by token subject - a dashboard load fans out into 4-5 calls for the same user
+_user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
 
 # --- 1. Password Hashing ---
 def hash_password(password: str) -> str:
@@ -19,6 +24,19 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+# Async variants: ~250ms of bcrypt per call must never run on the event loop
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_pool(), hash_password, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Returns (valid, new_hash). new_hash is set when the stored hash uses a
+    different work factor than BCRYPT_ROUNDS and should be saved."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_password_pool(), pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 # --- 2. Token Generation ---
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     to_encode = data.copy()
@@ -47,8 +65,17 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     except JWTError:
         raise credentials_exception
     
+    user = _user_cache.get(email)
+    if user is not None:
+        return user
+
     # Fetch user from DB
     user = await User.find_one(User.email == email)
     if user is None:
         raise credentials_exception
-    return user
\ No newline at end of file
+    _user_cache.set(email, user)
+    return user
+
+def invalidate_user_cache(email: str):
+    """Call after any write to a User document so the next request re-reads it."""
+    _user_cache.pop(email)
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""AIService HTTP client: a new client per call vs the pooled lifespan client.
+
+Starts the fake LLM server over TLS (self-signed certificate for 127.0.0.1) so
+every new connection pays a real TCP + TLS handshake, then sends --requests
+completions at --concurrency through:
+
+  per-call   a fresh httpx.AsyncClient per request (the old generate_response)
+  pooled     AIService with its lifespan-managed keep-alive pool and 429 retries
+
+and reports latency percentiles, throughput, connections opened (counted by
+the server) and how many requests still ended in a 429. uvicorn only speaks
+HTTP/1.1, so the pooled numbers here are keep-alive alone; against Groq the
+pool also negotiates HTTP/2 and multiplexes over fewer connections.
+
+Run from backend/:
+    python -m benchmarks.bench_ai_client [--requests 400] [--concurrency 32] [--rate-limit-every 20]
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.config import settings
+from benchmarks.harness import percentile
+
+
+def write_self_signed(directory):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    certfile, keyfile = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+async def wait_for_server(base_url):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(100):
+            try:
+                await client.get("/_stats")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("fake LLM server did not start")
+
+
+async def server_stats(base_url, reset=False):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        if reset:
+            await client.post("/_stats/reset")
+            return None
+        return (await client.get("/_stats")).json()
+
+
+async def run(name, call, requests, concurrency, base_url):
+    await server_stats(base_url, reset=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, throttled = [], 0
+
+    async def one():
+        nonlocal throttled
+        async with semaphore:
+            start = time.perf_counter()
+            reply = await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+            throttled += reply == "ERROR_QUOTA_EXCEEDED"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    stats = await server_stats(base_url)
+    print(
+        f"{name:<9} {requests / elapsed:7.1f} req/s  p50 {percentile(latencies, 50):6.1f}  "
+        f"p95 {percentile(latencies, 95):6.1f}  p99 {percentile(latencies, 99):6.1f} ms  "
+        f"connections {stats['connections'] - 1:4d}  upstream calls {stats['requests']:4d}  429s left {throttled}"
+    )
+    return stats["connections"] - 1
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--latency-ms", type=float, default=50, help="fake model latency per request")
+    parser.add_argument("--rate-limit-every", type=int, default=20)
+    parser.add_argument("--no-tls", action="store_true")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    command = [
+        sys.executable, "-m", "benchmarks.fake_llm_server", "--port", str(args.port),
+        "--first-token-ms", str(args.latency_ms), "--token-ms", "0",
+        "--rate-limit-every", str(args.rate_limit_every),
+    ]
+    if args.no_tls:
+        base_url = f"http://127.0.0.1:{args.port}"
+    else:
+        certfile, keyfile = write_self_signed(tmp.name)
+        command += ["--ssl-certfile", certfile, "--ssl-keyfile", keyfile]
+        base_url = f"https://127.0.0.1:{args.port}"
+        # httpx trusts SSL_CERT_FILE, so every client below accepts the throwaway certificate
+        os.environ["SSL_CERT_FILE"] = certfile
+    server = subprocess.Popen(command)
+
+    settings.LLM_BASE_URL = base_url
+    settings.AI_RETRY_BASE_SECONDS = 0.05
+    # Imported after the overrides: AIService reads the base URL at construction
+    from app.services.ai_service import AIService
+
+    service = AIService()
+    payload = {"model": service.model, "messages": [{"role": "user", "content": "How am I doing?"}], "temperature": 0.7}
+
+    async def per_call():
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{base_url}{service.api_url}", json=payload, timeout=30.0)
+        return "ERROR_QUOTA_EXCEEDED" if response.status_code == 429 else response.json()
+
+    try:
+        await wait_for_server(base_url)
+        print(f"⚡ {args.requests} requests, concurrency {args.concurrency}, {'HTTP' if args.no_tls else 'HTTPS'}, "
+              f"429 every {args.rate_limit_every or '-'} upstream calls\n")
+        fresh = await run("per-call", per_call, args.requests, args.concurrency, base_url)
+        await service.startup()
+        pooled = await run("pooled", lambda: service.generate_response("How am I doing?"), args.requests, args.concurrency, base_url)
+        print(f"\n🤝 Handshakes avoided: {fresh - pooled} ({fresh} -> {pooled} connections)")
+    finally:
+        await service.aclose()
+        server.terminate()
+        server.wait()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Coach chat latency: time-to-first-byte vs time-to-last-byte, /chat vs /chat/stream.
+
+Start the fake LLM and point the API at it first:
+    python -m benchmarks.fake_llm_server --port 9100
+    LLM_BASE_URL=http://127.0.0.1:9100 uvicorn app.main:app
+
+Run from backend/:
+    python -m benchmarks.bench_chat_stream --email chiragmishra120@gmail.com --password password123
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.harness import percentile
+
+
+async def blocking_chat(client, headers, message):
+    start = time.perf_counter()
+    async with client.stream("POST", "/api/chat", data={"message": message}, headers=headers) as response:
+        first = None
+        body = b""
+        async for chunk in response.aiter_bytes():
+            first = first or time.perf_counter()
+            body += chunk
+    last = time.perf_counter()
+    reply = json.loads(body)["reply"]
+    return (first - start) * 1000, (last - start) * 1000, reply
+
+
+async def streaming_chat(client, headers, message):
+    start = time.perf_counter()
+    first = None
+    reply = ""
+    async with client.stream("POST", "/api/chat/stream", data={"message": message}, headers=headers) as response:
+        event = None
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                payload = json.loads(line[len("data: "):])
+                if event is None:
+                    # First generated text the user can see
+                    first = first or time.perf_counter()
+                else:
+                    reply = payload["reply"]
+                event = None
+    last = time.perf_counter()
+    return ((first or last) - start) * 1000, (last - start) * 1000, reply
+
+
+def report(name, ttfb, ttlb):
+    print(
+        f"{name:<14} TTFB p50 {statistics.median(ttfb):7.1f} ms  p95 {percentile(ttfb, 95):7.1f} ms | "
+        f"TTLB p50 {statistics.median(ttlb):7.1f} ms  p95 {percentile(ttlb, 95):7.1f} ms"
+    )
+
+
+async def run(name, fn, client, headers, args):
+    ttfb, ttlb = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i):
+        async with semaphore:
+            first, last, reply = await fn(client, headers, f"How can I save more this month? ({i})")
+            if not reply:
+                print(f"⚠️  {name}: empty reply")
+            ttfb.append(first)
+            ttlb.append(last)
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    report(name, ttfb, ttlb)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        response = await client.post("/api/auth/login", json={"username": args.email, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        await run("/chat", blocking_chat, client, headers, args)
+        await run("/chat/stream", streaming_chat, client, headers, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
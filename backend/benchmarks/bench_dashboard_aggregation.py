@@ -0,0 +1,120 @@
+"""Chart + balance: the old raw-transaction scans vs the spending_rollups reads the routes use now.
+
+Seeds N transactions (default 100k) for a throwaway user in the database from
+MONGODB_URI (use a local mongod), builds that user's rollups with the same
+$inc builder the write path uses, times both implementations, then cleans up.
+
+Run from backend/:  python -m benchmarks.bench_dashboard_aggregation [--rows 100000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from beanie import PydanticObjectId, init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.spending_rollup import SpendingRollup
+from app.models.transaction import Transaction
+from app.services.rollup_service import rollup_operations, rollup_service
+
+load_dotenv()
+
+
+async def seed(user_id: PydanticObjectId, rows: int):
+    rng = random.Random(7)
+    now = datetime.now()
+    collection = Transaction.get_motor_collection()
+    batch = []
+    for index in range(rows):
+        batch.append({
+            "user_id": user_id,
+            "amount": round(rng.uniform(20, 3000), 2),
+            "category": "Food & Dining",
+            "description": "bench",
+            "merchant": "Unknown",
+            "transaction_type": "credit" if rng.random() < 0.05 else "debit",
+            "payment_method": "upi",
+            # ~3 years of history
+            "date": now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+        })
+        if len(batch) == 10_000 or index == rows - 1:
+            await collection.insert_many(batch, ordered=False)
+            await SpendingRollup.get_motor_collection().bulk_write(rollup_operations(batch, now), ordered=False)
+            batch = []
+
+
+async def raw_chart(user_id, since):
+    # Pre-rollup implementation of GET /transactions/chart-data
+    txs = await Transaction.find(
+        Transaction.user_id == user_id,
+        Transaction.transaction_type == "debit",
+        Transaction.date >= since,
+    ).to_list()
+    totals = {}
+    for t in txs:
+        key = t.date.strftime("%Y-%m-%d")
+        totals[key] = totals.get(key, 0) + t.amount
+    return totals
+
+
+async def raw_balance(user_id):
+    # Pre-rollup implementation of the /chat balance context
+    txs = await Transaction.find(Transaction.user_id == user_id).to_list()
+    income = sum(t.amount for t in txs if t.transaction_type == "credit")
+    expenses = sum(t.amount for t in txs if t.transaction_type == "debit")
+    return income - expenses
+
+
+async def measure(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    await init_beanie(database=client.finwise_bench, document_models=[Transaction, SpendingRollup])
+
+    user_id = PydanticObjectId()
+    print(f"Seeding {args.rows:,} transactions...")
+    await seed(user_id, args.rows)
+    # From midnight: rollups bucket whole days, the raw scan would cut the first day short
+    since = (datetime.now() - timedelta(days=7)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    try:
+        # Same answers first, so the timings compare like with like
+        chart, rolled = await raw_chart(user_id, since), await rollup_service.daily_debits(user_id, since)
+        assert all(abs(chart[day] - rolled.get(day, 0)) < 0.01 for day in chart), "chart mismatch"
+        balance = await raw_balance(user_id)
+        assert abs(balance - (await rollup_service.totals(user_id))["balance"]) < 0.01, "balance mismatch"
+
+        cases = [
+            ("chart (7 days)", lambda: raw_chart(user_id, since), lambda: rollup_service.daily_debits(user_id, since)),
+            ("balance (all)", lambda: raw_balance(user_id), lambda: rollup_service.totals(user_id)),
+        ]
+        print(f"{'query':<16} | {'raw scan ms':>11} | {'rollups ms':>10} | {'speedup':>7}")
+        for name, old, new in cases:
+            old_ms = await measure(old, args.repeat)
+            new_ms = await measure(new, args.repeat)
+            print(f"{name:<16} | {old_ms:>11.1f} | {new_ms:>10.1f} | {old_ms / new_ms:>6.1f}x")
+    finally:
+        await Transaction.find(Transaction.user_id == user_id).delete()
+        await SpendingRollup.find(SpendingRollup.user_id == user_id).delete()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""Login storm: logins/sec, and how much an unrelated endpoint suffers meanwhile.
+
+Start the API first (uvicorn app.main:app), and create the user with seed_user.py.
+
+Run from backend/:
+    python -m benchmarks.bench_login_storm --email chiragmishra120@gmail.com --password password123
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks.harness import percentile
+
+
+async def login_worker(client, args, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/api/auth/login", json={"username": args.email, "password": args.password})
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def probe_worker(client, deadline, latencies):
+    # The "unrelated endpoint": if bcrypt blocks the loop, this is what stalls
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.02)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=15)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        baseline = []
+        await probe_worker(client, time.perf_counter() + 2, baseline)
+
+        logins, probes, errors = [], [], []
+        deadline = time.perf_counter() + args.seconds
+        started = time.perf_counter()
+        await asyncio.gather(
+            probe_worker(client, deadline, probes),
+            *(login_worker(client, args, deadline, logins, errors) for _ in range(args.concurrency)),
+        )
+        elapsed = time.perf_counter() - started
+
+    print(f"logins:        {len(logins)} in {elapsed:.1f}s = {len(logins) / elapsed:.1f}/sec ({len(errors)} errors)")
+    print(f"login latency: p50 {statistics.median(logins):.0f}ms  p99 {percentile(logins, 99):.0f}ms")
+    print(f"GET / idle:    p50 {statistics.median(baseline):.1f}ms  p99 {percentile(baseline, 99):.1f}ms")
+    print(f"GET / storm:   p50 {statistics.median(probes):.1f}ms  p99 {percentile(probes, 99):.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""Magic-parse accuracy and latency: rules vs hybrid (rules, LLM when unsure) vs LLM only.
+
+Scores every line of benchmarks/data/magic_parse_corpus.jsonl on amount,
+category, debit/credit and (where labeled) the relative date.
+
+Run from backend/:
+    python -m benchmarks.bench_magic_parse            # rules only, no network
+    python -m benchmarks.bench_magic_parse --llm      # also hybrid + LLM-only (needs GROQ_API_KEY or LLM_BASE_URL)
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.magic_parser import MagicParser
+from app.services.merchant_matcher import DEFAULT_RULES_PATH, MerchantMatcher
+from benchmarks.harness import percentile
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "magic_parse_corpus.jsonl"
+
+
+def score(case, draft, now):
+    checks = {
+        "amount": draft.get("amount") is not None and abs(draft["amount"] - case["amount"]) < 0.01,
+        "category": (draft.get("category") or "").lower() == case["category"].lower(),
+        "type": draft.get("transaction_type") == case.get("transaction_type", "debit"),
+    }
+    if "days_ago" in case and draft.get("date"):
+        checks["date"] = (now.date() - draft["date"].date()).days == case["days_ago"]
+    return checks
+
+
+def report(name, results, latencies, served=None):
+    fields = ("amount", "category", "type", "date")
+    parts = []
+    for field in fields:
+        marks = [r[field] for r in results if field in r]
+        if marks:
+            parts.append(f"{field} {100 * sum(marks) / len(marks):5.1f}%")
+    all_correct = sum(all(r.values()) for r in results)
+    print(f"{name:<8} " + "  ".join(parts) + f"  | all-correct {100 * all_correct / len(results):5.1f}%")
+    print(
+        f"{'':<8} latency p50 {statistics.median(latencies):8.3f} ms  p95 {percentile(latencies, 95):8.3f} ms"
+        f"  mean {statistics.fmean(latencies):8.3f} ms"
+    )
+    if served:
+        print(f"{'':<8} served by {dict(served)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm", action="store_true", help="also run the hybrid and LLM-only paths")
+    parser.add_argument("--verbose", action="store_true", help="print every miss")
+    args = parser.parse_args()
+
+    cases = [json.loads(line) for line in CORPUS_PATH.read_text(encoding="utf-8").splitlines() if line.strip()]
+    magic = MagicParser(MerchantMatcher.from_file(DEFAULT_RULES_PATH))
+    now = datetime.now()
+    print(f"📚 {len(cases)} labeled inputs\n")
+
+    results, latencies, confident = [], [], 0
+    for case in cases:
+        start = time.perf_counter()
+        draft = magic.parse(case["text"], now)
+        latencies.append((time.perf_counter() - start) * 1000)
+        checks = score(case, draft, now)
+        results.append(checks)
+        confident += draft["confidence"] >= settings.MAGIC_PARSE_MIN_CONFIDENCE
+        if args.verbose and not all(checks.values()):
+            print(f"   miss ({draft['confidence']}): {case['text']!r} -> {draft}")
+    report("rules", results, latencies)
+    print(f"{'':<8} confident (no LLM needed) on {confident}/{len(cases)}\n")
+
+    if not args.llm:
+        return
+
+    try:
+        for name in ("hybrid", "llm"):
+            results, latencies = [], []
+            magic.served.clear()
+            for case in cases:
+                start = time.perf_counter()
+                try:
+                    if name == "hybrid":
+                        draft = await magic.parse_text(case["text"], now)
+                    else:
+                        # The LLM isn't given a date, so only amount/category/type are scored
+                        draft = await magic.llm_parse(case["text"])
+                except Exception as e:
+                    print(f"   {name} failed on {case['text']!r}: {e}")
+                    draft = {}
+                latencies.append((time.perf_counter() - start) * 1000)
+                results.append(score(case, draft, now))
+            report(name, results, latencies, magic.served if name == "hybrid" else None)
+            print()
+    finally:
+        await llm_gateway.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
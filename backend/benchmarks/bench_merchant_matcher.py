@@ -0,0 +1,67 @@
+"""Micro-benchmark: compiled MerchantMatcher vs the old keyword_map loop.
+
+Run from backend/:  python -m benchmarks.bench_merchant_matcher
+"""
+import random
+import string
+import time
+
+from app.services.merchant_matcher import MerchantMatcher, MerchantRule, load_rules
+
+CATEGORIES = ["Food & Dining", "Transport", "Shopping", "Groceries", "Utilities", "Health", "Entertainment"]
+SAMPLE_TEXTS = [
+    "upi/swiggy@icici/order 4432 ",
+    "chai point koramangala ",
+    "monthly salary credit acme corp ",
+    "neft rent transfer to landlord ",
+    "pos 4021 starbucks mg road ",
+    "amazon prime annual renewal ",
+    "petrol pump hp indiranagar ",
+    "upi/9876543210@ybl/random person ",
+]
+
+
+def synthetic_rules(n: int, rng: random.Random):
+    base = load_rules()
+    rules = list(base)
+    while len(rules) < n:
+        keyword = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 14)))
+        rules.append(MerchantRule(keyword, rng.choice(CATEGORIES)))
+    return rules[:n]
+
+
+def loop_categorize(keyword_map, text):
+    # The pre-matcher implementation: first hit in dict order wins
+    for keyword, category in keyword_map.items():
+        if keyword in text:
+            return category
+    return None
+
+
+def timeit(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in texts:
+            fn(t)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'rules':>7} | {'build ms':>9} | {'loop us/txn':>12} | {'matcher us/txn':>15} | {'speedup':>7}")
+    for n in (25, 1_000, 10_000):
+        rules = synthetic_rules(n, rng)
+        keyword_map = {r.keyword: r.category for r in rules}
+
+        start = time.perf_counter()
+        matcher = MerchantMatcher(rules)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        repeat = max(20, 20_000 // n)
+        loop_us = timeit(lambda t: loop_categorize(keyword_map, t), SAMPLE_TEXTS, repeat)
+        matcher_us = timeit(matcher.match, SAMPLE_TEXTS, repeat)
+        print(f"{n:>7} | {build_ms:>9.1f} | {loop_us:>12.2f} | {matcher_us:>15.2f} | {loop_us / matcher_us:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Budget-alert engine check against a local SMTP sink (aiosmtpd).
+
+Creates throwaway users and current-month rollups in the database from
+MONGODB_URI, runs the alert engine against an in-process aiosmtpd server and
+checks: one email per alerting user, none for safe users, duplicates suppressed
+on repeated notifications, escalation from warning to critical, a reused SMTP
+connection, and retries through transient 4xx failures. Cleans up afterwards.
+
+Needs aiosmtpd (pip install aiosmtpd). Run from backend/:
+    python -m benchmarks.check_alert_delivery [--users 300] [--flaky 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+from aiosmtpd.controller import Controller
+from beanie import PydanticObjectId, init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.models.budget_alert import BudgetAlert
+from app.models.spending_rollup import SpendingRollup
+from app.models.user import User
+from app.services.alert_engine import alert_engine
+from app.services.email_service import alert_level, mailer
+from app.services.rollup_service import month_key
+
+load_dotenv()
+
+ALLOWANCE = 10_000.0
+
+
+class SinkHandler:
+    """Collects delivered messages; the first `flaky` DATA commands get a 451."""
+
+    def __init__(self, flaky: int):
+        self.flaky = flaky
+        self.sessions = 0
+        self.recipients = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.flaky > 0:
+            self.flaky -= 1
+            return "451 Try again later"
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+async def set_spend(user_ids, fraction):
+    collection = SpendingRollup.get_motor_collection()
+    for user_id in user_ids:
+        await collection.update_one(
+            {"user_id": user_id, "month": month_key(datetime.now())},
+            {"$set": {"debit_total": ALLOWANCE * fraction, "updated_at": datetime.now()}},
+            upsert=True,
+        )
+
+
+async def notify_all(user_ids, times=1):
+    for _ in range(times):
+        for user_id in user_ids:
+            alert_engine.notify(user_id)
+    await alert_engine.drain(timeout=120)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--flaky", type=int, default=5, help="transient 451s to inject")
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.flaky)
+    controller = Controller(handler, hostname="127.0.0.1", port=args.port)
+    controller.start()
+    settings.MAIL_SERVER, settings.MAIL_PORT, settings.MAIL_STARTTLS = "127.0.0.1", args.port, False
+    settings.MAIL_USERNAME = settings.MAIL_PASSWORD = None
+    settings.ALERT_BATCH_WAIT_SECONDS = 0.2
+    settings.ALERT_RETRY_BASE_SECONDS = 0.05
+    settings.ALERTS_ENABLED = True
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+    await init_beanie(database=client.finwise, document_models=[User, SpendingRollup, BudgetAlert])
+
+    run_id = PydanticObjectId()
+    users = [
+        User(email=f"alert-check-{run_id}-{i}@example.com", full_name=f"Check {i}", hashed_password="x", monthly_allowance=ALLOWANCE)
+        for i in range(args.users)
+    ]
+    await User.insert_many(users)
+    users = await User.find({"email": {"$regex": f"^alert-check-{run_id}-"}}).to_list()
+    ids = [u.id for u in users]
+    safe, warning, high = ids[0::3], ids[1::3], ids[2::3]
+    # > 90% is "critical" only with more than 5 days left in the month, "warning" otherwise
+    high_level = alert_level(ALLOWANCE * 0.95, ALLOWANCE)
+
+    failures = 0
+
+    def check(name, ok, detail=""):
+        nonlocal failures
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {name}" + ("" if ok else f": {detail}"))
+
+    try:
+        await set_spend(safe, 0.5)
+        await set_spend(warning, 0.8)
+        await set_spend(high, 0.95)
+        alert_engine.start()
+
+        start = time.perf_counter()
+        await notify_all(ids, times=3)
+        elapsed = time.perf_counter() - start
+        delivered = list(handler.recipients)
+        expected = {u.email for u in users if u.id in set(warning) | set(high)}
+        print(f"📧 {len(delivered)} alerts in {elapsed:.2f}s over {handler.sessions} SMTP session(s)")
+
+        check("one email per alerting user", sorted(delivered) == sorted(expected), f"{len(delivered)} sent, {len(expected)} expected")
+        check("no email for safe users", not any(u.email in delivered for u in users if u.id in set(safe)))
+        check("SMTP connection reused", mailer.connections_opened == 1, f"{mailer.connections_opened} connections")
+        check("transient failures retried", handler.flaky == 0, f"{handler.flaky} 451s never hit")
+
+        await notify_all(ids)
+        check("repeat notifications deduped", len(handler.recipients) == len(delivered), f"{len(handler.recipients) - len(delivered)} extra")
+
+        # Warning users now cross 90%: escalation only happens when that means "critical"
+        await set_spend(warning, 0.95)
+        await notify_all(warning)
+        escalated = len(handler.recipients) - len(delivered)
+        want = len(warning) if high_level == "critical" else 0
+        check(f"escalation to {high_level}", escalated == want, f"{escalated} sent, {want} expected")
+
+        statuses = await BudgetAlert.get_motor_collection().distinct("status", {"user_id": {"$in": ids}})
+        check("all alerts marked sent", statuses == ["sent"], f"statuses {statuses}")
+        return 1 if failures else 0
+    finally:
+        await alert_engine.stop()
+        await BudgetAlert.find({"user_id": {"$in": ids}}).delete()
+        await SpendingRollup.find({"user_id": {"$in": ids}}).delete()
+        await User.find({"_id": {"$in": ids}}).delete()
+        client.close()
+        controller.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,118 @@
+"""Cold-start check: how long a fresh API worker takes to import and wire the app.
+
+Each run is a new interpreter (nothing cached in sys.modules) that imports
+app.main and builds the services the lifespan builds before connecting to
+Mongo. Fails (exit 1) if the median boot exceeds --budget-ms, or if importing
+the app pulled in a module that must load on first use (pandas, prophet,
+numpy, pypdf, groq; the Groq SDK is loaded by the lifespan, once).
+
+--profile prints the import-time breakdown instead (python -X importtime),
+per module and summed per top-level package.
+
+Run from backend/:
+    python -m benchmarks.check_cold_start [--runs 5] [--budget-ms 2000]
+    python -m benchmarks.check_cold_start --profile [--top 25]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+LAZY_MODULES = ("pandas", "prophet", "numpy", "pypdf", "groq")
+
+BOOT = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+loaded = [m for m in %r if m in sys.modules]
+from app.routes import transactions
+from app.services.llm_gateway import llm_gateway
+transactions.setup()
+asyncio.run(llm_gateway.startup())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "setup_ms": (ready - imported) * 1000,
+    "loaded": loaded,
+}))
+""" % (LAZY_MODULES,)
+
+
+def boot_once() -> dict:
+    spawned = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", BOOT], capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - spawned) * 1000
+    return result
+
+
+def import_profile():
+    """[(module, self us, cumulative us, depth)] from one `python -X importtime` run."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def print_profile(top: int):
+    rows = import_profile()
+    total = sum(self_us for _, self_us, _, _ in rows)
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"⏱️  import app.main: {total / 1000:.0f} ms across {len(rows)} modules\n")
+    print(f"{'package':<32} {'ms':>8} {'share':>7}")
+    for name, self_us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{name:<32} {self_us / 1000:>8.1f} {self_us / total:>7.1%}")
+
+    print(f"\n{'module (cumulative)':<48} {'ms':>8}")
+    for name, _, cumulative_us, depth in sorted(rows, key=lambda r: -r[2])[:top]:
+        print(f"{'  ' * min(depth, 4) + name:<48} {cumulative_us / 1000:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000, help="median import + setup budget")
+    parser.add_argument("--profile", action="store_true", help="print the import-time breakdown and exit")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    if args.profile:
+        print_profile(args.top)
+        return 0
+
+    boot_once()  # warm the OS file cache and .pyc files; not counted
+    runs = [boot_once() for _ in range(args.runs)]
+    boot = statistics.median(r["import_ms"] + r["setup_ms"] for r in runs)
+    print(f"import  median {statistics.median(r['import_ms'] for r in runs):7.0f} ms")
+    print(f"setup   median {statistics.median(r['setup_ms'] for r in runs):7.0f} ms")
+    print(f"process median {statistics.median(r['process_ms'] for r in runs):7.0f} ms (interpreter start to ready)")
+
+    failed = False
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    if loaded:
+        print(f"❌ loaded at import, should be imported on first use: {', '.join(loaded)}")
+        failed = True
+    if boot > args.budget_ms:
+        print(f"❌ cold start {boot:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print(f"✅ cold start {boot:.0f} ms (budget {args.budget_ms:.0f} ms), no heavy modules at boot")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Concurrency check: N parallel contributions to one goal must all land.
+
+Creates a throwaway goal in the database from MONGODB_URI (MongoDB 4.2+, for
+pipeline updates), fires --contributions add-funds calls at once through
+GoalService.update_progress, then checks the balance, the ledger, the milestones
+and the status. Cleans up afterwards.
+
+Run from backend/:  python -m benchmarks.check_goal_concurrency [--contributions 1000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from beanie import PydanticObjectId, init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.goal import Goal, GoalContribution
+from app.services.goal_service import GoalService
+
+load_dotenv()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contributions", type=int, default=1000)
+    parser.add_argument("--amount", type=float, default=10.0)
+    args = parser.parse_args()
+
+    # Enough pooled connections that the updates really do race on the server
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"), maxPoolSize=200)
+    await init_beanie(database=client.finwise, document_models=[Goal, GoalContribution])
+
+    user_id = PydanticObjectId()
+    expected = args.contributions * args.amount
+    # Target sits between the 75% and 100% milestones once every contribution is in
+    target = expected / 0.8
+    service = GoalService()
+    goal = await service.create_goal(user_id, {
+        "title": "Concurrency check",
+        "target_amount": target,
+        "deadline": datetime.now() + timedelta(days=90),
+        "category": "bench",
+    })
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(service.update_progress(str(goal.id), args.amount, user_id) for _ in range(args.contributions)),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - start
+        errors = [r for r in results if isinstance(r, Exception) or r is None]
+
+        final = await Goal.get(goal.id)
+        ledger = await GoalContribution.find(GoalContribution.goal_id == goal.id).to_list()
+        balances = sorted(c.balance_after for c in ledger)
+        reached = [m["percentage"] for m in final.milestones if m.get("reached")]
+
+        checks = [
+            ("no failed contributions", not errors, f"{len(errors)} failed"),
+            ("balance", abs(final.current_amount - expected) < 1e-6, f"{final.current_amount} != {expected}"),
+            ("ledger rows", len(ledger) == args.contributions, f"{len(ledger)} != {args.contributions}"),
+            ("ledger total", abs(sum(c.amount for c in ledger) - expected) < 1e-6, "ledger doesn't add up"),
+            # Every contribution saw a distinct running balance: no two read the same value
+            ("serialized balances", balances == [args.amount * (i + 1) for i in range(args.contributions)], "duplicate balance_after"),
+            ("milestones", reached == [25, 50, 75], f"reached {reached}"),
+            ("status", final.status == "active", f"status {final.status}"),
+        ]
+
+        print(f"⚡ {args.contributions} contributions in {elapsed:.2f}s ({args.contributions / elapsed:.0f}/sec)")
+        failures = 0
+        for name, ok, detail in checks:
+            print(f"{'✅' if ok else '❌'} {name}" + ("" if ok else f": {detail}"))
+            failures += not ok
+        return 1 if failures else 0
+    finally:
+        await GoalContribution.find(GoalContribution.goal_id == goal.id).delete()
+        await goal.delete()
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
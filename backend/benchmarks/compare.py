@@ -0,0 +1,82 @@
+"""Compares two benchmarks.loadtest result files and flags regressions.
+
+An endpoint regresses when its p95 or p99 grows, or its throughput drops, by
+more than --threshold (relative), or when its error rate grows. Latency
+changes smaller than --min-delta-ms are treated as noise. Exits 1 if anything
+regressed, so it can gate CI.
+
+Run from backend/:
+    python -m benchmarks.compare benchmarks/results/baseline.json benchmarks/results/candidate.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(old, new):
+    if not old:
+        return 0.0
+    return (new - old) / old
+
+
+def error_rate(row):
+    total = row["count"] + row["errors"]
+    return row["errors"] / total if total else 0.0
+
+
+def compare(baseline, candidate, threshold, min_delta_ms):
+    """Yields (endpoint, baseline row, candidate row, regressions) per endpoint in either run."""
+    old_rows, new_rows = baseline["endpoints"], candidate["endpoints"]
+    for label in sorted(set(old_rows) | set(new_rows)):
+        old, new = old_rows.get(label), new_rows.get(label)
+        if old is None or new is None:
+            yield label, old, new, []
+            continue
+        regressions = []
+        for metric in ("p95", "p99"):
+            if change(old[metric], new[metric]) > threshold and new[metric] - old[metric] > min_delta_ms:
+                regressions.append(f"{metric} +{change(old[metric], new[metric]):.0%}")
+        if change(old["throughput"], new["throughput"]) < -threshold:
+            regressions.append(f"req/s {change(old['throughput'], new['throughput']):.0%}")
+        if error_rate(new) > error_rate(old) + 0.01:
+            regressions.append(f"errors {error_rate(old):.1%} -> {error_rate(new):.1%}")
+        yield label, old, new, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore latency changes smaller than this")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline {baseline['meta']['commit']} ({baseline['meta']['started']})  vs  "
+          f"candidate {candidate['meta']['commit']} ({candidate['meta']['started']})\n")
+    print(f"{'endpoint':<34} {'req/s':>16} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16}")
+
+    regressed = 0
+    for label, old, new, regressions in compare(baseline, candidate, args.threshold, args.min_delta_ms):
+        if old is None or new is None:
+            print(f"{label:<34} {'only in ' + ('candidate' if old is None else 'baseline'):>16}")
+            continue
+        cells = [
+            f"{new[m]:.1f} ({change(old[m], new[m]):+.0%})".rjust(16)
+            for m in ("throughput", "p50", "p95", "p99")
+        ]
+        status = f"❌ {', '.join(regressions)}" if regressions else "✅"
+        print(f"{label:<34} {' '.join(cells)}  {status}")
+        regressed += bool(regressions)
+
+    print(f"\n{'❌' if regressed else '✅'} {regressed} endpoint(s) regressed beyond {args.threshold:.0%}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
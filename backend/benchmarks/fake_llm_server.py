@@ -0,0 +1,141 @@
+"""Local stand-in for the Groq chat completions API, for benchmarks.
+
+Speaks the OpenAI-compatible wire format (JSON, or SSE when "stream": true) and
+generates a canned reply at a fixed pace, so latency numbers measure our code
+and not the network or the model. Can throttle every Nth request with a 429
+and Retry-After, and counts client connections (GET /_stats).
+
+Run from backend/:
+    python -m benchmarks.fake_llm_server --port 9100 --first-token-ms 400 --token-ms 30 [--rate-limit-every 10]
+
+then start the API against it:
+    LLM_BASE_URL=http://127.0.0.1:9100 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = (
+    "Looking at your spending this month, food delivery is your biggest flexible expense. "
+    "Cutting two orders a week would save roughly ₹3,200 a month, or ₹38,400 a year. "
+    "Try setting a weekly delivery budget and cooking in bulk on Sundays. "
+    "You are already doing well on transport, so keep that habit going!"
+)
+
+app = FastAPI()
+app.state.first_token_ms = 400
+app.state.token_ms = 30
+app.state.rate_limit_every = 0  # 0 = never throttle
+app.state.retry_after = 0.05
+app.state.connections = set()
+app.state.requests = 0
+
+
+@app.middleware("http")
+async def count_connections(request: Request, call_next):
+    # One (host, port) pair per TCP connection from the client
+    app.state.connections.add(tuple(request.scope.get("client") or ()))
+    return await call_next(request)
+
+
+@app.get("/_stats")
+async def stats():
+    return {"connections": len(app.state.connections), "requests": app.state.requests}
+
+
+@app.post("/_stats/reset")
+async def reset_stats():
+    app.state.connections.clear()
+    app.state.requests = 0
+    return {"ok": True}
+
+
+def _tokens():
+    # Whitespace-preserving "tokens": one word per chunk
+    words = REPLY.split(" ")
+    return [w if i == len(words) - 1 else w + " " for i, w in enumerate(words)]
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    app.state.requests += 1
+    every = app.state.rate_limit_every
+    if every and app.state.requests % every == 0:
+        return JSONResponse(
+            {"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}},
+            status_code=429,
+            headers={"Retry-After": f"{app.state.retry_after:g}"},
+        )
+
+    body = await request.json()
+    model = body.get("model", "fake-model")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    first_token = app.state.first_token_ms / 1000
+    per_token = app.state.token_ms / 1000
+    tokens = _tokens()
+
+    if body.get("stream"):
+        async def events():
+            await asyncio.sleep(first_token)
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            for token in tokens:
+                yield _chunk(completion_id, model, {"content": token})
+                await asyncio.sleep(per_token)
+            yield _chunk(completion_id, model, {}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # Non-streaming: the client sees nothing until generation is finished
+    await asyncio.sleep(first_token + per_token * len(tokens))
+    return JSONResponse({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=30)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with a 429")
+    parser.add_argument("--retry-after", type=float, default=0.05, help="Retry-After seconds on those 429s")
+    parser.add_argument("--ssl-certfile")
+    parser.add_argument("--ssl-keyfile")
+    args = parser.parse_args()
+
+    app.state.first_token_ms = args.first_token_ms
+    app.state.token_ms = args.token_ms
+    app.state.rate_limit_every = args.rate_limit_every
+    app.state.retry_after = args.retry_after
+    uvicorn.run(
+        app, host=args.host, port=args.port, log_level="warning",
+        ssl_certfile=args.ssl_certfile, ssl_keyfile=args.ssl_keyfile,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Shared pieces for the offline load tests: local services, timing stats, fixtures.
+
+Everything runs on this machine: a throwaway mongod (from PATH) in a temp
+directory, the fake LLM server, and the API itself under uvicorn, each as a
+subprocess that is torn down with the harness.
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(latencies_ms: List[float], errors: int, seconds: float) -> Dict[str, float]:
+    count = len(latencies_ms)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput": round(count / seconds, 2) if seconds else 0.0,
+        "mean": round(sum(latencies_ms) / count, 2) if count else 0.0,
+        "p50": round(percentile(latencies_ms, 50), 2),
+        "p95": round(percentile(latencies_ms, 95), 2),
+        "p99": round(percentile(latencies_ms, 99), 2),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout:.0f}s")
+
+
+def wait_for_http(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up after {timeout:.0f}s")
+
+
+class LocalStack:
+    """Starts mongod (unless a URI is given), the fake LLM and the API; stops them on exit."""
+
+    def __init__(
+        self,
+        mongo_uri: Optional[str] = None,
+        llm_latency_ms: float = 400,
+        llm_token_ms: float = 0,
+        llm_rate_limit_every: int = 0,
+        api_workers: int = 1,
+        api_env: Optional[Dict[str, str]] = None,
+    ):
+        self.mongo_uri = mongo_uri
+        self.llm_latency_ms = llm_latency_ms
+        self.llm_token_ms = llm_token_ms
+        self.llm_rate_limit_every = llm_rate_limit_every
+        self.api_workers = api_workers
+        self.api_env = api_env or {}
+        self.api_url = ""
+        self._processes: List[subprocess.Popen] = []
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+
+    def _spawn(self, command: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+        self._processes.append(process)
+        return process
+
+    def _start_mongod(self) -> str:
+        mongod = shutil.which("mongod")
+        if mongod is None:
+            raise RuntimeError("mongod not found on PATH; install MongoDB or pass --mongo-uri")
+        port = free_port()
+        self._spawn([mongod, "--dbpath", self._tmp.name, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"])
+        wait_for_port(port)
+        return f"mongodb://127.0.0.1:{port}"
+
+    def __enter__(self) -> "LocalStack":
+        self._tmp = tempfile.TemporaryDirectory(prefix="moneypal-bench-")
+        try:
+            if not self.mongo_uri:
+                self.mongo_uri = self._start_mongod()
+
+            llm_port = free_port()
+            self._spawn([
+                sys.executable, "-m", "benchmarks.fake_llm_server", "--port", str(llm_port),
+                "--first-token-ms", str(self.llm_latency_ms), "--token-ms", str(self.llm_token_ms),
+                "--rate-limit-every", str(self.llm_rate_limit_every),
+            ])
+            wait_for_port(llm_port)
+
+            api_port = free_port()
+            env = {
+                **os.environ,
+                "MONGODB_URI": self.mongo_uri,
+                "LLM_BASE_URL": f"http://127.0.0.1:{llm_port}",
+                "SECRET_KEY": os.environ.get("SECRET_KEY", "bench-secret"),
+                "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "bench-key"),
+                # Nothing may leave the machine
+                "ALERTS_ENABLED": "false",
+                **self.api_env,
+            }
+            self._spawn([
+                sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port),
+                "--workers", str(self.api_workers), "--log-level", "warning",
+            ], env=env)
+            self.api_url = f"http://127.0.0.1:{api_port}"
+            wait_for_http(f"{self.api_url}/")
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        for process in reversed(self._processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes.clear()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+
+def make_statement_pdf(lines: List[str]) -> bytes:
+    """A minimal one-page text PDF (Helvetica, one line per row) that pypdf can read back."""
+    def escape(text: str) -> str:
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    content = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(f"({escape(line)}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
@@ -0,0 +1,306 @@
+"""Offline load test: per-endpoint throughput and p50/p95/p99 for the main user flows.
+
+By default it brings up its own stack (benchmarks.harness.LocalStack): a
+throwaway mongod from PATH, the fake LLM server and the API under uvicorn, so
+nothing leaves the machine and every run starts from the same empty database.
+Then it signs up --users users, imports a seeded 90-day statement for each,
+and runs each scenario for --warmup (unrecorded) plus --seconds at --concurrency:
+
+  login            POST /api/auth/login
+  add_transaction  POST /api/transactions/add (keyword hits and LLM misses)
+  chart            GET  /api/transactions/chart-data
+  chat_pdf         POST /api/chat with a statement PDF attached
+  goals            POST /api/goals/create, PUT /api/goals/{goal_id}/add, GET /api/goals/list
+  forecast         GET  /api/insights/forecast
+
+Results go to --out as JSON; compare two runs with benchmarks.compare.
+
+Run from backend/:
+    python -m benchmarks.loadtest --out benchmarks/results/baseline.json
+    python -m benchmarks.loadtest --mongo-uri mongodb://127.0.0.1:27017 --scenarios chart,forecast
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000   # an API you started yourself
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import httpx
+
+from benchmarks.harness import LocalStack, make_statement_pdf, summarize
+
+PASSWORD = "bench-password-123"
+
+# (description, merchant, amount range): the first half hit the keyword rules, the rest go to the LLM
+SPEND_TEMPLATES = [
+    ("UPI/SWIGGY ORDER", "Swiggy", (150, 900)),
+    ("UPI/ZOMATO", "Zomato", (120, 800)),
+    ("UBER TRIP", "Uber", (80, 600)),
+    ("AMAZON PAY", "Amazon", (200, 5000)),
+    ("BIGBASKET ORDER", "BigBasket", (300, 3000)),
+    ("NETFLIX SUBSCRIPTION", "Netflix", (199, 649)),
+    ("UPI/RAMESH KIRANA", None, (40, 400)),
+    ("UPI/CHAI POINT MG ROAD", None, (20, 120)),
+    ("POS 4411 SHARMA MEDICOS", None, (90, 1500)),
+    ("UPI/AUTO STAND PAYMENT", None, (30, 250)),
+]
+CHAT_QUESTIONS = [
+    "Where am I overspending this month?",
+    "How much did I spend on food delivery?",
+    "Can I afford a 20k phone next month?",
+    "Summarise this statement for me",
+    "What are my recurring payments?",
+    "How can I save 5000 more per month?",
+]
+
+
+class Recorder:
+    """Collects latencies (ms) of successful responses and failures per endpoint label.
+
+    A failed request (transport error or HTTP >= 400) only counts as an error,
+    so it neither skews the percentiles nor inflates throughput, and
+    count + errors is the number of requests sent.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.seconds: Dict[str, float] = {}
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            raise
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        else:
+            self.latencies[label].append((time.perf_counter() - start) * 1000)
+        return response
+
+    def results(self) -> Dict[str, dict]:
+        labels = sorted(set(self.latencies) | set(self.errors))
+        return {label: summarize(self.latencies[label], self.errors[label], self.seconds.get(label, 0.0)) for label in labels}
+
+
+class BenchUser:
+    def __init__(self, email: str):
+        self.email = email
+        self.headers: Dict[str, str] = {}
+        self.goal_ids: List[str] = []
+
+
+def statement_rows(rng: random.Random, days: int = 90) -> List[tuple]:
+    rows, today = [], datetime.now()
+    for day in range(days, 0, -1):
+        date = today - timedelta(days=day)
+        if date.day == 1:
+            rows.append((date, "SALARY CREDIT ACME PVT LTD", 85000.0, "credit"))
+        for _ in range(rng.randint(1, 4)):
+            description, _, (low, high) = rng.choice(SPEND_TEMPLATES)
+            rows.append((date, description, round(rng.uniform(low, high), 2), "debit"))
+    return rows
+
+
+def statement_csv(rows: List[tuple]) -> bytes:
+    lines = ["Date,Description,Amount,Type"]
+    lines += [f"{d.strftime('%d/%m/%Y')},{desc},{amount:.2f},{'CR' if kind == 'credit' else 'DR'}" for d, desc, amount, kind in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def statement_pdf(rows: List[tuple]) -> bytes:
+    lines = ["MONEYPAL BANK - ACCOUNT STATEMENT"]
+    lines += [f"{d.strftime('%d/%m/%Y')} {desc} {amount:,.2f} {'Cr' if kind == 'credit' else 'Dr'}" for d, desc, amount, kind in rows[-60:]]
+    return make_statement_pdf(lines)
+
+
+async def setup_users(client: httpx.AsyncClient, run_id: str, count: int, rng: random.Random) -> List[BenchUser]:
+    users = [BenchUser(f"bench-{run_id}-{i}@example.com") for i in range(count)]
+    semaphore = asyncio.Semaphore(8)
+
+    async def prepare(user: BenchUser):
+        async with semaphore:
+            response = await client.post("/api/auth/signup", json={"email": user.email, "password": PASSWORD, "full_name": "Bench User"})
+            response.raise_for_status()
+            response = await client.post("/api/auth/login", json={"username": user.email, "password": PASSWORD})
+            response.raise_for_status()
+            user.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+            await client.put("/api/users/me/budget", json={"monthly_allowance": 40000}, headers=user.headers)
+            csv = statement_csv(statement_rows(random.Random(rng.random())))
+            response = await client.post("/api/transactions/import", files={"file": ("statement.csv", csv, "text/csv")}, headers=user.headers)
+            response.raise_for_status()
+
+    await asyncio.gather(*(prepare(u) for u in users))
+    return users
+
+
+# --- Scenarios: one iteration each; every request is recorded under its endpoint label ---
+
+async def scenario_login(client, rec, user, rng, ctx):
+    await rec.request(client, "POST /api/auth/login", "POST", "/api/auth/login", json={"username": user.email, "password": PASSWORD})
+
+
+async def scenario_add_transaction(client, rec, user, rng, ctx):
+    description, merchant, (low, high) = rng.choice(SPEND_TEMPLATES)
+    # A made-up word on some misses keeps the category cache (which ignores digits) from answering everything
+    if merchant is None and rng.random() < 0.5:
+        description = f"{description} {''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(6))}"
+    await rec.request(client, "POST /api/transactions/add", "POST", "/api/transactions/add", headers=user.headers, json={
+        "amount": round(rng.uniform(low, high), 2), "description": description, "merchant": merchant, "transaction_type": "debit",
+    })
+
+
+async def scenario_chart(client, rec, user, rng, ctx):
+    await rec.request(client, "GET /api/transactions/chart-data", "GET", "/api/transactions/chart-data", headers=user.headers)
+
+
+async def scenario_chat_pdf(client, rec, user, rng, ctx):
+    await rec.request(
+        client, "POST /api/chat (pdf)", "POST", "/api/chat", headers=user.headers,
+        data={"message": rng.choice(CHAT_QUESTIONS), "language": "English"},
+        files={"file": ("statement.pdf", ctx["pdf"], "application/pdf")},
+    )
+
+
+async def scenario_goals(client, rec, user, rng, ctx):
+    if not user.goal_ids or rng.random() < 0.1:
+        response = await rec.request(client, "POST /api/goals/create", "POST", "/api/goals/create", headers=user.headers, json={
+            "title": "Emergency fund", "target_amount": 100000, "category": "savings",
+            "deadline": (datetime.now() + timedelta(days=365)).isoformat(),
+        })
+        if response.status_code == 200:
+            body = response.json()
+            user.goal_ids.append(body.get("_id") or body.get("id"))
+    if user.goal_ids:
+        goal_id = rng.choice(user.goal_ids)
+        await rec.request(client, "PUT /api/goals/{goal_id}/add", "PUT", f"/api/goals/{goal_id}/add", headers=user.headers, json={"amount_added": 500})
+    await rec.request(client, "GET /api/goals/list", "GET", "/api/goals/list", headers=user.headers)
+
+
+async def scenario_forecast(client, rec, user, rng, ctx):
+    await rec.request(client, "GET /api/insights/forecast", "GET", "/api/insights/forecast", headers=user.headers)
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "login": scenario_login,
+    "add_transaction": scenario_add_transaction,
+    "chart": scenario_chart,
+    "chat_pdf": scenario_chat_pdf,
+    "goals": scenario_goals,
+    "forecast": scenario_forecast,
+}
+
+
+async def run_scenario(name, client, rec, users, args, ctx, seconds):
+    scenario = SCENARIOS[name]
+    before = {label: len(samples) for label, samples in rec.latencies.items()}
+    deadline = time.perf_counter() + seconds
+
+    async def worker(worker_id: int):
+        rng = random.Random(f"{args.seed}-{name}-{worker_id}-{seconds}")
+        while time.perf_counter() < deadline:
+            try:
+                await scenario(client, rec, rng.choice(users), rng, ctx)
+            except httpx.HTTPError:
+                pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    for label, samples in rec.latencies.items():
+        if len(samples) != before.get(label, 0):
+            rec.seconds[label] = rec.seconds.get(label, 0.0) + elapsed
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results: Dict[str, dict]):
+    print(f"\n{'endpoint':<34} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for label, row in results.items():
+        print(f"{label:<34} {row['throughput']:8.1f} {row['p50']:8.1f} {row['p95']:8.1f} {row['p99']:8.1f} {row['errors']:7d}")
+    print("(latencies in ms)")
+
+
+async def run(args, url: str) -> dict:
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time())}-{rng.randint(0, 9999):04d}"
+    limits = httpx.Limits(max_connections=args.concurrency + 8, max_keepalive_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        print(f"👥 Preparing {args.users} users (signup, login, 90-day statement import)...")
+        users = await setup_users(client, run_id, args.users, rng)
+        ctx = {"pdf": statement_pdf(statement_rows(random.Random(args.seed)))}
+
+        rec = Recorder()
+        for name in args.scenarios:
+            print(f"🏃 {name}: {args.warmup:.0f}s warm-up + {args.seconds:.0f}s at concurrency {args.concurrency}")
+            # Unrecorded pass: first forecast fits, cold caches and pool ramp-up would skew p99
+            await run_scenario(name, client, Recorder(), users, args, ctx, args.warmup)
+            await run_scenario(name, client, rec, users, args, ctx, args.seconds)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "args": {k: v for k, v in vars(args).items() if k != "out"},
+        },
+        "endpoints": rec.results(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="benchmark an API that is already running instead of starting one")
+    parser.add_argument("--mongo-uri", help="use this MongoDB instead of a throwaway mongod")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3, help="unrecorded seconds before each scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the self-hosted API")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--llm-429-every", type=int, default=0, help="fake LLM answers every Nth call with a 429")
+    parser.add_argument("--out", help="write the results JSON here")
+    args = parser.parse_args()
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if args.url:
+        results = asyncio.run(run(args, args.url))
+    else:
+        with LocalStack(
+            mongo_uri=args.mongo_uri,
+            llm_latency_ms=args.llm_latency_ms,
+            llm_rate_limit_every=args.llm_429_every,
+            api_workers=args.workers,
+        ) as stack:
+            results = asyncio.run(run(args, stack.api_url))
+
+    print_table(results["endpoints"])
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
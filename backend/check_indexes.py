@@ -0,0 +1,98 @@
+"""Explain-plan check: every hot route query must be served by an index, not a COLLSCAN.
+
+Paginated listings must also come back in index order (no in-memory SORT stage),
+otherwise page N would cost more than page 1.
+
+Usage:  python check_indexes.py [user@email.com]
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.goal import Goal
+from app.models.merchant_category import MerchantCategory
+from app.models.transaction import Transaction
+from app.services.transaction_listing import decode_cursor, encode_cursor
+from app.models.user import User
+
+load_dotenv()
+
+
+def plan_stages(plan: dict):
+    """Yields every stage name in a (possibly nested) winning plan."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+async def explain(collection, query: dict, sort=None) -> dict:
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    return await cursor.explain()
+
+
+async def main():
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+    # init_beanie syncs the declared indexes, exactly like the API's lifespan
+    await init_beanie(database=client.finwise, document_models=[User, Transaction, Goal, MerchantCategory])
+
+    email = sys.argv[1] if len(sys.argv) > 1 else None
+    user = await (User.find_one(User.email == email) if email else User.find_one())
+    if not user:
+        print("❌ No user found. Run seed_user.py first!")
+        return 1
+
+    week_ago = datetime.now() - timedelta(days=7)
+    after_date, after_id = decode_cursor(encode_cursor(datetime.now(), user.id))
+    after = {"date": {"$lte": after_date}, "$or": [{"date": {"$lt": after_date}}, {"date": after_date, "_id": {"$lt": after_id}}]}
+    page_sort = [("date", -1), ("_id", -1)]
+    users = User.get_motor_collection()
+    txs = Transaction.get_motor_collection()
+    goals = Goal.get_motor_collection()
+
+    checks = [
+        ("get_current_user / login", users, {"email": user.email}, None),
+        ("GET /transactions/", txs, {"user_id": user.id}, page_sort),
+        ("GET /transactions/?cursor", txs, {"user_id": user.id, **after}, page_sort),
+        ("GET /transactions/?transaction_type&cursor", txs, {"user_id": user.id, "transaction_type": "debit", **after}, page_sort),
+        ("GET /transactions/?category&cursor", txs, {"user_id": user.id, "category": "Food & Dining", **after}, page_sort),
+        ("GET /transactions/chart-data", txs, {"user_id": user.id, "transaction_type": "debit", "date": {"$gte": week_ago}}, None),
+        ("GET /insights/forecast", txs, {"user_id": user.id, "transaction_type": "debit"}, None),
+        ("POST /chat (balance)", txs, {"user_id": user.id}, None),
+        ("POST /transactions/import (dedupe)", txs, {"user_id": user.id, "import_hash": {"$in": ["x"]}}, None),
+        ("GET /goals/list", goals, {"user_id": user.id}, None),
+        ("active goals", goals, {"user_id": user.id, "status": "active"}, None),
+        ("categorizer cache", MerchantCategory.get_motor_collection(), {"key": "starbucks"}, None),
+    ]
+
+    failures = 0
+    for name, collection, query, sort in checks:
+        result = await explain(collection, query, sort)
+        stages = list(plan_stages(result["queryPlanner"]["winningPlan"]))
+        if "COLLSCAN" in stages:
+            failures += 1
+            print(f"❌ {name}: COLLSCAN ({' <- '.join(stages)})")
+        elif sort and "SORT" in stages:
+            failures += 1
+            print(f"❌ {name}: in-memory SORT ({' <- '.join(stages)})")
+        else:
+            print(f"✅ {name}: {' <- '.join(stages)}")
+
+    client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,381 @@
+"""Synthetic MoneyPal data for capacity tests, benchmarks and demos (replaces seed_video.py).
+
+Creates users with realistic Indian spending histories: salaries, rent, UPI
+micro-payments, food delivery, subscriptions and SIPs, festive and summer
+spikes. Each user also gets savings goals, and the monthly spending rollups
+the dashboard reads.
+
+Output is deterministic for a given --seed and --end-date. Every user draws
+from their own RNG, so the data (ObjectIds included) does not depend on
+--workers or batch sizes and benchmark runs stay comparable.
+
+Rows are built as plain dicts and written with unordered insert_many from
+--workers processes, each with its own pymongo client. Generation and BSON
+encoding are CPU-bound, so processes scale where one event loop would not.
+
+Usage (MONGODB_URI from .env):
+    python generate_data.py --users 1000                           # ~1.1M transactions
+    python generate_data.py --users 9000 --workers 8               # ~10M transactions
+    python generate_data.py --users 1000 --wipe                    # replace an earlier run
+    python generate_data.py --email chiragmishra120@gmail.com --months 3 --wipe   # demo history
+    python generate_data.py --users 200 --dry-run                  # generation only, prints a fingerprint
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from beanie import init_beanie
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from app.models.goal import Goal, GoalContribution
+from app.models.spending_rollup import SpendingRollup
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.rollup_service import rollup_operations
+from app.utils.security import hash_password
+
+load_dotenv()
+
+DEFAULT_PASSWORD = "password123"
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Rohan", "Priya", "Arjun",
+               "Sneha", "Rahul", "Meera", "Karthik", "Pooja", "Siddharth", "Neha", "Vikram", "Aisha", "Chirag"]
+LAST_NAMES = ["Sharma", "Verma", "Iyer", "Reddy", "Nair", "Patel", "Gupta", "Mishra", "Rao", "Singh",
+              "Das", "Menon", "Joshi", "Kulkarni", "Banerjee", "Shetty"]
+
+# UPI scan-and-pay merchant -> the category it is booked under
+MICRO_MERCHANTS = {
+    "CHAI POINT": "Food & Dining", "SAI JUICE CENTRE": "Food & Dining", "RAMESH KIRANA": "Groceries",
+    "AUTO RICKSHAW": "Transport", "PAAN SHOP": "Shopping", "XEROX CENTRE": "Education",
+}
+
+# category -> (merchants, amount range in ₹, payment methods)
+SPENDING = {
+    "micro": (list(MICRO_MERCHANTS), (10, 180), ["upi"]),
+    "Food & Dining": (["SWIGGY", "ZOMATO", "DOMINOS", "HALDIRAMS", "CAFE COFFEE DAY", "BEHROUZ BIRYANI"], (120, 1200), ["upi", "card"]),
+    "Groceries": (["BIGBASKET", "BLINKIT", "ZEPTO", "DMART", "RELIANCE FRESH"], (150, 3500), ["upi", "card"]),
+    "Transport": (["UBER", "OLA", "RAPIDO", "NAMMA METRO", "INDIANOIL FUEL"], (40, 900), ["upi", "card"]),
+    "Shopping": (["AMAZON", "FLIPKART", "MYNTRA", "AJIO", "NYKAA", "CROMA"], (300, 6000), ["card", "upi"]),
+    "Entertainment": (["BOOKMYSHOW", "PVR CINEMAS", "STEAM GAMES"], (150, 1500), ["upi", "card"]),
+    "Health": (["APOLLO PHARMACY", "PHARMEASY", "PRACTO"], (100, 2500), ["upi", "card"]),
+    "Travel": (["IRCTC", "MAKEMYTRIP", "INDIGO", "OYO ROOMS"], (800, 12000), ["card", "netbanking"]),
+}
+
+# persona -> salary range, rent share, expected events per day by category
+PERSONAS = {
+    "student": {"salary": (8000, 25000), "rent_share": 0.0, "rates": {
+        "micro": 2.0, "Food & Dining": 0.45, "Groceries": 0.1, "Transport": 0.5, "Shopping": 0.08,
+        "Entertainment": 0.08, "Health": 0.03, "Travel": 0.01}},
+    "professional": {"salary": (45000, 180000), "rent_share": 0.25, "rates": {
+        "micro": 1.2, "Food & Dining": 0.4, "Groceries": 0.25, "Transport": 0.45, "Shopping": 0.12,
+        "Entertainment": 0.06, "Health": 0.05, "Travel": 0.02}},
+    "family": {"salary": (60000, 250000), "rent_share": 0.2, "rates": {
+        "micro": 1.0, "Food & Dining": 0.2, "Groceries": 0.45, "Transport": 0.3, "Shopping": 0.15,
+        "Entertainment": 0.05, "Health": 0.1, "Travel": 0.015}},
+}
+
+# Festive and holiday multipliers: Diwali sales, summer and winter trips, wedding season, summer AC bills
+SEASONAL = {
+    "Shopping": {1: 1.3, 10: 2.5, 11: 2.0, 12: 1.3},
+    "Travel": {5: 2.0, 6: 1.5, 10: 1.5, 12: 2.2},
+    "Food & Dining": {10: 1.3, 11: 1.2, 12: 1.3},
+    "electricity": {4: 1.4, 5: 1.8, 6: 1.6},
+}
+
+SUBSCRIPTIONS = [("NETFLIX", 649), ("SPOTIFY", 119), ("DISNEY HOTSTAR", 299), ("YOUTUBE PREMIUM", 129), ("CULT FIT", 1500)]
+GOAL_TEMPLATES = [("Emergency Fund", "savings", 3.0), ("Goa Trip", "travel", 0.6), ("New iPhone", "gadgets", 1.0),
+                  ("Bike Down Payment", "vehicle", 1.2), ("Wedding Fund", "family", 6.0), ("Laptop Upgrade", "gadgets", 0.8)]
+
+
+# random.randint/choice cost ~1µs each through randrange; these are called ~15 times per row
+def between(rng: random.Random, low: int, high: int) -> int:
+    return low + int(rng.random() * (high - low + 1))
+
+
+def pick(rng: random.Random, items):
+    return items[int(rng.random() * len(items))]
+
+
+def object_id(rng: random.Random, when: datetime) -> ObjectId:
+    # Timestamp part follows the document's own date; the rest comes from the user's RNG
+    return ObjectId(int(when.timestamp()).to_bytes(4, "big") + rng.getrandbits(64).to_bytes(8, "big"))
+
+
+def narration(rng: random.Random, merchant: str, method: str) -> str:
+    """Bank-statement style description for a payment."""
+    if method == "upi":
+        return f"UPI/{merchant}/{between(rng, 10**11, 10**12 - 1)}"
+    if method == "card":
+        return f"POS {between(rng, 1000, 9999)} {merchant}"
+    if method == "auto-debit":
+        return f"ACH/NACH {merchant}"
+    return f"NEFT/{merchant}/{between(rng, 10**7, 10**8 - 1)}"
+
+
+def events(rng: random.Random, rate: float) -> int:
+    """Cheap Poisson stand-in: the integer part plus a Bernoulli trial for the fraction."""
+    whole = int(rate)
+    return whole + (rng.random() < rate - whole)
+
+
+def generate_user(seed: int, index: int, months: int, end: datetime, password_hash: str, prefix: str,
+                  user_id: Optional[ObjectId] = None) -> Tuple[Optional[dict], List[dict], List[dict]]:
+    """One user's profile, transactions and goals. Only depends on (seed, index, months, end)."""
+    rng = random.Random(f"{seed}:{index}")
+    persona_name = rng.choice(list(PERSONAS))
+    persona = PERSONAS[persona_name]
+    salary = round(rng.uniform(*persona["salary"]), -2)
+    start = (end - timedelta(days=30 * months)).replace(hour=0, minute=0, second=0, microsecond=0)
+    created_at = start - timedelta(days=rng.randint(0, 60))
+
+    user = None
+    if user_id is None:
+        user_id = object_id(rng, created_at)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        allowance = round(salary * rng.uniform(0.45, 0.7), -2)
+        user = {
+            "_id": user_id, "email": f"{prefix}{index}@example.com", "hashed_password": password_hash,
+            "full_name": f"{first} {last}", "monthly_allowance": allowance,
+            "safe_daily_spend": round(allowance / 30, 2), "created_at": created_at,
+        }
+
+    rent = round(salary * persona["rent_share"], -2)
+    subscriptions = rng.sample(SUBSCRIPTIONS, rng.randint(0, 3))
+    sip = round(salary * rng.choice([0, 0.05, 0.1, 0.15]), -2) if persona_name != "student" else 0
+    bill_day = rng.randint(5, 20)
+    transactions = []
+
+    def add(when: datetime, amount: float, category: str, merchant: str, method: str, kind: str = "debit"):
+        if when > end:
+            return
+        transactions.append({
+            "_id": object_id(rng, when), "user_id": user_id, "amount": amount, "category": category,
+            "description": narration(rng, merchant, method), "merchant": merchant.title(),
+            "transaction_type": kind, "payment_method": method, "date": when,
+        })
+
+    day = start
+    while day <= end:
+        month, dom = day.month, day.day
+        at = lambda hour_low=8, hour_high=23: day + timedelta(minutes=between(rng, hour_low * 60, hour_high * 60 + 59))
+
+        # Monthly fixtures
+        if dom == 1:
+            add(at(9, 11), salary, "Income", "SALARY ACME TECHNOLOGIES" if persona_name != "student" else "POCKET MONEY", "netbanking", "credit")
+        if dom == 5 and rent:
+            add(at(9, 21), rent, "Housing", "RENT LANDLORD", "upi")
+        if dom == 7 and sip:
+            add(at(6, 9), sip, "Investments", rng.choice(["ZERODHA COIN SIP", "GROWW SIP"]), "auto-debit")
+        if dom == bill_day:
+            electricity = round(rng.uniform(600, 2200) * SEASONAL["electricity"].get(month, 1.0), 2)
+            add(at(), electricity, "Utilities", "BESCOM ELECTRICITY", "upi")
+            add(at(), rng.choice([299, 399, 599]), "Utilities", "JIO PREPAID RECHARGE", "upi")
+            if persona_name != "student":
+                add(at(), rng.choice([699, 999, 1499]), "Utilities", "AIRTEL XSTREAM FIBER", "auto-debit")
+        for position, (name, price) in enumerate(subscriptions):
+            if dom == 10 + position:
+                add(at(0, 6), price, "Entertainment", name, "auto-debit")
+
+        # Day-to-day spending
+        for category, rate in persona["rates"].items():
+            merchants, (low, high), methods = SPENDING[category]
+            rate *= SEASONAL.get(category, {}).get(month, 1.0)
+            if day.weekday() >= 5 and category in ("Food & Dining", "Entertainment", "Shopping"):
+                rate *= 1.5
+            for _ in range(events(rng, rate)):
+                method = pick(rng, methods)
+                # Micro-payments are whole rupees, like real UPI scans
+                amount = float(between(rng, low, high)) if category == "micro" else round(low + rng.random() * (high - low), 2)
+                merchant = pick(rng, merchants)
+                add(at(), amount, MICRO_MERCHANTS.get(merchant, category), merchant, method)
+
+        # Occasional money in: refunds, cashback, freelance work
+        if rng.random() < 0.03:
+            add(at(), round(rng.uniform(50, 1500), 2), "Income", rng.choice(["AMAZON REFUND", "CASHBACK CRED", "FREELANCE PAYMENT"]), "upi", "credit")
+        day += timedelta(days=1)
+
+    goals = []
+    for title, category, salary_multiple in rng.sample(GOAL_TEMPLATES, rng.randint(0, 3)):
+        target = round(salary * salary_multiple, -3) or 10000.0
+        current = round(target * rng.choice([0.0, 0.1, 0.3, 0.55, 0.8, 1.0]), 2)
+        deadline = end + timedelta(days=rng.randint(60, 720))
+        months_left = max(1, (deadline.year - end.year) * 12 + deadline.month - end.month)
+        goal_created = start + timedelta(days=rng.randint(0, 30 * months))
+        goals.append({
+            "_id": object_id(rng, goal_created), "user_id": user_id, "title": title, "target_amount": target,
+            "current_amount": current, "deadline": deadline, "category": category,
+            "monthly_allocation": round(target / months_left, 2),
+            "status": "completed" if current >= target else "active",
+            "milestones": [
+                {"percentage": pct, "amount": target * pct / 100, "reached": current * 100 >= pct * target,
+                 **({"date": goal_created} if current * 100 >= pct * target else {})}
+                for pct in (25, 50, 75, 100)
+            ],
+            "created_at": goal_created,
+        })
+    return user, transactions, goals
+
+
+def fingerprint(transactions: List[dict]) -> str:
+    digest = hashlib.sha256()
+    for t in transactions:
+        digest.update(f"{t['_id']}|{t['amount']:.2f}|{t['category']}|{t['date']:%Y%m%d%H%M}".encode())
+    return digest.hexdigest()
+
+
+# --- Worker processes: one pymongo client each ---
+
+_client: Optional[MongoClient] = None
+
+
+def _database(uri: str):
+    global _client
+    if _client is None:
+        _client = MongoClient(uri)
+    return _client.finwise
+
+
+def load_users(task: dict) -> dict:
+    """Generates and writes one slice of users; returns counts and a fingerprint per user."""
+    started = time.perf_counter()
+    db = None if task["dry_run"] else _database(task["uri"])
+    counts = {"users": 0, "transactions": 0, "goals": 0, "rollups": 0}
+    fingerprints = {}
+    users, goals, batch = [], [], []
+
+    def flush():
+        if batch and db is not None:
+            db[Transaction.Settings.name].insert_many(batch, ordered=False)
+            operations = rollup_operations(batch, task["now"]) if task["rollups"] else []
+            if operations:
+                db[SpendingRollup.Settings.name].bulk_write(operations, ordered=False)
+                counts["rollups"] += len(operations)
+        batch.clear()
+
+    for index in task["indexes"]:
+        user, transactions, user_goals = generate_user(
+            task["seed"], index, task["months"], task["end"], task["password_hash"], task["prefix"], task.get("user_id"),
+        )
+        fingerprints[index] = fingerprint(transactions)
+        counts["transactions"] += len(transactions)
+        if user:
+            users.append(user)
+        goals.extend(user_goals)
+        batch.extend(transactions)
+        if len(batch) >= task["batch_size"]:
+            flush()
+    flush()
+
+    if db is not None:
+        if users:
+            db[User.Settings.name].insert_many(users, ordered=False)
+        if goals:
+            db[Goal.Settings.name].insert_many(goals, ordered=False)
+    counts["users"], counts["goals"] = len(users), len(goals)
+    return {"counts": counts, "fingerprints": fingerprints, "seconds": time.perf_counter() - started}
+
+
+async def prepare_database(uri: str, args, prefix_regex: str) -> Tuple[bool, Optional[ObjectId]]:
+    """Creates the app's indexes, resolves --email and applies --wipe. Returns (ok, existing user id)."""
+    client = AsyncIOMotorClient(uri)
+    try:
+        await init_beanie(database=client.finwise, document_models=[User, Transaction, Goal, GoalContribution, SpendingRollup])
+        if args.email:
+            user = await User.find_one(User.email == args.email)
+            if not user:
+                print(f"❌ User {args.email} not found. Run seed_user.py first!")
+                return False, None
+            user_ids = [user.id]
+        else:
+            user_ids = [u["_id"] for u in await User.get_motor_collection().find({"email": {"$regex": prefix_regex}}, {"_id": 1}).to_list(length=None)]
+            if user_ids and not args.wipe:
+                print(f"❌ {len(user_ids)} generated users already exist (emails {args.prefix}*); pass --wipe to replace them")
+                return False, None
+
+        if args.wipe and user_ids:
+            for model in (Transaction, Goal, GoalContribution, SpendingRollup):
+                result = await model.get_motor_collection().delete_many({"user_id": {"$in": user_ids}})
+                print(f"🧹 Removed {result.deleted_count} {model.Settings.name}")
+            if not args.email:
+                await User.get_motor_collection().delete_many({"_id": {"$in": user_ids}})
+                print(f"🧹 Removed {len(user_ids)} users")
+        return True, (user_ids[0] if args.email else None)
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--months", type=int, default=12, help="history length per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", help="last day of history, YYYY-MM-DD (default: today); fix it for reproducible runs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--batch-size", type=int, default=10000, help="transactions per insert_many")
+    parser.add_argument("--users-per-task", type=int, default=50)
+    parser.add_argument("--prefix", default="gen-user-", help="generated emails are <prefix><n>@example.com")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--email", help="generate history for this existing user instead of creating users")
+    parser.add_argument("--wipe", action="store_true", help="delete earlier generated data for the same users first")
+    parser.add_argument("--skip-rollups", action="store_true", help="don't write spending_rollups (run rebuild_rollups.py later)")
+    parser.add_argument("--dry-run", action="store_true", help="generate without writing; prints throughput and a fingerprint")
+    args = parser.parse_args()
+
+    end = datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date else datetime.now()
+    end = end.replace(hour=23, minute=59, second=59, microsecond=0)
+    uri = os.getenv("MONGODB_URI")
+    user_id = None
+    if not args.dry_run:
+        ok, user_id = asyncio.run(prepare_database(uri, args, f"^{args.prefix}\\d+@example\\.com$"))
+        if not ok:
+            return 1
+
+    indexes = [0] if args.email else list(range(args.users))
+    # One bcrypt hash shared by every generated user (same password), not one per user
+    password_hash = hash_password(args.password)
+    base = {
+        "uri": uri, "seed": args.seed, "months": args.months, "end": end, "now": datetime.now(),
+        "password_hash": password_hash, "prefix": args.prefix, "batch_size": args.batch_size,
+        "rollups": not args.skip_rollups, "dry_run": args.dry_run, "user_id": user_id,
+    }
+    tasks = [dict(base, indexes=indexes[i:i + args.users_per_task]) for i in range(0, len(indexes), args.users_per_task)]
+
+    print(f"🏭 {len(indexes)} user(s) x {args.months} months, seed {args.seed}, end {end:%Y-%m-%d}, {args.workers} workers"
+          + (" (dry run)" if args.dry_run else ""))
+    totals = defaultdict(int)
+    fingerprints = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(load_users, task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            for key, value in result["counts"].items():
+                totals[key] += value
+            fingerprints.update(result["fingerprints"])
+            if done % max(1, len(tasks) // 20) == 0 or done == len(tasks):
+                elapsed = time.perf_counter() - started
+                print(f"   {done}/{len(tasks)} tasks, {totals['transactions']:,} transactions ({totals['transactions'] / elapsed:,.0f}/sec)")
+
+    elapsed = time.perf_counter() - started
+    combined = hashlib.sha256("".join(fingerprints[i] for i in sorted(fingerprints)).encode()).hexdigest()[:16]
+    print(f"✅ {totals['users']:,} users, {totals['transactions']:,} transactions, {totals['goals']:,} goals, "
+          f"{totals['rollups']:,} rollup months in {elapsed:.1f}s ({totals['transactions'] / elapsed:,.0f} transactions/sec)")
+    print(f"🔑 Data fingerprint {combined} (same seed, months and end date give the same value)")
+    if not args.email:
+        print(f"👤 Log in as {args.prefix}0@example.com / {args.password}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Recompute spending_rollups from raw transactions and report any drift.
+
+Users with no rollups at all are backfilled by the API on startup
+(ROLLUP_BACKFILL_ON_STARTUP); this script repairs drift for everyone else.
+
+Usage:
+    python rebuild_rollups.py                 # reconcile every user, fix drift
+    python rebuild_rollups.py --email a@b.com # one user
+    python rebuild_rollups.py --check         # report only, exit 1 on drift
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.spending_rollup import SpendingRollup
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.rollup_service import rollup_service
+
+load_dotenv()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--email", help="Only reconcile this user")
+    parser.add_argument("--check", action="store_true", help="Report drift without rewriting rollups")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+    await init_beanie(database=client.finwise, document_models=[User, Transaction, SpendingRollup])
+
+    user_id = None
+    if args.email:
+        user = await User.find_one(User.email == args.email)
+        if not user:
+            print(f"❌ User {args.email} not found")
+            return 1
+        user_id = user.id
+
+    drift = await rollup_service.rebuild(user_id, fix=not args.check)
+    for d in drift[:50]:
+        print(f"⚠️  {d['user_id']} {d['month']} {d['field']}: stored={d['stored']:.2f} expected={d['expected']:.2f}")
+    if len(drift) > 50:
+        print(f"... and {len(drift) - 50} more")
+
+    if not drift:
+        print("✅ Rollups match raw transactions")
+    elif args.check:
+        print(f"❌ {len(drift)} drifted fields (run without --check to repair)")
+    else:
+        print(f"🔧 Repaired {len(drift)} drifted fields across {len({d['user_id'] for d in drift})} users")
+
+    client.close()
+    return 1 if drift and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,42 @@
+"""Nightly batch: precompute every user's spending forecast into `forecasts`.
+
+Schedule it off-peak, e.g. cron:  0 2 * * *  cd backend && python run_forecasts.py
+
+Usage:
+    python run_forecasts.py                      # resume an interrupted run, or start a new one
+    python run_forecasts.py --restart            # ignore the checkpoint
+    python run_forecasts.py --chunk-size 500 --workers 8
+"""
+import argparse
+import asyncio
+import os
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.forecast import Forecast, ForecastJob
+from app.models.spending_rollup import SpendingRollup
+from app.models.user import User
+from app.services.forecast_batch import ForecastBatchJob
+
+load_dotenv()
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=200, help="Users per chunk (bounds memory)")
+    parser.add_argument("--workers", type=int, default=None, help="Fitting processes (default: all cores)")
+    parser.add_argument("--restart", action="store_true", help="Start over instead of resuming")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
+    await init_beanie(database=client.finwise, document_models=[User, SpendingRollup, Forecast, ForecastJob])
+
+    job = ForecastBatchJob(chunk_size=args.chunk_size, workers=args.workers)
+    await job.run(restart=args.restart)
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
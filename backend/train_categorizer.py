@@ -0,0 +1,228 @@
+"""Trains the local category model (app/services/local_classifier.py) from accumulated labels.
+
+Labels come from the categories already stored on transactions (keyword
+rules, past AI answers and user edits) and from the AI answers memoized in
+merchant_categories. Texts are normalized like the category cache keys and
+deduplicated; each key takes its most common label, and anything outside the
+app's category list ("General", odd LLM replies) is dropped.
+
+A slice of keys (--holdout, chosen by key hash, so a merchant never sits on
+both sides) is kept out of training for the report: accuracy, how much
+traffic --threshold would answer locally and how precisely, per-category
+precision/recall, and single-prediction latency.
+
+Usage (MONGODB_URI from .env):
+    python train_categorizer.py                      # train, report, save app/data/local_classifier.npz
+    python train_categorizer.py --report-only        # evaluate the saved model on the held-out keys
+    python train_categorizer.py --synthetic 200      # offline smoke run: varied generate_data.py users, no database
+Restart the API (or roll the workers) to pick up a new model.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.config import settings
+from app.models.merchant_category import MerchantCategory
+from app.models.transaction import Transaction
+from app.services.categorization_service import CATEGORIES
+from app.services.category_cache import normalize_text
+from app.services.local_classifier import DEFAULT_FEATURES, DEFAULT_MODEL_PATH, LocalClassifier, train
+
+load_dotenv()
+
+Labels = Dict[str, Counter]
+
+
+def add_label(labels: Labels, description: str, merchant: str, category: str, weight: int = 1):
+    if category not in CATEGORIES:
+        return
+    # The add route stores "Unknown" for a missing merchant; at prediction time it is just absent
+    key = normalize_text(description or "", None if merchant == "Unknown" else merchant)
+    if key:
+        labels[key][category] += weight
+
+
+async def load_labels(uri: str, limit: int) -> Labels:
+    labels: Labels = defaultdict(Counter)
+    client = AsyncIOMotorClient(uri)
+    try:
+        db = client.finwise
+        # Grouped server-side: the same narration repeats across months and users
+        pipeline = [
+            {"$sort": {"_id": -1}},
+            {"$limit": limit},
+            {"$group": {"_id": {"d": "$description", "m": "$merchant", "c": "$category"}, "n": {"$sum": 1}}},
+        ]
+        rows = 0
+        async for row in db[Transaction.Settings.name].aggregate(pipeline, allowDiskUse=True):
+            add_label(labels, row["_id"].get("d"), row["_id"].get("m"), row["_id"].get("c"), row["n"])
+            rows += row["n"]
+        print(f"📥 {rows:,} transactions")
+
+        memo = 0
+        async for doc in db[MerchantCategory.Settings.name].find({}, {"key": 1, "category": 1}):
+            # Memo keys are already normalized
+            if doc.get("category") in CATEGORIES and doc.get("key"):
+                labels[doc["key"]][doc["category"]] += 1
+                memo += 1
+        print(f"📥 {memo:,} memoized AI labels")
+    finally:
+        client.close()
+    return labels
+
+
+# Synthetic-mode noise: card and UPI narrations carry the branch, the payment gateway,
+# and merchant names cut short or abbreviated by the bank
+LOCATIONS = ["BANGALORE", "BENGALURU", "MUMBAI", "ANDHERI", "BANDRA", "PUNE", "KOTHRUD", "DELHI", "SAKET",
+             "NOIDA", "GURGAON", "HYDERABAD", "GACHIBOWLI", "CHENNAI", "ADYAR", "KOLKATA", "SALT LAKE",
+             "KORAMANGALA", "INDIRANAGAR", "WHITEFIELD", "HSR LAYOUT", "JAYANAGAR", "THANE", "POWAI"]
+GATEWAYS = ["RAZORPAY", "PAYU", "PAYTM", "CCAVENUE", "BILLDESK", "PHONEPE", "GPAY"]
+
+
+def vary_merchant(rng: random.Random, merchant: str) -> str:
+    words = merchant.split()
+    if rng.random() < 0.25:
+        # Banks truncate long names to a fixed width
+        merchant = merchant[:rng.randint(6, 12)].strip()
+    elif rng.random() < 0.15:
+        merchant = " ".join(w[0] + "".join(c for c in w[1:] if c not in "AEIOU") for w in words)
+    if rng.random() < 0.3:
+        merchant = f"{rng.choice(GATEWAYS)} {merchant}"
+    if rng.random() < 0.6:
+        merchant = f"{merchant} {rng.choice(LOCATIONS)}"
+    return merchant
+
+
+def synthetic_labels(users: int, seed: int) -> Labels:
+    """Labels from generate_data.py users, with merchant names varied so keys don't repeat exactly.
+
+    Without the variation the fixed merchant list yields under a hundred distinct
+    keys, too few for a meaningful held-out set. The report then measures
+    robustness to narration noise for known merchants, not accuracy on new ones.
+    """
+    from generate_data import generate_user
+
+    labels: Labels = defaultdict(Counter)
+    for index in range(users):
+        rng = random.Random(f"{seed}:vary:{index}")
+        _, transactions, _ = generate_user(seed, index, 12, datetime(2026, 1, 1), "", "synthetic-")
+        for t in transactions:
+            merchant = t["merchant"].upper()
+            description = t["description"].replace(merchant, vary_merchant(rng, merchant))
+            add_label(labels, description, None, t["category"])
+    return labels
+
+
+def split(keys: List[str], holdout: float) -> Tuple[List[str], List[str]]:
+    """Deterministic by key, so a re-train and a --report-only run see the same held-out set."""
+    cut = int(holdout * 1000)
+    train_keys, test_keys = [], []
+    for key in keys:
+        (test_keys if zlib.crc32(key.encode()) % 1000 < cut else train_keys).append(key)
+    return train_keys, test_keys
+
+
+def report(model: LocalClassifier, keys: List[str], truth: Dict[str, str], threshold: float) -> float:
+    if not keys:
+        print("⚠️ No held-out keys to report on")
+        return 0.0
+    latencies, correct, answered, answered_correct = [], 0, 0, 0
+    per_class = defaultdict(Counter)  # category -> tp / fp / fn
+    for key in keys:
+        started = time.perf_counter()
+        category, probability = model.predict_key(key)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        expected = truth[key]
+        if category == expected:
+            correct += 1
+            per_class[expected]["tp"] += 1
+        else:
+            per_class[category]["fp"] += 1
+            per_class[expected]["fn"] += 1
+        if probability >= threshold:
+            answered += 1
+            answered_correct += category == expected
+
+    latencies.sort()
+    accuracy = correct / len(keys)
+    print(f"\n📊 Held-out set: {len(keys):,} keys")
+    print(f"   accuracy           {accuracy:.1%}")
+    print(f"   answered locally   {answered / len(keys):.1%} at threshold {threshold} "
+          f"({answered_correct / answered if answered else 0:.1%} correct); the rest go to the LLM")
+    print(f"   latency            p50 {latencies[len(latencies) // 2]:.0f}us  "
+          f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.0f}us per prediction")
+    print(f"\n   {'category':<16} {'precision':>9} {'recall':>7} {'support':>8}")
+    for category in sorted(per_class):
+        c = per_class[category]
+        support = c["tp"] + c["fn"]
+        precision = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 0.0
+        recall = c["tp"] / support if support else 0.0
+        print(f"   {category:<16} {precision:>9.1%} {recall:>7.1%} {support:>8,}")
+    return accuracy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=settings.LOCAL_CLASSIFIER_PATH or str(DEFAULT_MODEL_PATH))
+    parser.add_argument("--limit", type=int, default=2_000_000, help="most recent transactions to learn from")
+    parser.add_argument("--holdout", type=float, default=0.2, help="share of keys held out for the report")
+    parser.add_argument("--threshold", type=float, default=settings.LOCAL_CLASSIFIER_THRESHOLD)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="hash buckets (power of two)")
+    parser.add_argument("--min-keys", type=int, default=200, help="refuse to train on fewer labelled keys")
+    parser.add_argument("--report-only", action="store_true", help="evaluate the saved model, don't train")
+    parser.add_argument("--synthetic", type=int, metavar="USERS", help="use generated users instead of the database")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.features & (args.features - 1):
+        parser.error("--features must be a power of two")
+
+    started = time.perf_counter()
+    labels = synthetic_labels(args.synthetic, args.seed) if args.synthetic else asyncio.run(
+        load_labels(os.getenv("MONGODB_URI"), args.limit)
+    )
+    truth = {key: counts.most_common(1)[0][0] for key, counts in labels.items()}
+    train_keys, test_keys = split(sorted(truth), args.holdout)
+    print(f"🏷️  {len(truth):,} distinct labelled keys ({len(train_keys):,} train / {len(test_keys):,} held out) "
+          f"in {time.perf_counter() - started:.1f}s")
+    print("   " + ", ".join(f"{c} {n:,}" for c, n in Counter(truth.values()).most_common()))
+
+    if args.report_only:
+        model = LocalClassifier.load(args.out)
+        if model is None:
+            return 1
+        report(model, test_keys, truth, args.threshold)
+        return 0
+
+    if len(train_keys) < args.min_keys:
+        print(f"❌ Only {len(train_keys)} training keys (need {args.min_keys}); keep the LLM fallback for now")
+        return 1
+
+    model = train(train_keys, [truth[k] for k in train_keys], n_features=args.features, epochs=args.epochs, seed=args.seed)
+    print(f"🧠 Trained on {model.meta['samples']:,} keys in {model.meta['train_seconds']}s")
+    accuracy = report(model, test_keys, truth, args.threshold)
+
+    model.meta.update({
+        "holdout_accuracy": round(accuracy, 4),
+        "holdout_keys": len(test_keys),
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "source": f"synthetic:{args.synthetic}" if args.synthetic else "database",
+    })
+    model.save(args.out)
+    print(f"\n✅ Saved {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -82,17 +82,45 @@ export default function AICoach() {
         formData.append("file", selectedFile);
       }
 
-      // FIX: Correct URL (Clean String)
-      const response = await fetch("http://127.0.0.1:8000/api/chat", {
+      // Streamed reply (Server-Sent Events): show tokens as they arrive
+      const response = await fetch("http://127.0.0.1:8000/api/chat/stream", {
         method: "POST",
         headers: { 
             "Authorization": `Bearer ${token}` 
         },
         body: formData, 
       });
-
-      const data = await response.json();
-      setMessages(prev => [...prev, { id: Date.now() + 1, text: data.reply, sender: "ai" }]);
+      if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+      const aiId = Date.now() + 1;
+      setMessages(prev => [...prev, { id: aiId, text: "", sender: "ai" }]);
+      const setAiText = (update: (text: string) => string) =>
+        setMessages(prev => prev.map(m => (m.id === aiId ? { ...m, text: update(m.text) } : m)));
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        const events = buffer.split("\n\n");
+        buffer = events.pop() || "";
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = raw.match(/^data: (.*)$/m)?.[1];
+          if (!data) continue;
+          const payload = JSON.parse(data);
+          if (event === "done" || event === "error") {
+            setAiText(() => payload.reply);
+          } else {
+            setIsLoading(false);
+            setAiText(text => text + payload.delta);
+          }
+        }
+      }
 
       // Cleanup after success
       setSelectedFile(null);
@@ -111,7 +111,7 @@ export default function Dashboard() {
             amount: data.amount || prev.amount,
             description: data.description || prev.description,
             category: data.category || prev.category,
-            transaction_type: "debit" // AI currently defaults to debit, user can switch manually if needed
+            transaction_type: data.transaction_type || "debit" // "received 500 cashback" comes back as credit
         }));
         setIsMagicMode(false); 
     } catch (e) {